@@ -1,22 +1,86 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_wtf.csrf import CSRFProtect
 from flask_login import LoginManager
 from urllib.parse import quote
+import os
+import weakref
 
-app = Flask(__name__)
-app.secret_key= "ỤIHIO%@UDd@$%oihfi345$#8IODHN"
-app.config["SQLALCHEMY_DATABASE_URI"] = "mysql+pymysql://root:%s@localhost/cttvl_db?charset=utf8mb4" % quote("123456")
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = True
-# app.config["PAGE_SIZE"] = 4
-
-db = SQLAlchemy(app)
+from app import replicas
 
+db = SQLAlchemy(session_options={"class_": replicas.RoutingSession})
 login_manager = LoginManager()
-login_manager.init_app(app)
 
-# csrf = CSRFProtect(app)
+DEFAULT_DATABASE_URI = "mysql+pymysql://root:%s@localhost/cttvl_db?charset=utf8mb4" % quote("123456")
 
-def create_db():
+# Engine của mọi app đã tạo, để tiến trình con sau fork bỏ các kết nối thừa hưởng từ tiến trình cha
+_engines = weakref.WeakSet()
+
+
+def _dispose_engines_after_fork():
+    # close=False: không đóng socket đang thuộc về tiến trình cha, chỉ bỏ chúng khỏi pool của tiến trình con
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def engine_options(config, uri):
+    # pool_recycle phải nhỏ hơn wait_timeout của MySQL, pre_ping kiểm tra kết nối trước khi lấy ra khỏi pool
+    options = {
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+    }
+    # SQLite trong bộ nhớ dùng StaticPool, không có khái niệm kích thước pool
+    if not uri.startswith("sqlite"):
+        options.update(pool_size=config["DB_POOL_SIZE"], max_overflow=config["DB_MAX_OVERFLOW"],
+                       pool_timeout=config["DB_POOL_TIMEOUT"])
+    return options
+
+
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(
+        SECRET_KEY=os.environ.get("SECRET_KEY", "ỤIHIO%@UDd@$%oihfi345$#8IODHN"),
+        SQLALCHEMY_DATABASE_URI=os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URI),
+        SQLALCHEMY_TRACK_MODIFICATIONS=True,
+        # Mỗi worker có pool riêng: số kết nối tối đa tới MySQL = số worker × (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+        DB_POOL_SIZE=_env_int("DB_POOL_SIZE", 5),
+        DB_MAX_OVERFLOW=_env_int("DB_MAX_OVERFLOW", 10),
+        DB_POOL_TIMEOUT=_env_int("DB_POOL_TIMEOUT", 30),
+        DB_POOL_RECYCLE=_env_int("DB_POOL_RECYCLE", 1800),
+        DB_POOL_PRE_PING=os.environ.get("DB_POOL_PRE_PING", "1") != "0",
+        # Replica chỉ đọc, cách nhau bởi dấu phẩy; để trống thì mọi truy vấn đi primary
+        SQLALCHEMY_REPLICA_URIS=[uri for uri in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if uri],
+        # Sau khi tự ghi, người dùng đọc từ primary trong khoảng này (lớn hơn độ trễ đồng bộ của replica)
+        DB_READ_YOUR_WRITES_SECONDS=_env_int("DB_READ_YOUR_WRITES_SECONDS", 10),
+    )
+    app.config.update(config or {})
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS",
+                          engine_options(app.config, app.config["SQLALCHEMY_DATABASE_URI"]))
+
+    db.init_app(app)
+    login_manager.init_app(app)
+    app.extensions['db_replicas'] = replicas.create_engines(
+        app.config["SQLALCHEMY_REPLICA_URIS"], lambda uri: engine_options(app.config, uri))
     with app.app_context():
-        db.create_all()
\ No newline at end of file
+        _engines.update(db.engines.values())
+    _engines.update(app.extensions['db_replicas'])
+
+    from app import (cache, identity, matching, profiler, conditional, fragments, assets, search, facets,
+                     autocomplete, ingest, cv_store, maintenance, outbox, index, admin)
+    for module in (replicas, cache, identity, matching, profiler, conditional, fragments, assets, search, facets,
+                   autocomplete, ingest, cv_store, maintenance, outbox, index, admin):
+        module.init_app(app)
+
+    return app
+
+
+def create_db():
+    with create_app().app_context():
+        db.create_all()
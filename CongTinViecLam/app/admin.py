@@ -2,12 +2,15 @@ from flask_admin.contrib.sqla import ModelView
 from flask_login import current_user, logout_user
 from wtforms import SelectField
 
-from app.models import User, Candidate, Employer, UserRole, Job, JobStatus, Application
+from app.models import User, Candidate, Employer, UserRole, Job, JobStatus, Application, JOB_LISTING
 from flask_admin import Admin, BaseView, expose
-from app import db, app
-from flask import render_template, redirect, url_for, request, jsonify
+from app import db
+from app.cache import cache
+from app.fragments import fragment_cache
+from app.profiler import request_log
+from flask import render_template, redirect, url_for, request, jsonify, current_app
 
-admin = Admin(app=app, name='Job_portal Admin', template_mode='bootstrap4')
+admin = Admin(name='Job_portal Admin', template_mode='bootstrap4')
 
 
 class AdminView(ModelView):
@@ -36,7 +39,9 @@ class EmployerView(AdminView):
 
 
 class JobView(AdminView):
-    column_list = ('id','employer_id', 'title', 'description', 'posted_date', 'status')
+    column_list = ('id','employer_id', 'title', 'summary', 'posted_date', 'status')
+    # summary tự tính từ description
+    form_excluded_columns = ('summary',)
     form_overrides = {
         'status': SelectField
     }
@@ -46,6 +51,36 @@ class JobView(AdminView):
         }
     }
 
+    def get_query(self):
+        # Trang danh sách chỉ hiện summary, không nạp description/requirements/benefits
+        return super().get_query().options(*JOB_LISTING)
+
+
+class CacheStatsView(BaseView):
+    def is_accessible(self):
+        return current_user.is_authenticated and current_user.role.__eq__(UserRole.ADMIN)
+
+    @expose('/')
+    def index(self):
+        return self.render('admin/cache_stats.html', stats={**cache.stats(), **fragment_cache.stats()})
+
+
+class PerformanceView(BaseView):
+    def is_accessible(self):
+        return current_user.is_authenticated and current_user.role.__eq__(UserRole.ADMIN)
+
+    @expose('/')
+    def index(self):
+        records = request_log.records()
+        slow_requests = sorted(records, key=lambda record: record['total_ms'], reverse=True)[:20]
+        return self.render('admin/performance.html', stats=request_log.stats(), slow_requests=slow_requests,
+                           buffered=len(records), buffer_size=current_app.config["PROFILER_BUFFER_SIZE"])
+
+    @expose('/reset', methods=['POST'])
+    def reset(self):
+        request_log.clear()
+        return redirect(url_for('.index'))
+
 
 class AuthenticatedView(BaseView):
     def is_accessible(self):
@@ -63,4 +98,9 @@ admin.add_view(UserView(User, db.session))
 admin.add_view(CandidateView(Candidate, db.session))
 admin.add_view(EmployerView(Employer, db.session))
 admin.add_view(JobView(Job, db.session))
-admin.add_view(LogoutView(name='Đăng xuất'))
\ No newline at end of file
+admin.add_view(CacheStatsView(name='Cache', endpoint='cache-stats'))
+admin.add_view(PerformanceView(name='Hiệu năng', endpoint='performance'))
+admin.add_view(LogoutView(name='Đăng xuất'))
+
+def init_app(app):
+    admin.init_app(app)
@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+import click
+from flask import current_app, request, send_from_directory
+from flask.cli import with_appcontext
+
+# File tĩnh được chép sang STATIC_BUILD_DIR với tên chứa hash nội dung (css/style.3f2a9c0b1d4e.css)
+# kèm bản nén sẵn .gz/.br. url_for('static', ...) trả tên có hash nên trình duyệt giữ file mãi
+# (immutable), sửa file thì hash đổi, URL đổi.
+MANIFEST = 'manifest.json'
+# Ưu tiên brotli rồi đến gzip (gói Brotli trong requirements.txt; thiếu gói thì chỉ có bản .gz)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+COMPRESSIBLE = ('.css', '.js', '.svg', '.html', '.json', '.txt', '.map', '.xml')
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def fingerprint(path, data):
+    base, ext = os.path.splitext(path)
+    return '%s.%s%s' % (base, hashlib.sha256(data).hexdigest()[:12], ext)
+
+
+def _write(path, data):
+    # Ghi ra file tạm rồi đổi tên: nhiều worker cùng build lúc khởi động không đọc phải file ghi dở
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build(static_folder, build_dir):
+    brotli = _brotli()
+    build_dir = os.path.abspath(build_dir)
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and os.path.abspath(os.path.join(root, d)) != build_dir]
+        for name in files:
+            if name.startswith('.'):
+                continue
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            hashed = manifest[logical] = fingerprint(logical, data)
+
+            # Tên file chứa hash: file đã có thì nội dung chắc chắn giống, không cần ghi lại
+            target = os.path.join(build_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            variants = {'': lambda: data}
+            if name.endswith(COMPRESSIBLE):
+                variants['.gz'] = lambda: gzip.compress(data, compresslevel=9, mtime=0)
+                if brotli is not None:
+                    variants['.br'] = lambda: brotli.compress(data, quality=11)
+            for suffix, compress in variants.items():
+                if os.path.exists(target + suffix):
+                    continue
+                content = compress()
+                # File quá nhỏ nén xong còn lớn hơn: bỏ, phục vụ bản gốc
+                if suffix and len(content) >= len(data):
+                    continue
+                _write(target + suffix, content)
+
+    _write(os.path.join(build_dir, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def load(build_dir):
+    try:
+        with open(os.path.join(build_dir, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}, {}
+    # Các bản nén có sẵn của từng file, xác định một lần thay vì stat mỗi request
+    encodings = {hashed: [(encoding, suffix) for encoding, suffix in ENCODINGS
+                          if os.path.exists(os.path.join(build_dir, hashed + suffix))]
+                 for hashed in manifest.values()}
+    return manifest, encodings
+
+
+def serve_static(filename):
+    assets = current_app.extensions['static_assets']
+    encodings = assets['encodings'].get(filename)
+    if encodings is None:
+        # Tên gốc (không hash) hoặc file mới thêm sau khi build: xử lý như mặc định của Flask
+        return current_app.send_static_file(filename)
+
+    encoding, suffix = next(((encoding, suffix) for encoding, suffix in encodings
+                             if request.accept_encodings[encoding]), (None, ''))
+    response = send_from_directory(assets['dir'], filename + suffix, mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=current_app.config["STATIC_MAX_AGE"])
+    if encoding:
+        response.content_encoding = encoding
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True
+    return response
+
+
+def _hashed_url(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        manifest = current_app.extensions['static_assets']['manifest']
+        values['filename'] = manifest.get(values['filename'], values['filename'])
+
+
+@click.command('assets-build')
+@with_appcontext
+def assets_build_command():
+    if _brotli() is None:
+        click.secho('CẢNH BÁO: chưa cài gói Brotli (pip install -r requirements.txt), '
+                    'file tĩnh sẽ không có bản nén .br', fg='yellow', err=True)
+    manifest = build(current_app.static_folder, current_app.config["STATIC_BUILD_DIR"])
+    click.echo('Đã build %d file tĩnh vào %s' % (len(manifest), current_app.config["STATIC_BUILD_DIR"]))
+
+
+def init_app(app):
+    app.config.setdefault("STATIC_FINGERPRINT", os.environ.get("STATIC_FINGERPRINT", "1") != "0")
+    app.config.setdefault("STATIC_BUILD_DIR",
+                          os.environ.get("STATIC_BUILD_DIR", os.path.join(app.static_folder, 'dist')))
+    # Build là một bước deploy (`flask --app wsgi assets-build`), không chạy mỗi lần create_app (test,
+    # lệnh CLI...). Bật STATIC_BUILD_ON_STARTUP=1 khi chạy dev để không phải build tay
+    app.config.setdefault("STATIC_BUILD_ON_STARTUP", os.environ.get("STATIC_BUILD_ON_STARTUP", "0") != "0")
+    app.config.setdefault("STATIC_MAX_AGE", int(os.environ.get("STATIC_MAX_AGE", 365 * 24 * 3600)))
+    app.cli.add_command(assets_build_command)
+    if not app.config["STATIC_FINGERPRINT"]:
+        return
+
+    build_dir = app.config["STATIC_BUILD_DIR"]
+    if app.config["STATIC_BUILD_ON_STARTUP"]:
+        try:
+            build(app.static_folder, build_dir)
+        except OSError as e:
+            app.logger.warning('Không build được file tĩnh vào %s: %s', build_dir, e)
+    manifest, encodings = load(build_dir)
+    app.extensions['static_assets'] = {'dir': build_dir, 'manifest': manifest, 'encodings': encodings}
+    app.url_defaults(_hashed_url)
+    app.view_functions['static'] = serve_static
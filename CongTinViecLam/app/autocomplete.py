@@ -0,0 +1,283 @@
+import bisect
+import heapq
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import load_only
+
+from app import db, search
+from app.models import Job, JobStatus, Employer
+
+# Loại gợi ý: tiêu đề job, địa điểm, tên công ty (chỉ tính các job đang active)
+KINDS = ('title', 'location', 'company')
+# Cụm "ke toan tong hop" được đánh chỉ mục cả ở "toan tong hop", "tong hop"... để gõ "tong" vẫn ra
+MAX_WORD_STARTS = 6
+# Số khóa tối đa duyệt cho một tiền tố dài hơn SHORT_PREFIX_LENGTH. Khóa sắp theo chữ cái nên cắt ở đây
+# có thể bỏ sót cụm phổ biến; tiền tố ngắn ("k", "ke") khớp rất nhiều khóa nên có bảng riêng (short)
+MAX_SCAN = 5000
+SHORT_PREFIX_LENGTH = 2
+MAX_LIMIT = 20
+RESULT_CACHE_SIZE = 2048
+SYNC_OVERLAP = timedelta(seconds=5)
+LOAD_BATCH_SIZE = 1000
+_JOB_ATTRS = ('status', 'title', 'location', 'employer_id')
+
+
+def phrase_key(text):
+    # So khớp không dấu, không phân biệt hoa thường: "Kế Toán" -> "ke toan"
+    return ' '.join(search.tokenize(text))
+
+
+def job_entry(job):
+    status = job.status.value if isinstance(job.status, JobStatus) else job.status
+    if status != JobStatus.active.value:
+        return None
+    return job.employer_id, (job.title or '').strip(), (job.location or '').strip()
+
+
+class PrefixIndex:
+    # Mảng khóa đã sắp xếp (khóa, loại, cụm) + bisect để tìm theo tiền tố; độ phổ biến của một cụm
+    # là số job active đang dùng nó. Cập nhật tăng dần sau commit như matching.Matcher, worker khác
+    # đồng bộ theo updated_at mỗi AUTOCOMPLETE_SYNC_SECONDS
+    def __init__(self):
+        self.keys = []
+        # loại -> cụm -> Counter(chuỗi gốc -> số job); nhãn hiển thị là chuỗi gốc phổ biến nhất
+        self.labels = {kind: {} for kind in KINDS}
+        self.jobs = {}
+        self.companies = {}
+        self.employer_jobs = Counter()
+        # tiền tố 1-2 ký tự -> {(loại, cụm): số job}: xếp hạng trên toàn bộ cụm khớp, không duyệt keys
+        self.short = {}
+        self.loaded = False
+        # Lần nạp đầu thêm khóa vào cuối rồi sắp xếp một lần, thay vì insort từng khóa
+        self._bulk = False
+        self._results = OrderedDict()
+        self._synced_at = None
+        self._checked_at = 0
+        self._reconciled_at = 0
+        self._lock = threading.RLock()
+
+    def _add(self, kind, label, delta):
+        key = phrase_key(label)
+        if not key or not delta:
+            return
+        phrases = self.labels[kind]
+        counter = phrases.get(key)
+        if counter is None:
+            if delta < 0:
+                return
+            counter = phrases[key] = Counter()
+            for start in self._word_starts(key):
+                if self._bulk:
+                    self.keys.append((start, kind, key))
+                else:
+                    bisect.insort(self.keys, (start, kind, key))
+        counter[label] += delta
+        if counter[label] <= 0:
+            del counter[label]
+        total = sum(counter.values())
+        for short in {start[:n] for start in self._word_starts(key) for n in range(1, SHORT_PREFIX_LENGTH + 1)}:
+            if total:
+                self.short.setdefault(short, {})[kind, key] = total
+            else:
+                bucket = self.short.get(short)
+                if bucket is not None:
+                    bucket.pop((kind, key), None)
+                    if not bucket:
+                        del self.short[short]
+        if not counter:
+            del phrases[key]
+            for start in self._word_starts(key):
+                i = bisect.bisect_left(self.keys, (start, kind, key))
+                if i < len(self.keys) and self.keys[i] == (start, kind, key):
+                    del self.keys[i]
+
+    @staticmethod
+    def _word_starts(key):
+        words = key.split(' ')
+        return [' '.join(words[i:]) for i in range(min(len(words), MAX_WORD_STARTS))]
+
+    def set_job(self, job_id, entry):
+        old = self.jobs.pop(job_id, None)
+        if old == entry:
+            if entry is not None:
+                self.jobs[job_id] = entry
+            return
+        if old is not None:
+            employer_id, title, location = old
+            self._add('title', title, -1)
+            self._add('location', location, -1)
+            self.employer_jobs[employer_id] -= 1
+            self._add('company', self.companies.get(employer_id, ''), -1)
+        if entry is not None:
+            employer_id, title, location = entry
+            self.jobs[job_id] = entry
+            self._add('title', title, 1)
+            self._add('location', location, 1)
+            self.employer_jobs[employer_id] += 1
+            self._add('company', self.companies.get(employer_id, ''), 1)
+        self._results.clear()
+
+    def set_company(self, employer_id, name):
+        # Đổi tên công ty: chuyển số job active của nhà tuyển dụng sang tên mới
+        name = (name or '').strip() or None
+        old = self.companies.get(employer_id)
+        if old == name:
+            return
+        count = self.employer_jobs.get(employer_id, 0)
+        if old is not None:
+            self._add('company', old, -count)
+        if name is None:
+            self.companies.pop(employer_id, None)
+        else:
+            self.companies[employer_id] = name
+            self._add('company', name, count)
+        self._results.clear()
+
+    def _load(self, since=None):
+        jobs = db.session.query(Job).options(load_only(Job.id, Job.status, Job.title, Job.location,
+                                                       Job.employer_id))
+        employers = db.session.query(Employer.id, Employer.company_name)
+        if since is None:
+            jobs = jobs.filter(Job.status == JobStatus.active)
+        else:
+            jobs = jobs.filter(Job.updated_at >= since)
+            employers = employers.filter(Employer.updated_at >= since)
+
+        self._bulk = since is None
+        try:
+            for employer_id, name in employers:
+                self.set_company(employer_id, name)
+            for job in jobs.yield_per(LOAD_BATCH_SIZE):
+                self.set_job(job.id, job_entry(job))
+        finally:
+            if self._bulk:
+                self.keys.sort()
+                self._bulk = False
+
+    def _remove_deleted(self):
+        # Job bị xóa hẳn ở worker khác không còn dòng nào để đồng bộ theo updated_at (như facets)
+        active = {job_id for (job_id,) in db.session.query(Job.id).filter(Job.status == JobStatus.active)}
+        for job_id in [job_id for job_id in self.jobs if job_id not in active]:
+            self.set_job(job_id, None)
+
+    def ensure_fresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.loaded and now - self._checked_at < current_app.config["AUTOCOMPLETE_SYNC_SECONDS"]:
+                return
+            started = datetime.utcnow()
+            if not self.loaded:
+                self._reconciled_at = now
+            elif now - self._reconciled_at >= current_app.config["AUTOCOMPLETE_RECONCILE_SECONDS"]:
+                self._remove_deleted()
+                self._reconciled_at = now
+            self._load(since=self._synced_at - SYNC_OVERLAP if self.loaded else None)
+            self.loaded = True
+            self._synced_at = started
+            self._checked_at = now
+
+    def apply(self, jobs=None, companies=None):
+        with self._lock:
+            if not self.loaded:
+                return
+            for employer_id, name in (companies or {}).items():
+                self.set_company(employer_id, name)
+            for job_id, entry in (jobs or {}).items():
+                self.set_job(job_id, entry)
+
+    def _search(self, prefix, kinds, limit):
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            matches = {(kind, key): count for (kind, key), count in self.short.get(prefix, {}).items()
+                       if kind in kinds}
+        else:
+            matches = {}
+            i = bisect.bisect_left(self.keys, (prefix,))
+            end = min(len(self.keys), i + MAX_SCAN)
+            while i < end and self.keys[i][0].startswith(prefix):
+                _, kind, key = self.keys[i]
+                if kind in kinds:
+                    matches[kind, key] = sum(self.labels[kind][key].values())
+                i += 1
+        # Phổ biến trước; cùng độ phổ biến thì cụm bắt đầu bằng tiền tố và ngắn hơn lên trước
+        ranked = heapq.nsmallest(limit, matches.items(),
+                                 key=lambda item: (-item[1], not item[0][1].startswith(prefix),
+                                                   len(item[0][1]), item[0][1]))
+        return [{'text': self.labels[kind][key].most_common(1)[0][0], 'type': kind, 'count': count}
+                for (kind, key), count in ranked]
+
+    def suggest(self, query, kinds=KINDS, limit=10):
+        prefix = phrase_key(query)
+        if not prefix:
+            return []
+        # Tiền tố kết thúc bằng khoảng trắng ("ke ") chỉ khớp từ tiếp theo
+        if query[-1:].isspace():
+            prefix += ' '
+        kinds = tuple(kind for kind in KINDS if kind in kinds)
+        self.ensure_fresh()
+        with self._lock:
+            cache_key = (prefix, kinds, limit)
+            result = self._results.get(cache_key)
+            if result is None:
+                result = self._results[cache_key] = self._search(prefix, kinds, limit)
+                while len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+            else:
+                self._results.move_to_end(cache_key)
+            return result
+
+    def reset(self):
+        with self._lock:
+            self.__init__()
+
+
+index = PrefixIndex()
+
+
+def init_app(app):
+    app.config.setdefault("AUTOCOMPLETE_SYNC_SECONDS", int(os.environ.get("AUTOCOMPLETE_SYNC_SECONDS", 30)))
+    app.config.setdefault("AUTOCOMPLETE_RECONCILE_SECONDS",
+                          int(os.environ.get("AUTOCOMPLETE_RECONCILE_SECONDS", 300)))
+    # Trình duyệt/CDN giữ kết quả gợi ý trong khoảng này
+    app.config.setdefault("AUTOCOMPLETE_MAX_AGE", int(os.environ.get("AUTOCOMPLETE_MAX_AGE", 300)))
+    index.reset()
+
+
+# Cập nhật chỉ mục sau commit (tạo/sửa/đóng/xóa job, đổi tên công ty, admin); rollback thì bỏ qua
+def _changed(obj, attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_autocomplete_changes(session, flush_context):
+    if not index.loaded:
+        return
+    jobs, companies = session.info.setdefault('autocomplete_changes', ({}, {}))
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Job) and (obj in session.new or _changed(obj, _JOB_ATTRS)):
+            jobs[obj.id] = job_entry(obj)
+        elif isinstance(obj, Employer) and (obj in session.new or _changed(obj, ('company_name',))):
+            companies[obj.id] = obj.company_name
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            jobs[obj.id] = None
+        elif isinstance(obj, Employer):
+            companies[obj.id] = None
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_after_commit(session):
+    changes = session.info.pop('autocomplete_changes', None)
+    if changes:
+        index.apply(*changes)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('autocomplete_changes', None)
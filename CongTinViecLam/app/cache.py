@@ -0,0 +1,172 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Job, Employer
+
+# Tag của các truy vấn đọc phụ thuộc bảng jobs/employers
+JOBS_TAG = 'jobs'
+
+
+class MemoryBackend:
+    # LRU trong tiến trình, mỗi mục có thời điểm hết hạn riêng
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._versions = {}  # Không nằm trong LRU để không bị đẩy ra
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def version(self, tag):
+        return self._versions.get(tag, 0)
+
+    def incr_version(self, tag):
+        with self._lock:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._redis.get(key)
+        return None if raw is None else (None, pickle.loads(raw))
+
+    def set(self, key, value, ttl):
+        self._redis.set(key, pickle.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self._redis.delete(key)
+
+    def version(self, tag):
+        return int(self._redis.get('tag:' + tag) or 0)
+
+    def incr_version(self, tag):
+        self._redis.incr('tag:' + tag)
+
+    def clear(self):
+        for key in self._redis.scan_iter('cache:*'):
+            self._redis.delete(key)
+
+
+class Cache:
+    # Khóa cache gắn với phiên bản của từng tag; invalidate(tag) chỉ cần tăng phiên bản,
+    # các mục cũ tự hết hạn theo TTL/LRU. Cách này dùng được cả khi backend là Redis.
+    def __init__(self, backend, default_ttl):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name, field):
+        with self._lock:
+            stats = self._stats.setdefault(name, {'hits': 0, 'misses': 0, 'invalidations': 0})
+            stats[field] += 1
+
+    def _key(self, name, tags):
+        versions = ','.join('%s=%s' % (tag, self.backend.version(tag)) for tag in tags)
+        return 'cache:%s:%s' % (name, versions)
+
+    def get_or_set(self, name, loader, ttl=None, tags=(), stats_name=None):
+        # stats_name: gộp thống kê của nhiều khóa cùng loại (vd. mọi thẻ job) vào một dòng
+        key = self._key(name, tags)
+        entry = self.backend.get(key)
+        if entry is not None:
+            self._count(stats_name or name, 'hits')
+            return entry[1]
+
+        self._count(stats_name or name, 'misses')
+        value = loader()
+        self.backend.set(key, value, ttl or self.default_ttl)
+        return value
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.incr_version(tag)
+            self._count('tag:' + tag, 'invalidations')
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                lookups = stats['hits'] + stats['misses']
+                result[name] = dict(stats, hit_rate=stats['hits'] / lookups if lookups else None)
+            return result
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self._stats.clear()
+
+
+def _make_backend(config):
+    if config["CACHE_REDIS_URL"]:
+        return RedisBackend(config["CACHE_REDIS_URL"])
+    return MemoryBackend(config["CACHE_MAX_ENTRIES"])
+
+
+cache = Cache(MemoryBackend(1024), 300)
+
+
+# Ghi nhận thay đổi job trong lúc flush, chỉ xóa cache sau khi commit thành công
+# (route trong index.py, /api/jobs lẫn JobView của admin đều đi qua đây)
+@event.listens_for(db.session, 'after_flush')
+def _track_job_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Job, Employer)):
+            session.info['jobs_changed'] = True
+            return
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('jobs_changed', False):
+        cache.invalidate(JOBS_TAG)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('jobs_changed', None)
+
+
+def init_app(app):
+    app.config.setdefault("CACHE_DEFAULT_TTL", int(os.environ.get("CACHE_DEFAULT_TTL", 300)))
+    app.config.setdefault("CACHE_MAX_ENTRIES", int(os.environ.get("CACHE_MAX_ENTRIES", 1024)))
+    # Đặt CACHE_REDIS_URL để dùng chung cache giữa các worker (cần cài thêm gói redis)
+    app.config.setdefault("CACHE_REDIS_URL", os.environ.get("CACHE_REDIS_URL"))
+
+    cache.backend = _make_backend(app.config)
+    cache.default_ttl = app.config["CACHE_DEFAULT_TTL"]
@@ -0,0 +1,47 @@
+import hashlib
+import os
+
+from flask import current_app, request, session
+from werkzeug.http import is_resource_modified
+
+# Conditional GET: route tính ETag/Last-Modified từ một truy vấn rẻ (chỉ các cột updated_at...),
+# nếu client đã có bản mới nhất thì trả 304 trước khi nạp đủ dữ liệu hay render template
+
+
+def make_etag(*parts):
+    # ETag mạnh: cùng nội dung thì cùng ETag. ETAG_VERSION đổi khi deploy giao diện mới
+    raw = '|'.join(str(part) for part in (current_app.config["ETAG_VERSION"],) + parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _set_validators(response, etag, last_modified, per_user):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if per_user:
+        # Nội dung phụ thuộc người đăng nhập: chỉ trình duyệt được giữ, và phải hỏi lại server mỗi lần
+        response.cache_control.private = True
+        response.vary.add('Cookie')
+    else:
+        # Giống nhau với mọi người: CDN/proxy dùng chung được, vẫn hỏi lại server bằng ETag
+        response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def respond(etag, last_modified, render, per_user=True):
+    # render() chỉ được gọi khi client chưa có bản mới nhất. per_user=False cho nội dung công khai:
+    # ETag không được chứa id người dùng và render() không được đọc session
+    if per_user and session.get('_flashes'):
+        # Trang còn thông báo flash chưa hiển thị: render bình thường để không làm mất thông báo
+        return render()
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return _set_validators(current_app.response_class(status=304), etag, last_modified, per_user)
+    response = current_app.make_response(render())
+    if response.status_code == 200:
+        _set_validators(response, etag, last_modified, per_user)
+    return response
+
+
+def init_app(app):
+    app.config.setdefault("ETAG_VERSION", os.environ.get("APP_VERSION", "1"))
@@ -0,0 +1,86 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import or_
+
+from app import db
+from app.models import CV, CVExperience, CVEducation
+
+# Giới hạn theo độ dài cột, None = Text
+EXPERIENCE_FIELDS = {'company': 255, 'position': 255, 'period': 50, 'description': None}
+EDUCATION_FIELDS = {'school': 255, 'degree': 255, 'period': 50, 'description': None}
+
+
+def _clean(value, max_length):
+    value = (value or '').strip()
+    if max_length:
+        value = value[:max_length]
+    return value or None
+
+
+def _build(model, fields, key_field, rows):
+    # Bỏ dòng trống (không có tên công ty/trường), giữ thứ tự người dùng nhập
+    items = []
+    for row in rows:
+        data = {field: _clean(value, fields[field]) for field, value in zip(fields, row)}
+        if data[key_field]:
+            items.append(model(sort_order=len(items), **data))
+    return items
+
+
+def experiences_from_form(form):
+    return _build(CVExperience, EXPERIENCE_FIELDS, 'company',
+                  zip(form.getlist("company[]"), form.getlist("position[]"),
+                      form.getlist("period[]"), form.getlist("description[]")))
+
+
+def educations_from_form(form):
+    return _build(CVEducation, EDUCATION_FIELDS, 'school',
+                  zip(form.getlist("school[]"), form.getlist("degree[]"),
+                      form.getlist("edu_period[]"), form.getlist("edu_description[]")))
+
+
+def _split_legacy(value):
+    # Định dạng cũ: a|b|period|description|||...; mô tả có thể chứa '|' nên chỉ tách 3 lần
+    rows = []
+    for entry in (value or '').split('|||'):
+        if entry.strip():
+            parts = entry.split('|', 3)
+            rows.append(parts + [''] * (4 - len(parts)))
+    return rows
+
+
+def convert_legacy(cv):
+    cv.experiences = _build(CVExperience, EXPERIENCE_FIELDS, 'company', _split_legacy(cv.experience))
+    cv.educations = _build(CVEducation, EDUCATION_FIELDS, 'school', _split_legacy(cv.education))
+    cv.experience = None
+    cv.education = None
+
+
+def migrate_legacy(batch_size=500):
+    # Chuyển từng lô theo id, mỗi lô một transaction; chạy lại nhiều lần cũng không sao
+    # vì CV đã chuyển có experience/education = NULL
+    converted = 0
+    last_id = 0
+    while True:
+        cvs = CV.query.filter(CV.id > last_id, or_(CV.experience.isnot(None), CV.education.isnot(None))) \
+            .order_by(CV.id).limit(batch_size).all()
+        if not cvs:
+            return converted
+        for cv in cvs:
+            convert_legacy(cv)
+        last_id = cvs[-1].id
+        converted += len(cvs)
+        db.session.commit()
+        db.session.expunge_all()
+
+
+@click.command('cv-migrate')
+@click.option('--batch-size', default=500, show_default=True)
+@with_appcontext
+def cv_migrate_command(batch_size):
+    converted = migrate_legacy(batch_size)
+    click.echo('Đã chuyển %d CV sang cv_experiences/cv_educations' % converted)
+
+
+def init_app(app):
+    app.cli.add_command(cv_migrate_command)
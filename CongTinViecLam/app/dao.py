@@ -1,10 +1,20 @@
 import hashlib
 import json
-from app import db, app
-from app.models import User, Candidate, Employer, UserRole
+from sqlalchemy import func, update, select, and_, bindparam, null, String
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager, aliased
+
+from app import db, outbox
+from app.cache import cache, JOBS_TAG
+from app.models import User, Candidate, Employer, UserRole, Job, JobStatus, Application, CV, CVExperience, CVEducation, \
+    JOB_LISTING, CV_LISTING
+
+APPLICATION_STATUSES = ('pending', 'reviewed', 'accepted', 'rejected')
 
 
 def auth_user(username, password):
+    if not isinstance(password, str):
+        return None
     user = User.query.filter_by(username=username).first()
     password = str(hashlib.md5(password.encode('utf-8')).hexdigest())
 
@@ -42,6 +52,276 @@ def register_user(username, password, role, **kwargs):
     return user
 
 
+# TRANG CHỦ: danh sách job mới nhất được cache, tự xóa khi có job thay đổi
+def _load_recent_jobs(limit):
+    rows = db.session.query(Job.id, Job.title, Job.location, Job.salary, Employer.company_name) \
+        .join(Employer, Employer.id == Job.employer_id) \
+        .filter(Job.status == JobStatus.active) \
+        .order_by(Job.posted_date.desc(), Job.id.desc()) \
+        .limit(limit).all()
+    return [{
+        'id': row.id,
+        'title': row.title,
+        'location': row.location,
+        'salary': row.salary,
+        'company': row.company_name,
+    } for row in rows]
+
+
+def recent_jobs(limit=10):
+    return cache.get_or_set('recent_jobs:%d' % limit, lambda: _load_recent_jobs(limit), tags=(JOBS_TAG,))
+
+
+# DASHBOARD NHÀ TUYỂN DỤNG: số lượng cố định câu truy vấn GROUP BY, không phụ thuộc số job
+def employer_job_stats(employer_id):
+    job_counts = {status.value: 0 for status in JobStatus}
+    rows = db.session.query(Job.status, func.count(Job.id)) \
+        .filter(Job.employer_id == employer_id) \
+        .group_by(Job.status).all()
+    for status, count in rows:
+        if status is not None:
+            job_counts[status.value] = count
+
+    application_counts = dict.fromkeys(APPLICATION_STATUSES, 0)
+    rows = db.session.query(Application.status, func.count(Application.id)) \
+        .join(Job, Job.id == Application.job_id) \
+        .filter(Job.employer_id == employer_id) \
+        .group_by(Application.status).all()
+    for status, count in rows:
+        application_counts[status or 'pending'] += count
+
+    return {
+        'total_jobs': sum(job_counts.values()),
+        'jobs': job_counts,
+        'total_applications': sum(application_counts.values()),
+        'applications': application_counts,
+    }
+
+
+def application_counts_by_job(job_ids):
+    counts = {job_id: dict.fromkeys(APPLICATION_STATUSES + ('total',), 0) for job_id in job_ids}
+    if not job_ids:
+        return counts
+
+    rows = db.session.query(Application.job_id, Application.status, func.count(Application.id)) \
+        .filter(Application.job_id.in_(job_ids)) \
+        .group_by(Application.job_id, Application.status).all()
+    for job_id, status, count in rows:
+        counts[job_id][status or 'pending'] += count
+        counts[job_id]['total'] += count
+    return counts
+
+
+def employer_jobs_page(employer_id, page=1, per_page=20, total=None):
+    # total lấy từ employer_job_stats để khỏi chạy thêm COUNT(*)
+    jobs = Job.query.options(*JOB_LISTING).filter_by(employer_id=employer_id) \
+        .order_by(Job.posted_date.desc(), Job.id.desc()) \
+        .paginate(page=page, per_page=per_page, count=total is None)
+    if total is not None:
+        jobs.total = total
+    return jobs, application_counts_by_job([job.id for job in jobs.items])
+
+
+# DASHBOARD ỨNG VIÊN
+def candidate_applications(candidate_id):
+    return Application.query.filter_by(candidate_id=candidate_id).order_by(Application.applied_date.desc()).all()
+
+
+def candidate_cvs(candidate_id):
+    return CV.query.options(*CV_LISTING).filter_by(candidate_id=candidate_id).all()
+
+
+# DANH SÁCH ỨNG VIÊN CỦA MỘT JOB
+APPLICATION_SORTS = {
+    'newest': (Application.applied_date.desc(), Application.id.desc()),
+    'oldest': (Application.applied_date.asc(), Application.id.asc()),
+    'name': (Candidate.full_name.asc(), Application.id.asc()),
+}
+
+
+def job_applications_page(job_id, status=None, sort='newest', page=1, per_page=20, counts=None):
+    # Nạp ứng viên và tiêu đề CV trong cùng một câu JOIN thay vì lazy load từng dòng
+    query = Application.query \
+        .join(Application.candidate) \
+        .join(Application.cv) \
+        .options(contains_eager(Application.candidate),
+                 contains_eager(Application.cv).load_only(CV.id, CV.title)) \
+        .filter(Application.job_id == job_id)
+    if status in APPLICATION_STATUSES:
+        query = query.filter(Application.status == status)
+
+    query = query.order_by(*APPLICATION_SORTS.get(sort, APPLICATION_SORTS['newest']))
+
+    # counts lấy từ application_counts_by_job để khỏi chạy thêm COUNT(*)
+    applications = query.paginate(page=page, per_page=per_page, count=counts is None)
+    if counts is not None:
+        applications.total = counts[status] if status in APPLICATION_STATUSES else counts['total']
+    return applications
+
+
+def applied_cv_ids(job_id):
+    return {cv_id for (cv_id,) in db.session.query(Application.cv_id).filter_by(job_id=job_id)}
+
+
+# TÌM CV THEO KINH NGHIỆM / HỌC VẤN: lọc bằng EXISTS trên bảng con, không tách chuỗi trong Python
+def _overlaps(model, year_from, year_to):
+    # Khoảng [period_start, period_end] giao với [year_from, year_to]; period_end NULL = đến nay
+    conditions = []
+    if year_to is not None:
+        conditions.append(model.period_start <= year_to)
+    if year_from is not None:
+        conditions.append(db.or_(model.period_end.is_(None), model.period_end >= year_from))
+    if conditions:
+        conditions.append(model.period_start.isnot(None))
+    return conditions
+
+
+def filter_cvs(query=None, company=None, position=None, school=None, degree=None,
+               year_from=None, year_to=None):
+    # Các trường văn bản so khớp một phần (LIKE). Khoảng năm áp dụng cho chính dòng kinh nghiệm
+    # thỏa điều kiện ("từng làm ở FPT trong 2019-2021"); nếu chỉ lọc học vấn thì áp cho học vấn
+    query = query if query is not None else CV.query
+
+    experience = [column.contains(value, autoescape=True)
+                  for column, value in ((CVExperience.company, company), (CVExperience.position, position)) if value]
+    education = [column.contains(value, autoescape=True)
+                 for column, value in ((CVEducation.school, school), (CVEducation.degree, degree)) if value]
+
+    if education and not experience:
+        education += _overlaps(CVEducation, year_from, year_to)
+    else:
+        experience += _overlaps(CVExperience, year_from, year_to)
+
+    if experience:
+        query = query.filter(CV.experiences.any(db.and_(*experience)))
+    if education:
+        query = query.filter(CV.educations.any(db.and_(*education)))
+    return query
+
+
+# DUYỆT NHIỀU HỒ SƠ CÙNG LÚC
+REVIEW_STATUSES = ('reviewed', 'accepted', 'rejected')
+MAX_REVIEW_BATCH = 1000
+
+
+def review_applications(employer_id, application_ids, status):
+    # Một câu JOIN kiểm tra quyền sở hữu cho cả danh sách, một câu UPDATE cho các hồ sơ hợp lệ
+    application_ids = list(dict.fromkeys(application_ids))
+    owned = {row.id: row for row in db.session.query(Application.id, Application.job_id,
+                                                     Application.candidate_id, Application.status)
+             .join(Job, Job.id == Application.job_id)
+             .filter(Application.id.in_(application_ids), Job.employer_id == employer_id)}
+
+    updated = [app_id for app_id in application_ids if app_id in owned]
+    rejected = [app_id for app_id in application_ids if app_id not in owned]
+    if updated:
+        db.session.execute(update(Application)
+                           .where(Application.id.in_(updated))
+                           .values(status=status)
+                           .execution_options(synchronize_session='evaluate'))
+        # UPDATE của Core không đi qua flush nên tự ghi event vào outbox trong cùng transaction
+        outbox.publish(db.session.connection(), 'application.reviewed', [
+            {'application_id': row.id, 'job_id': row.job_id, 'candidate_id': row.candidate_id,
+             'status': status, 'previous_status': row.status}
+            for row in (owned[app_id] for app_id in updated) if row.status != status])
+        db.session.commit()
+    return updated, rejected
+
+
+# Một câu LEFT JOIN lấy đủ dữ liệu để kiểm tra lần nộp: ứng viên của user, job còn tuyển, CV thuộc ứng viên,
+# hồ sơ đã nộp cho job này và hồ sơ đã nộp bằng cùng Idempotency-Key (key NULL không khớp dòng nào).
+# Dựng sẵn một lần: tạo alias và câu lệnh ORM mỗi request tốn hơn cả thời gian chạy truy vấn
+_existing = aliased(Application)
+_keyed = aliased(Application)
+_APPLY_CHECK = select(Candidate.id.label('candidate_id'), Job.id.label('job_id'), CV.id.label('cv_id'),
+                      _existing.id.label('existing_id'), _keyed.id.label('keyed_id'),
+                      _keyed.job_id.label('keyed_job_id'), _keyed.cv_id.label('keyed_cv_id')) \
+    .select_from(Candidate) \
+    .outerjoin(Job, and_(Job.id == bindparam('job_id'), Job.status == JobStatus.active)) \
+    .outerjoin(CV, and_(CV.id == bindparam('cv_id'), CV.candidate_id == Candidate.id)) \
+    .outerjoin(_existing, and_(_existing.job_id == bindparam('job_id'), _existing.candidate_id == Candidate.id)) \
+    .outerjoin(_keyed, and_(_keyed.candidate_id == Candidate.id,
+                            _keyed.idempotency_key == bindparam('key', type_=String))) \
+    .where(Candidate.user_id == bindparam('user_id')) \
+    .limit(1)
+
+
+def submit_application(user_id, job_id, cv_id, idempotency_key=None, _retried=False):
+    # Trả về (kết quả, application_id) với kết quả là một trong:
+    # created, replayed, no_candidate, job_unavailable, cv_not_found, duplicate, key_conflict
+    row = db.session.execute(_APPLY_CHECK, {'user_id': user_id, 'job_id': job_id, 'cv_id': cv_id,
+                                            'key': idempotency_key}).first()
+
+    if row is None:
+        return 'no_candidate', None
+    if row.keyed_id is not None:
+        # Cùng key nhưng khác nội dung là lỗi của client, không được coi là gửi lại
+        if (row.keyed_job_id, row.keyed_cv_id) == (job_id, cv_id):
+            return 'replayed', row.keyed_id
+        return 'key_conflict', row.keyed_id
+    if row.job_id is None:
+        return 'job_unavailable', None
+    if row.cv_id is None:
+        return 'cv_not_found', None
+    if row.existing_id is not None:
+        return 'duplicate', row.existing_id
+
+    application = Application(job_id=job_id, candidate_id=row.candidate_id, cv_id=cv_id,
+                              idempotency_key=idempotency_key)
+    try:
+        db.session.add(application)
+        db.session.flush()
+        application_id = application.id
+        db.session.commit()
+    except IntegrityError:
+        # Hai request (thường là client gửi lại) chạy song song: request thua đọc lại kết quả của request thắng
+        db.session.rollback()
+        if _retried:
+            raise
+        return submit_application(user_id, job_id, cv_id, idempotency_key, _retried=True)
+    return 'created', application_id
+
+
+# API đọc job: chỉ SELECT các cột được yêu cầu, join employers khi cần tên công ty
+def job_rows_query(columns, with_employer=False):
+    query = db.session.query(*columns).select_from(Job)
+    if with_employer:
+        query = query.join(Employer, Employer.id == Job.employer_id)
+    return query
+
+
+def job_row(job_id, columns, with_employer=False):
+    return job_rows_query(columns, with_employer) \
+        .filter(Job.id == job_id, Job.status == JobStatus.active) \
+        .first()
+
+
+# Phiên bản nội dung cho conditional GET: chỉ đọc các cột nhỏ, không nạp mô tả/nội dung CV
+def job_detail_version(job_id, candidate_id=None):
+    # Trang chi tiết job hiển thị cả thông tin công ty và trạng thái "đã ứng tuyển" của ứng viên
+    if candidate_id:
+        applied_date = db.session.query(Application.applied_date) \
+            .filter(Application.job_id == Job.id, Application.candidate_id == candidate_id) \
+            .correlate(Job).scalar_subquery()
+    else:
+        applied_date = null()
+    return db.session.query(Job.updated_at, Job.status, Employer.company_name, Employer.company_address,
+                            Employer.contact_person, applied_date.label('applied_date')) \
+        .join(Employer, Employer.id == Job.employer_id) \
+        .filter(Job.id == job_id) \
+        .first()
+
+
+def cv_version(cv_id):
+    return db.session.query(CV.updated_at).filter(CV.id == cv_id).scalar()
+
+
+def candidate_cvs_version(candidate_id):
+    # Số CV và tổng id đổi khi thêm/xóa CV, max(updated_at) đổi khi sửa
+    return db.session.query(func.count(CV.id), func.max(CV.updated_at), func.sum(CV.id)) \
+        .filter(CV.candidate_id == candidate_id).one()
+
+
 if __name__ == "__main__":
     print("test")
     print(auth_user("user", "123"))
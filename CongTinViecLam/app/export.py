@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Application, Job, Candidate, CV
+
+# Số dòng đọc mỗi lần từ cursor phía server và số dòng gom lại trước khi gửi một đoạn
+YIELD_PER = 1000
+CHUNK_ROWS = 200
+
+EXPORT_COLUMNS = (
+    Application.id.label('application_id'),
+    Application.status.label('status'),
+    Application.applied_date.label('applied_date'),
+    Job.id.label('job_id'),
+    Job.title.label('job_title'),
+    Candidate.full_name.label('full_name'),
+    Candidate.email.label('email'),
+    Candidate.phone.label('phone'),
+    Candidate.address.label('address'),
+    CV.id.label('cv_id'),
+    CV.title.label('cv_title'),
+    CV.position.label('cv_position'),
+    CV.skills.label('cv_skills'),
+    CV.objective.label('cv_objective'),
+)
+FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+
+def export_rows(employer_id, job_id=None, status=None):
+    # Một câu JOIN chỉ lấy cột cần thiết, đọc dần qua cursor phía server (SSCursor với PyMySQL).
+    # Là generator nên câu truy vấn chỉ chạy khi bắt đầu đọc, sau khi phần đầu file đã được gửi
+    query = select(*EXPORT_COLUMNS) \
+        .join(Job, Job.id == Application.job_id) \
+        .join(Candidate, Candidate.id == Application.candidate_id) \
+        .join(CV, CV.id == Application.cv_id) \
+        .where(Job.employer_id == employer_id) \
+        .order_by(Application.id) \
+        .execution_options(yield_per=YIELD_PER)
+    if job_id is not None:
+        query = query.where(Application.job_id == job_id)
+    if status:
+        query = query.where(Application.status == status)
+
+    result = db.session.execute(query)
+    try:
+        yield from result
+    finally:
+        # Người dùng hủy tải giữa chừng thì đóng cursor ngay
+        result.close()
+
+
+def _value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _csv_cell(value):
+    value = _value(value)
+    # Chặn công thức khi mở bằng Excel (CSV injection)
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def _chunks(rows, format_row, header=''):
+    # Gửi phần đầu ngay, sau đó gom CHUNK_ROWS dòng mỗi lần để không yield từng dòng nhỏ
+    if header:
+        yield header
+    buffer = []
+    for row in rows:
+        buffer.append(format_row(row))
+        if len(buffer) >= CHUNK_ROWS:
+            yield ''.join(buffer)
+            buffer.clear()
+    if buffer:
+        yield ''.join(buffer)
+
+
+def csv_stream(rows):
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def format_row(row):
+        out.seek(0)
+        out.truncate()
+        writer.writerow([_csv_cell(value) for value in row])
+        return out.getvalue()
+
+    # BOM để Excel nhận đúng UTF-8 tiếng Việt
+    return _chunks(rows, format_row, header='\ufeff' + format_row(FIELDS))
+
+
+def ndjson_stream(rows):
+    def format_row(row):
+        return json.dumps({field: _value(value) for field, value in zip(FIELDS, row)},
+                          ensure_ascii=False, default=str) + '\n'
+
+    return _chunks(rows, format_row)
+
+
+FORMATS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_stream, 'application/x-ndjson; charset=utf-8'),
+}
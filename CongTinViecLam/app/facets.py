@@ -0,0 +1,360 @@
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event, inspect, or_, and_
+from sqlalchemy.orm import load_only
+
+from app import db, search
+from app.cache import cache, JOBS_TAG
+from app.models import Job, JobStatus
+
+# (tên, nhãn) theo thứ tự hiển thị; tham số trên URL là f_<tên>, chọn nhiều giá trị trong một nhóm là OR,
+# giữa các nhóm là AND
+FACETS = (
+    ('location', 'Địa điểm'),
+    ('work_type', 'Hình thức làm việc'),
+    ('experience_level', 'Kinh nghiệm'),
+    ('salary_band', 'Mức lương'),
+)
+PARAM_PREFIX = 'f_'
+WORK_TYPE_LABELS = {
+    'fulltime': 'Toàn thời gian',
+    'parttime': 'Bán thời gian',
+    'remote': 'Làm từ xa',
+    'hybrid': 'Kết hợp',
+    'contract': 'Hợp đồng',
+}
+EXPERIENCE_LABELS = {
+    'intern': 'Thực tập sinh',
+    'fresher': 'Mới tốt nghiệp',
+    'junior': 'Junior',
+    'mid': 'Middle',
+    'senior': 'Senior',
+    'manager': 'Quản lý',
+}
+# (giá trị, nhãn, từ, đến) theo triệu đồng, khoảng [từ, đến)
+SALARY_BANDS = (
+    ('duoi-10', 'Dưới 10 triệu', None, 10),
+    ('10-15', '10 - 15 triệu', 10, 15),
+    ('15-20', '15 - 20 triệu', 15, 20),
+    ('20-30', '20 - 30 triệu', 20, 30),
+    ('30-50', '30 - 50 triệu', 30, 50),
+    ('tren-50', 'Trên 50 triệu', 50, None),
+)
+NEGOTIABLE = 'thoa-thuan'
+SALARY_LABELS = dict([(band[0], band[1]) for band in SALARY_BANDS] + [(NEGOTIABLE, 'Thỏa thuận')])
+MILLION = 1000000
+# Nhóm địa điểm chỉ hiện các giá trị nhiều job nhất (và các giá trị đang chọn)
+MAX_LOCATION_VALUES = 10
+SYNC_OVERLAP = timedelta(seconds=5)
+LOAD_BATCH_SIZE = 1000
+_FACET_ATTRS = ('status', 'location', 'work_type', 'experience_level', 'salary')
+
+
+def salary_band(salary):
+    if salary is None:
+        return NEGOTIABLE
+    millions = float(salary) / MILLION
+    for value, _, low, high in SALARY_BANDS:
+        if (low is None or millions >= low) and (high is None or millions < high):
+            return value
+
+
+def location_key(location):
+    # "Hà Nội", "Ha Noi", "hà  nội" là cùng một giá trị
+    return ' '.join(search.tokenize(location)) or None
+
+
+def _code(value):
+    value = (value or '').strip().lower()
+    return value or None
+
+
+def job_entry(job):
+    # Giá trị của job trong từng nhóm và chuỗi địa điểm gốc; None nếu job không active
+    status = job.status.value if isinstance(job.status, JobStatus) else job.status
+    if status != JobStatus.active.value:
+        return None
+    values = {
+        'location': location_key(job.location),
+        'work_type': _code(job.work_type),
+        'experience_level': _code(job.experience_level),
+        'salary_band': salary_band(job.salary),
+    }
+    return values, (job.location or '').strip()
+
+
+def bitmap_from_ids(ids):
+    # Bật từng bit trong bytearray rồi đổi sang int một lần; `bitmap |= 1 << id` tạo lại cả số nguyên
+    # lớn ở mỗi bước nên tốn thời gian bậc hai theo số job
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for job_id in ids:
+        buffer[job_id >> 3] |= 1 << (job_id & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _toggled(selected, facet, value):
+    params = {PARAM_PREFIX + name: list(values) for name, values in selected.items()}
+    values = params.setdefault(PARAM_PREFIX + facet, [])
+    if value in values:
+        values.remove(value)
+    else:
+        values.append(value)
+    return params
+
+
+class FacetIndex:
+    # Bitmap theo từng giá trị của từng nhóm: bit thứ job_id bật nếu job (đang active) có giá trị đó.
+    # Đếm một nhóm trên tập kết quả = AND bitmap rồi đếm bit, không cần GROUP BY trên bảng jobs.
+    # Giống matching.Matcher: thay đổi trong tiến trình áp ngay sau commit, thay đổi từ worker khác
+    # được đồng bộ theo updated_at mỗi FACETS_SYNC_SECONDS
+    def __init__(self):
+        self.bitmaps = {facet: {} for facet, _ in FACETS}
+        self.all = 0
+        self.rows = {}
+        # Khóa địa điểm -> các chuỗi gốc trong bảng jobs (để lọc bằng SQL và chọn nhãn hiển thị)
+        self.location_labels = {}
+        self.loaded = False
+        self._synced_at = None
+        self._checked_at = 0
+        self._reconciled_at = 0
+        self._lock = threading.RLock()
+
+    def set_job(self, job_id, entry):
+        self.remove_job(job_id)
+        if entry is None:
+            return
+        values, location = entry
+        bit = 1 << job_id
+        self.rows[job_id] = entry
+        self.all |= bit
+        for facet, value in values.items():
+            if value is not None:
+                bitmaps = self.bitmaps[facet]
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+        if values['location'] is not None:
+            self.location_labels.setdefault(values['location'], Counter())[location] += 1
+
+    def remove_job(self, job_id):
+        entry = self.rows.pop(job_id, None)
+        if entry is None:
+            return
+        values, location = entry
+        mask = ~(1 << job_id)
+        self.all &= mask
+        for facet, value in values.items():
+            if value is None:
+                continue
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] &= mask
+            if not bitmaps[value]:
+                del bitmaps[value]
+        if values['location'] is not None:
+            labels = self.location_labels[values['location']]
+            labels[location] -= 1
+            if labels[location] <= 0:
+                del labels[location]
+            if not labels:
+                del self.location_labels[values['location']]
+
+    def _load(self, since=None):
+        jobs = db.session.query(Job).options(load_only(Job.id, Job.status, Job.location, Job.work_type,
+                                                       Job.experience_level, Job.salary))
+        if since is not None:
+            for job in jobs.filter(Job.updated_at >= since).yield_per(LOAD_BATCH_SIZE):
+                self.set_job(job.id, job_entry(job))
+            return
+
+        # Nạp lần đầu: gom id theo từng giá trị rồi dựng mỗi bitmap một lần
+        ids = {facet: {} for facet, _ in FACETS}
+        for job in jobs.filter(Job.status == JobStatus.active).yield_per(LOAD_BATCH_SIZE):
+            entry = self.rows[job.id] = job_entry(job)
+            values, location = entry
+            for facet, value in values.items():
+                if value is not None:
+                    ids[facet].setdefault(value, []).append(job.id)
+            if values['location'] is not None:
+                self.location_labels.setdefault(values['location'], Counter())[location] += 1
+        self.all = bitmap_from_ids(self.rows)
+        self.bitmaps = {facet: {value: bitmap_from_ids(job_ids) for value, job_ids in by_value.items()}
+                        for facet, by_value in ids.items()}
+
+    def _remove_deleted(self):
+        # Job bị xóa hẳn ở worker khác không còn dòng nào để đồng bộ theo updated_at: so với tập id
+        # job active (đọc trên index status, không đọc dòng)
+        active = {job_id for (job_id,) in db.session.query(Job.id).filter(Job.status == JobStatus.active)}
+        for job_id in [job_id for job_id in self.rows if job_id not in active]:
+            self.remove_job(job_id)
+
+    def ensure_fresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.loaded and now - self._checked_at < current_app.config["FACETS_SYNC_SECONDS"]:
+                return
+            started = datetime.utcnow()
+            if not self.loaded:
+                self._reconciled_at = now
+            elif now - self._reconciled_at >= current_app.config["FACETS_RECONCILE_SECONDS"]:
+                self._remove_deleted()
+                self._reconciled_at = now
+            self._load(since=self._synced_at - SYNC_OVERLAP if self.loaded else None)
+            self.loaded = True
+            self._synced_at = started
+            self._checked_at = now
+
+    def apply(self, changes):
+        with self._lock:
+            if not self.loaded:
+                return
+            for job_id, entry in changes.items():
+                self.set_job(job_id, entry)
+
+    def _selection_mask(self, facet, values):
+        bitmaps = self.bitmaps[facet]
+        mask = 0
+        for value in values:
+            mask |= bitmaps.get(value, 0)
+        return mask
+
+    def _label(self, facet, value):
+        if facet == 'location':
+            labels = self.location_labels.get(value)
+            return labels.most_common(1)[0][0] if labels else value
+        if facet == 'work_type':
+            return WORK_TYPE_LABELS.get(value, value)
+        if facet == 'experience_level':
+            return EXPERIENCE_LABELS.get(value, value)
+        return SALARY_LABELS.get(value, value)
+
+    def summarize(self, base, selected):
+        # base: bitmap kết quả tìm theo từ khóa (None = mọi job active).
+        # Số đếm của một nhóm tính trên kết quả đã lọc theo các nhóm khác, để người dùng thấy được
+        # nếu chọn thêm/đổi giá trị trong nhóm đó thì có bao nhiêu job
+        self.ensure_fresh()
+        with self._lock:
+            base = self.all if base is None else base & self.all
+            masks = {facet: self._selection_mask(facet, values) for facet, values in selected.items() if values}
+            result = base
+            for mask in masks.values():
+                result &= mask
+
+            facets = []
+            for facet, label in FACETS:
+                scope = base
+                for other, mask in masks.items():
+                    if other != facet:
+                        scope &= mask
+                chosen = selected.get(facet, ())
+                values = []
+                for value, bitmap in self.bitmaps[facet].items():
+                    count = (scope & bitmap).bit_count()
+                    if count or value in chosen:
+                        values.append({'value': value, 'label': self._label(facet, value), 'count': count,
+                                       'selected': value in chosen,
+                                       'params': _toggled(selected, facet, value)})
+                if facet == 'salary_band':
+                    order = [band[0] for band in SALARY_BANDS] + [NEGOTIABLE]
+                    values.sort(key=lambda item: order.index(item['value']) if item['value'] in order else len(order))
+                else:
+                    values.sort(key=lambda item: (-item['count'], item['label']))
+                if facet == 'location':
+                    values = [item for i, item in enumerate(values) if i < MAX_LOCATION_VALUES or item['selected']]
+                facets.append({'name': facet, 'label': label, 'values': values})
+            return result.bit_count(), facets
+
+    def conditions(self, selected):
+        # Điều kiện SQL tương ứng với các giá trị đang chọn, để lọc danh sách job của trang hiện tại
+        self.ensure_fresh()
+        conditions = []
+        for facet, values in selected.items():
+            if not values:
+                continue
+            if facet == 'location':
+                with self._lock:
+                    labels = [label for value in values for label in self.location_labels.get(value, ())]
+                conditions.append(Job.location.in_(labels))
+            elif facet == 'salary_band':
+                ranges = []
+                for value, _, low, high in SALARY_BANDS:
+                    if value in values:
+                        ranges.append(and_(*([Job.salary >= low * MILLION] if low is not None else []),
+                                           *([Job.salary < high * MILLION] if high is not None else [])))
+                if NEGOTIABLE in values:
+                    ranges.append(Job.salary.is_(None))
+                conditions.append(or_(*ranges) if ranges else Job.id.is_(None))
+            else:
+                conditions.append(getattr(Job, facet).in_(values))
+        return conditions
+
+    def reset(self):
+        with self._lock:
+            self.__init__()
+
+
+index = FacetIndex()
+
+
+def parse_selection(args):
+    # {nhóm: [giá trị]} từ query string (?f_location=ha noi&f_work_type=remote)
+    selected = {}
+    for facet, _ in FACETS:
+        values = list(dict.fromkeys(value for value in args.getlist(PARAM_PREFIX + facet) if value))
+        if values:
+            selected[facet] = values
+    return selected
+
+
+def base_bitmap(keyword='', location=''):
+    # Tập job khớp từ khóa lấy từ chỉ mục tìm kiếm, xóa khỏi cache khi có job thay đổi (job bị đóng
+    # ở worker khác vẫn tự bị loại khi AND với bitmap job active)
+    key = search.query_key(keyword, location)
+    if not key:
+        return None
+    return cache.get_or_set('job_ids:%s' % key,
+                            lambda: bitmap_from_ids(search.matching_job_ids(keyword, location)),
+                            ttl=search.COUNT_TTL, tags=(JOBS_TAG,))
+
+
+def init_app(app):
+    app.config.setdefault("FACETS_SYNC_SECONDS", int(os.environ.get("FACETS_SYNC_SECONDS", 30)))
+    # Chu kỳ so tập id để loại các job bị xóa ở worker khác
+    app.config.setdefault("FACETS_RECONCILE_SECONDS", int(os.environ.get("FACETS_RECONCILE_SECONDS", 300)))
+    index.reset()
+
+
+# Cập nhật bitmap sau commit (tạo/sửa/đóng/xóa job, admin); rollback thì bỏ qua
+def _changed(obj):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in _FACET_ATTRS)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_facet_changes(session, flush_context):
+    if not index.loaded:
+        return
+    changes = session.info.setdefault('facet_changes', {})
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Job) and (obj in session.new or _changed(obj)):
+            changes[obj.id] = job_entry(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            changes[obj.id] = None
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_after_commit(session):
+    changes = session.info.pop('facet_changes', None)
+    if changes:
+        index.apply(changes)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('facet_changes', None)
@@ -0,0 +1,83 @@
+import os
+
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+
+from app import db
+from app.cache import Cache, MemoryBackend, RedisBackend
+from app.models import Employer
+
+# Cache HTML đã render của từng đoạn template, dùng trong template:
+#   {% cache 'job_card', job.id, job.updated_at %} ... {% endcache %}
+# Khóa gồm tên đoạn + các giá trị truyền vào: job sửa thì updated_at đổi, khóa mới, bản cũ tự hết hạn
+# theo LRU/TTL. Dữ liệu không nằm trong khóa (tên công ty của job) thì xóa theo tag FRAGMENTS_TAG
+FRAGMENTS_TAG = 'fragments'
+
+fragment_cache = Cache(MemoryBackend(5000), 3600)
+
+
+def _key(parts):
+    # ETAG_VERSION đổi khi deploy giao diện mới: không dùng lại HTML của template cũ (cache Redis dùng chung)
+    return ':'.join(str(part) for part in [current_app.config["ETAG_VERSION"]] + list(parts))
+
+
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(parts)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        # Template bật autoescape: trả Markup để HTML lấy từ cache không bị escape lần nữa
+        if not self.environment.globals.get('fragment_cache_enabled', True):
+            return caller()
+        html = fragment_cache.get_or_set(_key(parts), lambda: str(caller()), tags=(FRAGMENTS_TAG,),
+                                         stats_name='fragment:%s' % parts[0])
+        return Markup(html)
+
+
+def init_app(app):
+    app.config.setdefault("FRAGMENT_CACHE_ENABLED", os.environ.get("FRAGMENT_CACHE_ENABLED", "1") != "0")
+    app.config.setdefault("FRAGMENT_CACHE_TTL", int(os.environ.get("FRAGMENT_CACHE_TTL", 3600)))
+    app.config.setdefault("FRAGMENT_CACHE_MAX_ENTRIES", int(os.environ.get("FRAGMENT_CACHE_MAX_ENTRIES", 5000)))
+    # Dùng chung giữa các worker qua Redis (mặc định cùng Redis với cache dữ liệu nếu có)
+    app.config.setdefault("FRAGMENT_CACHE_REDIS_URL",
+                          os.environ.get("FRAGMENT_CACHE_REDIS_URL", app.config.get("CACHE_REDIS_URL")))
+
+    if app.config["FRAGMENT_CACHE_REDIS_URL"]:
+        fragment_cache.backend = RedisBackend(app.config["FRAGMENT_CACHE_REDIS_URL"])
+    else:
+        fragment_cache.backend = MemoryBackend(app.config["FRAGMENT_CACHE_MAX_ENTRIES"])
+    fragment_cache.default_ttl = app.config["FRAGMENT_CACHE_TTL"]
+
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.globals['fragment_cache_enabled'] = app.config["FRAGMENT_CACHE_ENABLED"]
+
+
+# Đổi tên công ty không làm đổi updated_at của job nhưng có trong thẻ job: xóa mọi đoạn sau commit
+@event.listens_for(db.session, 'after_flush')
+def _track_employer_changes(session, flush_context):
+    for obj in session.dirty:
+        if isinstance(obj, Employer) and any(inspect(obj).attrs[attr].history.has_changes()
+                                             for attr in ('company_name', 'company_address', 'contact_person')):
+            session.info['fragments_changed'] = True
+            return
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('fragments_changed', False):
+        fragment_cache.invalidate(FRAGMENTS_TAG)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('fragments_changed', None)
@@ -0,0 +1,106 @@
+import os
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event
+
+from app import db
+from app.cache import MemoryBackend
+from app.models import User, Candidate, Employer
+
+# Cache riêng của từng tiến trình, TTL ngắn để thay đổi từ worker khác cũng sớm có hiệu lực
+_principals = MemoryBackend(10000)
+
+
+def init_app(app):
+    app.config.setdefault("IDENTITY_CACHE_TTL", int(os.environ.get("IDENTITY_CACHE_TTL", 60)))
+    app.config.setdefault("IDENTITY_CACHE_SIZE", int(os.environ.get("IDENTITY_CACHE_SIZE", 10000)))
+    _principals.max_entries = app.config["IDENTITY_CACHE_SIZE"]
+    _principals.clear()
+
+
+class Principal(UserMixin):
+    # Thông tin đăng nhập tối thiểu cho mỗi request; candidate/employer chỉ nạp khi thực sự cần
+    def __init__(self, id, username, role, active, candidate_id, employer_id):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.active = active
+        self.candidate_id = candidate_id
+        self.employer_id = employer_id
+        # Mỗi request tạo Principal mới nên nhớ trên instance là nhớ trong phạm vi request
+        self._candidate = None
+        self._employer = None
+
+    @property
+    def is_active(self):
+        return self.active
+
+    @property
+    def candidate(self):
+        if self._candidate is None and self.candidate_id:
+            self._candidate = db.session.get(Candidate, self.candidate_id)
+        return self._candidate
+
+    @property
+    def employer(self):
+        if self._employer is None and self.employer_id:
+            self._employer = db.session.get(Employer, self.employer_id)
+        return self._employer
+
+    def get_id(self):
+        return str(self.id)
+
+
+def _load_row(user_id):
+    # Một câu truy vấn thay cho users + candidates + employers
+    row = db.session.query(User.id, User.username, User.role, User.is_active,
+                           Candidate.id.label('candidate_id'), Employer.id.label('employer_id')) \
+        .outerjoin(Candidate, Candidate.user_id == User.id) \
+        .outerjoin(Employer, Employer.user_id == User.id) \
+        .filter(User.id == user_id) \
+        .first()
+    return tuple(row) if row else None
+
+
+def load_principal(user_id):
+    entry = _principals.get(user_id)
+    if entry is not None:
+        row = entry[1]
+    else:
+        row = _load_row(user_id)
+        if row is None:
+            return None
+        _principals.set(user_id, row, current_app.config["IDENTITY_CACHE_TTL"])
+    return Principal(*row)
+
+
+def invalidate(*user_ids):
+    for user_id in user_ids:
+        _principals.delete(user_id)
+
+
+def clear():
+    _principals.clear()
+
+
+# Xóa principal sau khi commit thay đổi users/candidates/employers
+# (profile(), đăng ký, UserView của admin...)
+@event.listens_for(db.session, 'after_flush')
+def _track_identity_changes(session, flush_context):
+    changed = session.info.setdefault('identity_changed', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+        elif isinstance(obj, (Candidate, Employer)):
+            changed.add(obj.user_id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    invalidate(*session.info.pop('identity_changed', ()))
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('identity_changed', None)
@@ -1,32 +1,37 @@
 import datetime
 
 import flask
-from flask import render_template, redirect, session, url_for, flash
+from flask import Blueprint, render_template, redirect, session, url_for, flash, current_app, abort
 from flask_login import current_user, login_user, login_required, logout_user
+from sqlalchemy.orm import load_only
 
-from app import app, login_manager
+from app import create_app, login_manager, search, facets, autocomplete, conditional, dao, identity, ingest, cv_store, \
+    matching, export, notifications, serializers
 from app.dao import auth_user, register_user
 from app.models import User, Candidate, CV, Application, UserRole, Employer, Job, JobStatus
 
+main = Blueprint('main', __name__)
 
-@app.context_processor
+
+@main.app_context_processor
 def inject_enums():
     return dict(UserRole=UserRole, JobStatus=JobStatus)
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Principal được cache ngắn hạn: không tốn truy vấn users/candidates/employers mỗi request
+    return identity.load_principal(int(user_id))
 
 
-@app.route("/")
+@main.route("/")
 def index():
-    recent_jobs = Job.query.filter_by(status='active').order_by(Job.posted_date.desc()).limit(10).all()
+    recent_jobs = dao.recent_jobs(limit=10)
     return render_template("index.html", recent_jobs=recent_jobs)
 
 
 # ĐĂNG KÝ/ĐĂNG NHẬP
-@app.route("/login", methods=["GET", "POST"])
+@main.route("/login", methods=["GET", "POST"])
 def login():
     err_msg = None
     if current_user.is_authenticated:
@@ -43,10 +48,10 @@ def login():
 
             if user.role == UserRole.CANDIDATE:
                 session['user_type'] = 'candidate'
-                return redirect(url_for('candidate_dashboard'))
+                return redirect(url_for('main.candidate_dashboard'))
             elif user.role == UserRole.EMPLOYER:
                 session['user_type'] = 'employer'
-                return redirect(url_for('employer_dashboard'))
+                return redirect(url_for('main.employer_dashboard'))
             elif user.role == UserRole.ADMIN:
                 session['user_type'] = 'admin'
                 return redirect('/admin')
@@ -55,7 +60,7 @@ def login():
     return render_template('login.html', err_msg=err_msg)
 
 
-@app.route("/logout")
+@main.route("/logout")
 @login_required
 def logout():
     logout_user()
@@ -64,7 +69,7 @@ def logout():
     return redirect('/')
 
 
-@app.route("/register/candidate", methods=["GET", "POST"])
+@main.route("/register/candidate", methods=["GET", "POST"])
 def register_candidate():
     if current_user.is_authenticated:
         return redirect("/")
@@ -89,12 +94,12 @@ def register_candidate():
             login_user(user)
             session['user_type'] = 'candidate'
             flash('Đăng ký thành công!', 'success')
-            return redirect(url_for('candidate_dashboard'))
+            return redirect(url_for('main.candidate_dashboard'))
 
     return render_template('register_candidate.html')
 
 
-@app.route("/register/employer", methods=["GET", "POST"])
+@main.route("/register/employer", methods=["GET", "POST"])
 def register_employer():
     if current_user.is_authenticated:
         return redirect("/")
@@ -118,43 +123,41 @@ def register_employer():
             login_user(user)
             session['user_type'] = 'employer'
             flash('Đăng ký thành công!', 'success')
-            return redirect(url_for('employer_dashboard'))
+            return redirect(url_for('main.employer_dashboard'))
 
     return render_template('register_employer.html')
 
 
-@app.route("/profile", methods=["GET", "POST"])
+@main.route("/profile", methods=["GET", "POST"])
 @login_required
 def profile():
     if request.method == "POST":
         try:
             if current_user.role == UserRole.CANDIDATE:
                 # Nếu user chưa có candidate thì tạo mới
-                if not current_user.candidate:
+                candidate = current_user.candidate
+                if not candidate:
                     candidate = Candidate(user_id=current_user.id)
                     db.session.add(candidate)
-                    db.session.flush()
-                    current_user.candidate = candidate
 
-                current_user.candidate.full_name = request.form.get("full_name")
-                current_user.candidate.email = request.form.get("email")
-                current_user.candidate.phone = request.form.get("phone")
-                current_user.candidate.address = request.form.get("address")
+                candidate.full_name = request.form.get("full_name")
+                candidate.email = request.form.get("email")
+                candidate.phone = request.form.get("phone")
+                candidate.address = request.form.get("address")
 
             elif current_user.role == UserRole.EMPLOYER:
-                if not current_user.employer:
+                employer = current_user.employer
+                if not employer:
                     employer = Employer(user_id=current_user.id)
                     db.session.add(employer)
-                    db.session.flush()
-                    current_user.employer = employer
 
-                current_user.employer.company_name = request.form.get("company_name")
-                current_user.employer.company_address = request.form.get("company_address")
-                current_user.employer.contact_person = request.form.get("contact_person")
+                employer.company_name = request.form.get("company_name")
+                employer.company_address = request.form.get("company_address")
+                employer.contact_person = request.form.get("contact_person")
 
             db.session.commit()
             flash("Cập nhật thông tin thành công!", "success")
-            return redirect(url_for("profile"))
+            return redirect(url_for("main.profile"))
 
         except Exception as ex:
             db.session.rollback()
@@ -164,31 +167,34 @@ def profile():
 
 
 # ỨNG VIÊN DASHBOARD
-@app.route("/candidate/dashboard")
+@main.route("/candidate/dashboard")
 @login_required
 def candidate_dashboard():
     if current_user.role != UserRole.CANDIDATE:
         flash('Bạn không có quyền truy cập trang này', 'danger')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
 
-    applications = Application.query.filter_by(candidate_id=current_user.candidate.id).order_by(Application.applied_date.desc()).all()
-    cvs = CV.query.filter_by(candidate_id=current_user.candidate.id).all()
+    applications = dao.candidate_applications(current_user.candidate_id)
+    cvs = dao.candidate_cvs(current_user.candidate_id)
+    recommendations = matching.recommended_jobs(cvs, limit=5,
+                                                exclude_job_ids={application.job_id for application in applications})
 
-    return render_template('candidate_dashboard.html', applications=applications, cvs=cvs)
+    return render_template('candidate_dashboard.html', applications=applications, cvs=cvs,
+                           recommendations=recommendations)
 
 
 # ỨNG VIÊN TẠO CV
-@app.route("/candidate/cv", methods=["GET", "POST"])
-@app.route("/candidate/cv/<int:cv_id>", methods=["GET", "POST"])
+@main.route("/candidate/cv", methods=["GET", "POST"])
+@main.route("/candidate/cv/<int:cv_id>", methods=["GET", "POST"])
 @login_required
 def manage_cv(cv_id=None):
     if current_user.role != UserRole.CANDIDATE:
         flash('Bạn không có quyền truy cập trang này', 'danger')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
 
     cv = None
     if cv_id:
-        cv = CV.query.filter_by(id=cv_id, candidate_id=current_user.candidate.id).first_or_404()
+        cv = CV.query.filter_by(id=cv_id, candidate_id=current_user.candidate_id).first_or_404()
 
     if request.method == "POST":
         try:
@@ -201,33 +207,9 @@ def manage_cv(cv_id=None):
             objective = request.form.get("objective")
             skills = request.form.get("skills")
 
-            # Xử lý kinh nghiệm làm việc (dạng mảng)
-            experiences = []
-            companies = request.form.getlist("company[]")
-            positions = request.form.getlist("position[]")
-            periods = request.form.getlist("period[]")
-            descriptions = request.form.getlist("description[]")
-
-            for i in range(len(companies)):
-                if companies[i].strip():
-                    exp_data = f"{companies[i]}|{positions[i]}|{periods[i]}|{descriptions[i]}"
-                    experiences.append(exp_data)
-
-            experience = "|||".join(experiences) if experiences else ""
-
-            # Xử lý học vấn
-            educations = []
-            schools = request.form.getlist("school[]")
-            degrees = request.form.getlist("degree[]")
-            edu_periods = request.form.getlist("edu_period[]")
-            edu_descriptions = request.form.getlist("edu_description[]")
-
-            for i in range(len(schools)):
-                if schools[i].strip():
-                    edu_data = f"{schools[i]}|{degrees[i]}|{edu_periods[i]}|{edu_descriptions[i]}"
-                    educations.append(edu_data)
-
-            education = "|||".join(educations) if educations else ""
+            # Kinh nghiệm làm việc và học vấn (dạng mảng) lưu thành các dòng trong bảng con
+            experiences = cv_store.experiences_from_form(request.form)
+            educations = cv_store.educations_from_form(request.form)
 
             if cv:
                 # Cập nhật CV hiện có
@@ -238,15 +220,16 @@ def manage_cv(cv_id=None):
                 cv.phone = phone
                 cv.objective = objective
                 cv.skills = skills
-                cv.experience = experience
-                cv.education = education
-                cv.updated_at = datetime.utcnow()
+                cv.experiences = experiences
+                cv.educations = educations
+                cv.experience = None
+                cv.education = None
 
                 flash('Cập nhật CV thành công!', 'success')
             else:
                 # Tạo CV mới
                 cv = CV(
-                    candidate_id=current_user.candidate.id,
+                    candidate_id=current_user.candidate_id,
                     title=title,
                     position=position,
                     full_name=full_name,
@@ -254,14 +237,14 @@ def manage_cv(cv_id=None):
                     phone=phone,
                     objective=objective,
                     skills=skills,
-                    experience=experience,
-                    education=education
+                    experiences=experiences,
+                    educations=educations
                 )
                 db.session.add(cv)
                 flash('Tạo CV thành công!', 'success')
 
             db.session.commit()
-            return redirect(url_for('candidate_dashboard'))
+            return redirect(url_for('main.candidate_dashboard'))
 
         except Exception as e:
             db.session.rollback()
@@ -271,7 +254,7 @@ def manage_cv(cv_id=None):
     return render_template('create_cv.html', cv=cv)
 
 
-@app.route("/api/candidate/cvs", methods=["GET"])
+@main.route("/api/candidate/cvs", methods=["GET"])
 @login_required
 def api_cv():
     cv = None
@@ -279,28 +262,26 @@ def api_cv():
         flash('Bạn không có quyền truy cập trang này', 'danger')
 
     try:
-        cv = CV.query.filter_by(candidate_id=current_user.candidate.id).all()
-
-        cvs = []
-        for c in cv:
-            cvs.append({
-                "id": c.id,
-                "title": c.title,
-            })
-        return jsonify(cvs)
+        count, last_modified, id_sum = dao.candidate_cvs_version(current_user.candidate_id)
+        # Không gửi Last-Modified: xóa CV không làm tăng max(updated_at), chỉ ETag mới phân biệt được
+        etag = conditional.make_etag('cvs', current_user.candidate_id, count, last_modified, id_sum)
+        return conditional.respond(etag, None, lambda: jsonify(
+            [{"id": c.id, "title": c.title}
+             for c in CV.query.filter_by(candidate_id=current_user.candidate_id)
+             .options(load_only(CV.id, CV.title)).all()]))
     except Exception as e:
         db.session.rollback()
         flash('Có lỗi xảy ra khi lấy CV', 'danger')
         print(f"Error saving CV: {e}")
 
 # Route xóa CV
-@app.route("/candidate/cv/<int:cv_id>/delete", methods=["POST"])
+@main.route("/candidate/cv/<int:cv_id>/delete", methods=["POST"])
 @login_required
 def delete_cv(cv_id):
     if current_user.role != UserRole.CANDIDATE:
         return jsonify({"error": "Unauthorized"}), 403
 
-    cv = CV.query.filter_by(id=cv_id, candidate_id=current_user.candidate.id).first_or_404()
+    cv = CV.query.filter_by(id=cv_id, candidate_id=current_user.candidate_id).first_or_404()
 
     try:
         db.session.delete(cv)
@@ -310,96 +291,124 @@ def delete_cv(cv_id):
         db.session.rollback()
         flash('Có lỗi xảy ra khi xóa CV', 'danger')
 
-    return redirect(url_for('candidate_dashboard'))
+    return redirect(url_for('main.candidate_dashboard'))
 
 
 # ROUTE XEM
-@app.route("/api/cv/<int:cv_id>")
+@main.route("/api/cv/<int:cv_id>")
 @login_required
 def get_cv(cv_id):
     if current_user.role != UserRole.EMPLOYER:
         return jsonify({"error": "Unauthorized"}), 403
 
-    cv = CV.query.get_or_404(cv_id)
-    return jsonify({
-        "id": cv.id,
-        "title": cv.title,
-        "full_name": cv.full_name,
-        "email": cv.email,
-        "phone": cv.phone,
-        "objective": cv.objective,
-        "skills": cv.skills,
-        "experience": cv.experience,
-        "education": cv.education,
-    })
+    # Sửa CV (kể cả kinh nghiệm/học vấn) đều cập nhật cv.updated_at
+    updated_at = dao.cv_version(cv_id)
+    if updated_at is None:
+        abort(404)
+
+    def render():
+        cv = CV.query.get_or_404(cv_id)
+        return jsonify({
+            "id": cv.id,
+            "title": cv.title,
+            "full_name": cv.full_name,
+            "email": cv.email,
+            "phone": cv.phone,
+            "objective": cv.objective,
+            "skills": cv.skills,
+            "experience": [exp.to_dict() for exp in cv.experiences],
+            "education": [edu.to_dict() for edu in cv.educations],
+        })
+
+    return conditional.respond(conditional.make_etag('cv', cv_id, updated_at), updated_at, render)
 
 
 # ỨNG VIÊN NỘP HỒ SƠ
-@app.route("/api/apply", methods=["POST"])
+APPLY_ERRORS = {
+    'no_candidate': ("Ứng viên không tồn tại", 404),
+    'job_unavailable': ("Công việc không khả dụng", 404),
+    'cv_not_found': ("CV không tồn tại", 404),
+    'duplicate': ("Bạn đã ứng tuyển công việc này rồi", 400),
+    'key_conflict': ("Idempotency-Key đã được dùng cho một yêu cầu khác", 422),
+}
+
+
+@main.route("/api/apply", methods=["POST"])
 @login_required
 def apply_job():
     if session.get("user_type") != "candidate":
         return jsonify({"error": "Chỉ ứng viên mới được nộp hồ sơ"}), 403
 
-    job_id = request.json.get("job_id")
-    cv_id = request.json.get("cv_id")
-
-    if not job_id or not cv_id:
+    data = request.get_json(silent=True) or {}
+    try:
+        job_id = int(data.get("job_id"))
+        cv_id = int(data.get("cv_id"))
+    except (TypeError, ValueError):
         return jsonify({"error": "Thiếu job_id hoặc cv_id"}), 400
 
-    candidate = Candidate.query.filter_by(user_id=current_user.id).first()
-    if not candidate:
-        return jsonify({"error": "Ứng viên không tồn tại"}), 404
+    idempotency_key = request.headers.get("Idempotency-Key") or None
+    if idempotency_key and len(idempotency_key) > 64:
+        return jsonify({"error": "Idempotency-Key dài tối đa 64 ký tự"}), 400
 
-    # Kiểm tra Job tồn tại
-    job = Job.query.get(job_id)
-    if not job or job.status != JobStatus.active:
-        return jsonify({"error": "Công việc không khả dụng"}), 404
+    result, application_id = dao.submit_application(current_user.id, job_id, cv_id, idempotency_key)
+    if result in APPLY_ERRORS:
+        message, code = APPLY_ERRORS[result]
+        return jsonify({"error": message}), code
 
-    # Kiểm tra CV có thuộc về ứng viên không
-    cv = CV.query.get(cv_id)
-    if not cv:
-        return jsonify({"error": "CV không tồn tại"}), 404
+    response = jsonify({"message": "Ứng tuyển thành công!", "application_id": application_id})
+    if result == 'replayed':
+        # Client gửi lại cùng key: trả đúng kết quả lần đầu, không ghi gì thêm
+        response.headers["Idempotent-Replayed"] = "true"
+    return response, 201
+
+
+# THÔNG BÁO (do worker của outbox tạo)
+@main.route("/api/notifications", methods=["GET"])
+@login_required
+def api_notifications():
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    return jsonify({
+        "unread": notifications.unread_count(current_user.id),
+        "items": [n.to_dict() for n in notifications.recent_notifications(current_user.id, limit)],
+    })
 
-    # Tạo Application
-    application = Application(job_id=job_id, candidate_id=candidate.id, cv_id=cv_id)
-    try:
-        db.session.add(application)
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": "Bạn đã ứng tuyển công việc này rồi"}), 400
 
-    return jsonify({"message": "Ứng tuyển thành công!", "application_id": application.id}), 201
+@main.route("/api/notifications/read", methods=["POST"])
+@login_required
+def api_notifications_read():
+    return jsonify({"updated": notifications.mark_all_read(current_user.id)})
 
 
 # NHÀ TUYỂN DỤNG DASHBOARD
-@app.route('/employer/dashboard')
+@main.route('/employer/dashboard')
 @login_required
 def employer_dashboard():
     if current_user.role != UserRole.EMPLOYER:
         flash('Bạn không có quyền truy cập trang này', 'danger')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
 
-    jobs = Job.query.filter_by(employer_id=current_user.employer.id).all()
+    page = request.args.get('page', 1, type=int)
+    employer_id = current_user.employer_id
 
-    total_applications = Application.query \
-        .join(Job) \
-        .filter(Job.employer_id == current_user.employer.id) \
-        .count()
+    stats = dao.employer_job_stats(employer_id)
+    jobs, application_counts = dao.employer_jobs_page(employer_id, page=page, per_page=20,
+                                                      total=stats['total_jobs'])
 
     return render_template('employer_dashboard.html',
                            jobs=jobs,
-                           total_applications=total_applications)
+                           company_name=current_user.employer.company_name,
+                           stats=stats,
+                           application_counts=application_counts,
+                           total_applications=stats['total_applications'])
 
 
 # ROUTE ĐĂNG JOB
-@app.route('/employer/job', methods=['GET', 'POST'])
+@main.route('/employer/job', methods=['GET', 'POST'])
 @login_required
 def create_job():
     if current_user.role != UserRole.EMPLOYER:
         flash('Bạn không có quyền truy cập trang này', 'danger')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
 
     if request.method == 'POST':
         title = request.form.get('title')
@@ -412,7 +421,7 @@ def create_job():
         benefits = request.form.get('benefits')
 
         job = Job(
-            employer_id=current_user.employer.id,
+            employer_id=current_user.employer_id,
             title=title,
             description=description,
             requirements=requirements,
@@ -428,21 +437,21 @@ def create_job():
         db.session.commit()
 
         flash('Đăng tin tuyển dụng thành công!', 'success')
-        return redirect(url_for('employer_dashboard'))
+        return redirect(url_for('main.employer_dashboard'))
 
     return render_template('create_job.html')
 
 
 # ROUTE EDIT JOB
-@app.route('/employer/job/<int:job_id>/edit', methods=['GET', 'POST'])
+@main.route('/employer/job/<int:job_id>/edit', methods=['GET', 'POST'])
 @login_required
 def edit_job(job_id):
     if current_user.role != UserRole.EMPLOYER:
         flash('Bạn không có quyền truy cập trang này', 'danger')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
 
     # Kiểm tra job thuộc về employer hiện tại
-    job = Job.query.filter_by(id=job_id, employer_id=current_user.employer.id).first_or_404()
+    job = Job.query.filter_by(id=job_id, employer_id=current_user.employer_id).first_or_404()
 
     if request.method == 'POST':
         try:
@@ -491,7 +500,7 @@ def edit_job(job_id):
             db.session.commit()
 
             flash('Cập nhật tin tuyển dụng thành công!', 'success')
-            return redirect(url_for('employer_dashboard'))
+            return redirect(url_for('main.employer_dashboard'))
 
         except Exception as e:
             db.session.rollback()
@@ -502,30 +511,30 @@ def edit_job(job_id):
 
 
 # ROUTE ĐỔI STATUS JOB
-@app.route('/employer/job/<int:job_id>/toggle_status', methods=['POST'])
+@main.route('/employer/job/<int:job_id>/toggle_status', methods=['POST'])
 @login_required
 def toggle_job_status(job_id):
     if current_user.role != UserRole.EMPLOYER:
         return jsonify({"error": "Unauthorized"}), 403
 
-    job = Job.query.filter_by(id=job_id, employer_id=current_user.employer.id).first_or_404()
+    job = Job.query.filter_by(id=job_id, employer_id=current_user.employer_id).first_or_404()
 
     try:
         # Toggle status between active and inactive
-        if job.status == 'active':
-            job.status = 'inactive'
+        if job.status == JobStatus.active:
+            job.status = JobStatus.inactive
             message = 'Đã tắt tin tuyển dụng'
         else:
-            job.status = 'active'
+            job.status = JobStatus.active
             message = 'Đã kích hoạt tin tuyển dụng'
 
-        job.updated_at = datetime.utcnow()
+        job.updated_at = datetime.datetime.utcnow()
         db.session.commit()
 
         return jsonify({
             "success": True,
             "message": message,
-            "new_status": job.status
+            "new_status": job.status.value
         })
     except Exception as e:
         db.session.rollback()
@@ -533,14 +542,14 @@ def toggle_job_status(job_id):
 
 
 # ROUTE XÓA JOB
-@app.route("/employer/job/<int:job_id>/delete", methods=["POST"])
+@main.route("/employer/job/<int:job_id>/delete", methods=["POST"])
 @login_required
 def delete_job(job_id):
     if current_user.role != UserRole.EMPLOYER:
         flash('Bạn không có quyền thực hiện hành động này', 'danger')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
 
-    job = Job.query.filter_by(id=job_id, employer_id=current_user.employer.id).first_or_404()
+    job = Job.query.filter_by(id=job_id, employer_id=current_user.employer_id).first_or_404()
 
     try:
         # Xóa các application liên quan trước
@@ -552,30 +561,70 @@ def delete_job(job_id):
         db.session.rollback()
         flash('Có lỗi xảy ra khi xóa tin tuyển dụng', 'danger')
 
-    return redirect(url_for('employer_dashboard'))
+    return redirect(url_for('main.employer_dashboard'))
 
 
 # ROUTE XEM APPLY
-@app.route('/employer/job/<int:job_id>/candidate')
+@main.route('/employer/job/<int:job_id>/candidate')
 @login_required
 def job_candidates(job_id):
     if current_user.role != UserRole.EMPLOYER:
         flash('Bạn không có quyền truy cập trang này', 'danger')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
+
+    job = Job.query.filter_by(id=job_id, employer_id=current_user.employer_id).first_or_404()
+
+    page = request.args.get('page', 1, type=int)
+    status = request.args.get('status', 'all')
+    sort = request.args.get('sort', 'newest')
 
-    job = Job.query.filter_by(id=job_id, employer_id=current_user.employer.id).first_or_404()
+    counts = dao.application_counts_by_job([job_id])[job_id]
+    applications = dao.job_applications_page(job_id, status=status, sort=sort,
+                                             page=page, per_page=20, counts=counts)
 
-    applications = Application.query.filter_by(job_id=job_id) \
-        .order_by(Application.applied_date.desc()) \
-        .all()
+    # Độ phù hợp của CV đã nộp và gợi ý CV chưa ứng tuyển
+    match_scores = matching.matcher.cv_scores(job, [application.cv_id for application in applications.items])
+    suggestions = matching.suggested_cvs(job, limit=5, exclude_cv_ids=dao.applied_cv_ids(job_id))
 
     return render_template('job_candidates.html',
                            job=job,
-                           applications=applications)
+                           applications=applications,
+                           counts=counts,
+                           match_scores=match_scores,
+                           suggestions=suggestions,
+                           status=status,
+                           sort=sort)
+
+
+# XUẤT DANH SÁCH ỨNG VIÊN (CSV/NDJSON), gửi dần từng phần nên không giữ cả danh sách trong bộ nhớ
+@main.route('/employer/applications/export')
+@main.route('/employer/job/<int:job_id>/applications/export')
+@login_required
+def export_applications(job_id=None):
+    if current_user.role != UserRole.EMPLOYER:
+        flash('Bạn không có quyền truy cập trang này', 'danger')
+        return redirect(url_for('main.index'))
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        return jsonify({"error": "Định dạng không hỗ trợ"}), 400
+    status = request.args.get('status')
+    if status not in dao.APPLICATION_STATUSES:
+        status = None
+
+    if job_id is not None:
+        Job.query.filter_by(id=job_id, employer_id=current_user.employer_id).first_or_404()
+
+    stream, mimetype = export.FORMATS[fmt]
+    rows = export.export_rows(current_user.employer_id, job_id=job_id, status=status)
+    filename = 'ung-vien-%s.%s' % (job_id or 'tat-ca', fmt)
+    return flask.Response(flask.stream_with_context(stream(rows)), mimetype=mimetype,
+                          headers={'Content-Disposition': 'attachment; filename=%s' % filename,
+                                   'X-Accel-Buffering': 'no'})
 
 
 # NHÀ TUYỂN DỤNG DUYỆT HỒ SƠ
-@app.route("/api/application/<int:app_id>/review", methods=["PUT"])
+@main.route("/api/application/<int:app_id>/review", methods=["PUT"])
 @login_required
 def review_application(app_id):
     if current_user.role != UserRole.EMPLOYER:
@@ -601,6 +650,33 @@ def review_application(app_id):
     return jsonify({"message": f"Hồ sơ đã cập nhật sang trạng thái {new_status}"}), 200
 
 
+@main.route("/api/applications/review", methods=["POST"])
+@login_required
+def review_applications():
+    if current_user.role != UserRole.EMPLOYER:
+        return jsonify({"error": "Chỉ nhà tuyển dụng mới được duyệt hồ sơ"}), 403
+
+    data = request.get_json(silent=True) or {}
+    new_status = data.get("status")
+    if new_status not in dao.REVIEW_STATUSES:
+        return jsonify({"error": "Trạng thái không hợp lệ"}), 400
+
+    application_ids = data.get("application_ids")
+    if not isinstance(application_ids, list) or not application_ids \
+            or not all(isinstance(app_id, int) and not isinstance(app_id, bool) for app_id in application_ids):
+        return jsonify({"error": "application_ids phải là danh sách id"}), 400
+    if len(application_ids) > dao.MAX_REVIEW_BATCH:
+        return jsonify({"error": f"Tối đa {dao.MAX_REVIEW_BATCH} hồ sơ mỗi lần"}), 400
+
+    # Id không tồn tại hoặc không thuộc job của employer này đều nằm trong rejected
+    updated, rejected = dao.review_applications(current_user.employer_id, application_ids, new_status)
+    return jsonify({
+        "status": new_status,
+        "updated": updated,
+        "rejected": rejected
+    }), 200
+
+
 from flask import jsonify, request
 from flask_login import login_required
 from app.models import Job, Employer
@@ -608,7 +684,7 @@ from app import db
 
 
 # API ĐĂNG TIN TUYỂN DỤNG
-@app.route("/api/jobs", methods=["POST"])
+@main.route("/api/jobs", methods=["POST"])
 @login_required
 def create_jobs():
     if session.get("user_type") != "employer":
@@ -646,56 +722,164 @@ def create_jobs():
         "message": "Đăng tin thành công!",
         "job_id": job.id,
         "title": job.title,
-        "status": job.status
+        "status": job.status.value
     }), 201
 
 
+@main.route("/api/jobs/bulk", methods=["POST"])
+@login_required
+def ingest_jobs():
+    # Nhận NDJSON hoặc mảng JSON, upsert theo external_ref, trả về kết quả từng dòng
+    if not current_user.employer_id:
+        return jsonify({"error": "Chỉ nhà tuyển dụng mới được đăng tin"}), 403
+
+    result = ingest.ingest_jobs(current_user.employer_id, ingest.iter_items(request.stream))
+    return jsonify(result), 200
+
+
 
 
-@app.route('/job')
+@main.route('/job')
 def jobs():
-    page = request.args.get('page', 1, type=int)
     per_page = 10
 
     keyword = request.args.get('keyword', '')
     location = request.args.get('location', '')
 
-    query = Job.query.filter_by(status='active')
+    # Nhóm lọc (địa điểm, hình thức, kinh nghiệm, mức lương): đếm trên bitmap trong bộ nhớ,
+    # danh sách của trang hiện tại vẫn lọc bằng SQL
+    selected = facets.parse_selection(request.args)
+    total, facet_groups = facets.index.summarize(facets.base_bitmap(keyword, location), selected)
+    conditions = facets.index.conditions(selected)
+    facet_params = {facets.PARAM_PREFIX + name: values for name, values in selected.items()}
+
+    # Link cũ dạng ?page=N vẫn dùng phân trang OFFSET
+    if 'page' in request.args:
+        page = request.args.get('page', 1, type=int)
+        # Tìm qua chỉ mục đảo (bỏ dấu), không quét bảng jobs bằng ilike '%kw%'
+        jobs = search.paginate_jobs(keyword=keyword, location=location, page=page, per_page=per_page,
+                                    conditions=conditions)
+        return render_template('job.html', jobs=jobs, facets=facet_groups, facet_params=facet_params)
+
+    # Mặc định phân trang theo cursor (posted_date, id): không COUNT(*), không OFFSET
+    jobs = search.cursor_jobs(keyword=keyword, location=location,
+                              cursor=request.args.get('cursor'), per_page=per_page, conditions=conditions)
+    jobs.total, jobs.total_capped = total, False
+
+    return render_template('job.html', jobs=jobs, facets=facet_groups, facet_params=facet_params)
+
+
+@main.route('/api/autocomplete', methods=['GET'])
+def api_autocomplete():
+    # Gợi ý khi gõ: tra chỉ mục tiền tố trong bộ nhớ, không truy vấn CSDL
+    query = request.args.get('q', '')[:100]
+    kinds = request.args.getlist('type') or autocomplete.KINDS
+    limit = min(max(request.args.get('limit', 10, type=int), 1), autocomplete.MAX_LIMIT)
+
+    response = jsonify({"query": query, "suggestions": autocomplete.index.suggest(query, kinds, limit)})
+    # Cùng q/type/limit cho mọi người dùng nên cho phép trình duyệt và CDN cache
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config["AUTOCOMPLETE_MAX_AGE"]
+    return response
+
+
+@main.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    # Cùng bộ lọc với /job (keyword, location, f_*), phân trang theo cursor, ?fields= chọn trường trả về
+    fields, invalid = serializers.parse_fields(request.args.get('fields'), serializers.LIST_FIELDS)
+    if invalid:
+        return jsonify({"error": "Trường không hợp lệ: %s" % ', '.join(invalid)}), 400
+
+    per_page = min(request.args.get('limit', 20, type=int), 100)
+    keyword = request.args.get('keyword', '')
+    location = request.args.get('location', '')
+    selected = facets.parse_selection(request.args)
+
+    # Không chọn nhóm lọc thì không cần nạp chỉ mục nhóm lọc
+    conditions = facets.index.conditions(selected) if selected else ()
+    columns, with_employer = serializers.job_columns(fields)
+    page = search.cursor_job_rows(dao.job_rows_query(columns, with_employer), keyword=keyword, location=location,
+                                  cursor=request.args.get('cursor'), per_page=max(per_page, 1),
+                                  conditions=conditions)
+
+    data = {
+        "items": [serializers.row_dict(row, fields) for row in page.items],
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+    }
+    # Tổng số chỉ tính khi được yêu cầu: có nhóm lọc thì đếm trên bitmap, không thì đếm gần đúng và cache
+    if request.args.get('count', type=int):
+        if selected:
+            data["total"], _ = facets.index.summarize(facets.base_bitmap(keyword, location), selected)
+            data["total_capped"] = False
+        else:
+            data["total"], data["total_capped"] = search.approximate_total(keyword=keyword, location=location)
+
+    return serializers.json_response(data)
+
 
-    if keyword:
-        query = query.filter(Job.title.ilike(f'%{keyword}%'))
-    if location:
-        query = query.filter(Job.location.ilike(f'%{location}%'))
+@main.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    fields, invalid = serializers.parse_fields(request.args.get('fields'), serializers.DETAIL_FIELDS)
+    if invalid:
+        return jsonify({"error": "Trường không hợp lệ: %s" % ', '.join(invalid)}), 400
 
-    jobs = query.order_by(Job.posted_date.desc()).paginate(page=page, per_page=per_page)
+    version = dao.job_detail_version(job_id)
+    if version is None or version.status != JobStatus.active:
+        return jsonify({"error": "Không tìm thấy công việc"}), 404
 
-    return render_template('job.html', jobs=jobs)
+    def render():
+        columns, with_employer = serializers.job_columns(fields)
+        row = dao.job_row(job_id, columns, with_employer)
+        if row is None:
+            return jsonify({"error": "Không tìm thấy công việc"}), 404
+        return serializers.json_response(serializers.row_dict(row, fields))
 
+    etag = conditional.make_etag('api_job', job_id, ','.join(fields), *version)
+    return conditional.respond(etag, version.updated_at, render, per_user=False)
 
-@app.route('/job/<int:job_id>')
+
+@main.route('/job/<int:job_id>')
 def job_detail(job_id):
+    is_candidate = current_user.is_authenticated and current_user.role == UserRole.CANDIDATE
+    # Truy vấn rẻ lấy thời điểm cập nhật trước: trình duyệt đã có bản mới nhất thì trả 304, không render lại
+    version = dao.job_detail_version(job_id, current_user.candidate_id if is_candidate else None)
+    if version is None or version.status != JobStatus.active:
+        return _render_job_detail(job_id)
+
+    etag = conditional.make_etag('job', job_id, current_user.get_id(), *version)
+    last_modified = max(filter(None, (version.updated_at, version.applied_date)), default=None)
+    return conditional.respond(etag, last_modified,
+                               lambda: _render_job_detail(job_id, applied=version.applied_date is not None))
+
+
+def _render_job_detail(job_id, applied=None):
     try:
         job = Job.query.get_or_404(job_id)
 
         if job.status != JobStatus.active:
             flash('Công việc này không còn tuyển dụng', 'warning')
-            return redirect(url_for('jobs'))
+            return redirect(url_for('main.jobs'))
 
-        applied = False
+        if applied is None:
+            applied = False
 
-        if current_user.is_authenticated and current_user.role == UserRole.CANDIDATE:
-            applied = Application.query.filter_by(
-                job_id=job_id,
-                candidate_id=current_user.candidate.id
-            ).first() is not None
+            if current_user.is_authenticated and current_user.role == UserRole.CANDIDATE:
+                applied = Application.query.filter_by(
+                    job_id=job_id,
+                    candidate_id=current_user.candidate_id
+                ).first() is not None
 
         return render_template('job_detail.html', job=job, applied=applied)
 
     except Exception as e:
         flash('Có lỗi xảy ra khi tải thông tin công việc', 'error')
-        return redirect(url_for('jobs'))
+        return redirect(url_for('main.jobs'))
+
+
+def init_app(app):
+    app.register_blueprint(main)
 
 
 if __name__ == "__main__":
-    from app import admin
-    app.run(debug=True, port=5000)
+    create_app().run(debug=True, port=5000)
@@ -0,0 +1,270 @@
+import io
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from types import SimpleNamespace
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert, update
+
+from app import db, search, facets, autocomplete, matching, outbox
+from app.cache import cache, JOBS_TAG
+from app.models import Job, JobStatus, Employer, make_summary
+
+BATCH_SIZE = 500
+MAX_SALARY = Decimal('99999999.99')  # Numeric(10, 2)
+
+# Trường được phép nhập và độ dài tối đa (None = Text)
+STRING_FIELDS = {
+    'title': 255,
+    'description': None,
+    'requirements': None,
+    'location': 255,
+    'work_type': 50,
+    'experience_level': 50,
+    'benefits': None,
+    'external_ref': 100,
+}
+REQUIRED_FIELDS = ('external_ref', 'title', 'description')
+# Một phần tử của mảng JSON dài quá mức này mà vẫn chưa đọc được thì coi là hỏng, không đọc tiếp
+MAX_ITEM_SIZE = 1024 * 1024
+
+
+# ĐỌC DỮ LIỆU: NDJSON hoặc mảng JSON, đọc dần từng phần, không nạp cả file vào bộ nhớ
+def _iter_json_array(text, buffer, chunk_size):
+    decoder = json.JSONDecoder()
+    pos = buffer.index('[') + 1
+    while True:
+        # Bỏ khoảng trắng và dấu phẩy giữa các phần tử
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer):
+                break
+            chunk = text.read(chunk_size)
+            if not chunk:
+                raise ValueError('Mảng JSON không được đóng')
+            buffer, pos = chunk, 0
+
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Phần tử bị cắt ở ranh giới chunk báo đủ loại lỗi, kể cả ở giữa buffer ("\u00" của một escape,
+            # "tru" của true): đọc thêm rồi thử lại, tới hết file hoặc quá MAX_ITEM_SIZE thì là phần tử hỏng
+            if len(buffer) - pos > MAX_ITEM_SIZE:
+                raise ValueError('Phần tử dài quá %d ký tự' % MAX_ITEM_SIZE)
+            chunk = text.read(chunk_size)
+            if not chunk:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        # Phần tử có thể bị cắt ngay sau một số ("12" của "123") nên cần đọc thêm
+        if end == len(buffer) and not isinstance(item, (dict, list)):
+            chunk = text.read(chunk_size)
+            if chunk:
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+        yield item
+        pos = end
+
+
+def iter_items(stream, chunk_size=64 * 1024):
+    # Trả về (thứ tự, item, lỗi đọc)
+    text = stream if isinstance(stream, io.TextIOBase) else io.TextIOWrapper(stream, encoding='utf-8')
+
+    buffer = ''
+    while not buffer.strip():
+        chunk = text.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+
+    if buffer.lstrip().startswith('['):
+        index = 0
+        try:
+            for item in _iter_json_array(text, buffer, chunk_size):
+                yield index, item, None
+                index += 1
+        except ValueError as ex:
+            # Mảng hỏng thì dừng đọc, các phần tử trước đó vẫn được ghi
+            yield index, None, 'JSON không hợp lệ: %s' % getattr(ex, 'msg', ex)
+        return
+
+    index = 0
+    pending = buffer
+    while True:
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            if line.strip():
+                yield _parse_line(index, line)
+                index += 1
+        chunk = text.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+    if pending.strip():
+        yield _parse_line(index, pending)
+
+
+def _parse_line(index, line):
+    try:
+        return index, json.loads(line), None
+    except json.JSONDecodeError as ex:
+        return index, None, 'JSON không hợp lệ: %s' % ex.msg
+
+
+# KIỂM TRA DỮ LIỆU
+def validate_item(item):
+    if not isinstance(item, dict):
+        return None, 'Mỗi phần tử phải là một object'
+
+    job = {}
+    for field, max_length in STRING_FIELDS.items():
+        value = item.get(field)
+        if value is None or value == '':
+            continue
+        if not isinstance(value, str):
+            value = str(value)
+        value = value.strip()
+        if max_length and len(value) > max_length:
+            return None, 'Trường %s dài quá %d ký tự' % (field, max_length)
+        job[field] = value
+
+    for field in REQUIRED_FIELDS:
+        if not job.get(field):
+            return None, 'Thiếu %s' % field
+
+    salary = item.get('salary')
+    if salary not in (None, ''):
+        try:
+            salary = Decimal(str(salary))
+        except InvalidOperation:
+            return None, 'salary không hợp lệ'
+        if not salary.is_finite() or salary < 0 or salary > MAX_SALARY:
+            return None, 'salary không hợp lệ'
+        job['salary'] = salary
+
+    status = item.get('status', JobStatus.active.value)
+    if not isinstance(status, str) or status not in JobStatus.__members__:
+        return None, 'status không hợp lệ'
+    job['status'] = JobStatus[status]
+
+    return job, None
+
+
+# GHI DỮ LIỆU: mỗi lô là một transaction, INSERT nhiều dòng + UPDATE theo khóa chính
+def _write_batch(employer_id, batch, results):
+    refs = [job['external_ref'] for _, job in batch]
+    existing = dict(db.session.query(Job.external_ref, Job.id)
+                    .filter(Job.employer_id == employer_id, Job.external_ref.in_(refs)))
+
+    now = datetime.utcnow()
+    to_insert, to_update = [], []
+    for index, job in batch:
+        job_id = existing.get(job['external_ref'])
+        row = dict(dict.fromkeys(STRING_FIELDS), salary=None)
+        row.update(job)
+        row['employer_id'] = employer_id
+        # Câu lệnh Core không qua @validates của Job nên tự tính summary
+        row['summary'] = make_summary(row['description'])
+        row['updated_at'] = now
+        if job_id is None:
+            row['posted_date'] = now
+            to_insert.append((index, row))
+        else:
+            row['id'] = job_id
+            to_update.append((index, row))
+
+    try:
+        if to_insert:
+            db.session.execute(insert(Job), [row for _, row in to_insert])
+        if to_update:
+            db.session.execute(update(Job), [row for _, row in to_update])
+
+        saved = {ref: (job_id, posted_date) for ref, job_id, posted_date in
+                 db.session.query(Job.external_ref, Job.id, Job.posted_date)
+                 .filter(Job.employer_id == employer_id, Job.external_ref.in_(refs))}
+        ids = {ref: job_id for ref, (job_id, _) in saved.items()}
+        written = [SimpleNamespace(**dict(row, id=saved[row['external_ref']][0],
+                                          posted_date=saved[row['external_ref']][1]))
+                   for _, row in to_insert + to_update]
+        # Ghi bằng câu lệnh Core không đi qua flush nên tự cập nhật chỉ mục tìm kiếm và outbox
+        search.index_jobs(db.session.connection(), written)
+        for event_type, rows in (('job.created', to_insert), ('job.updated', to_update)):
+            outbox.publish(db.session.connection(), event_type, [
+                {'job_id': ids[row['external_ref']], 'employer_id': employer_id, 'status': row['status'].value}
+                for _, row in rows])
+        db.session.commit()
+        matching.matcher.apply({job.id: matching.job_vector(job) for job in written}, {})
+        facets.index.apply({job.id: facets.job_entry(job) for job in written})
+        autocomplete.index.apply({job.id: autocomplete.job_entry(job) for job in written})
+    except Exception as ex:
+        db.session.rollback()
+        for index, row in to_insert + to_update:
+            results.append({'index': index, 'external_ref': row['external_ref'],
+                            'status': 'error', 'error': 'Lỗi khi ghi lô dữ liệu: %s' % ex.__class__.__name__})
+        return
+
+    for index, row in to_insert:
+        results.append({'index': index, 'external_ref': row['external_ref'],
+                        'status': 'created', 'job_id': ids[row['external_ref']]})
+    for index, row in to_update:
+        results.append({'index': index, 'external_ref': row['external_ref'],
+                        'status': 'updated', 'job_id': row['id']})
+
+
+def ingest_jobs(employer_id, items, batch_size=BATCH_SIZE):
+    results = []
+    batch = {}
+
+    def flush_batch():
+        if batch:
+            _write_batch(employer_id, list(batch.values()), results)
+            batch.clear()
+
+    for index, item, error in items:
+        job = None
+        if error is None:
+            job, error = validate_item(item)
+        if error:
+            ref = item.get('external_ref') if isinstance(item, dict) else None
+            results.append({'index': index, 'external_ref': ref, 'status': 'error', 'error': error})
+            continue
+
+        # Cùng external_ref xuất hiện lại thì ghi lô hiện tại trước để giữ đúng thứ tự
+        if job['external_ref'] in batch:
+            flush_batch()
+        batch[job['external_ref']] = (index, job)
+        if len(batch) >= batch_size:
+            flush_batch()
+    flush_batch()
+
+    if any(result['status'] != 'error' for result in results):
+        cache.invalidate(JOBS_TAG)
+
+    results.sort(key=lambda result: result['index'])
+    summary = {status: sum(1 for r in results if r['status'] == status) for status in ('created', 'updated', 'error')}
+    return {'summary': summary, 'items': results}
+
+
+@click.command('ingest-jobs')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--employer-id', type=int, required=True)
+@click.option('--batch-size', default=BATCH_SIZE, show_default=True)
+@click.option('--report', type=click.File('w', encoding='utf-8'), help='Ghi báo cáo từng dòng ra file JSON')
+@with_appcontext
+def ingest_jobs_command(source, employer_id, batch_size, report):
+    if not db.session.get(Employer, employer_id):
+        raise click.BadParameter('Không tìm thấy employer %d' % employer_id, param_hint='--employer-id')
+
+    result = ingest_jobs(employer_id, iter_items(source), batch_size=batch_size)
+    if report:
+        json.dump(result, report, ensure_ascii=False, indent=2)
+    click.echo('Tạo mới: %(created)d, cập nhật: %(updated)d, lỗi: %(error)d' % result['summary'])
+
+
+def init_app(app):
+    app.cli.add_command(ingest_jobs_command)
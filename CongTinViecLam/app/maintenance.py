@@ -0,0 +1,37 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import update
+
+from app import db
+from app.models import Job, make_summary
+
+# Lệnh điền dữ liệu một lần đi kèm các migration trong migrations/mysql (như cv-migrate của cv_store)
+
+
+def backfill_summaries(batch_size=500):
+    # Điền summary cho job tạo trước khi có cột (migration 0006): đọc theo lô khóa chính, mỗi lô một
+    # transaction ngắn; giữ nguyên updated_at vì summary không ảnh hưởng các chỉ mục đồng bộ theo cột này
+    filled = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Job.id, Job.description, Job.updated_at) \
+            .filter(Job.id > last_id, Job.summary.is_(None)).order_by(Job.id).limit(batch_size).all()
+        if not rows:
+            return filled
+        db.session.execute(update(Job), [{'id': job_id, 'summary': make_summary(description), 'updated_at': updated_at}
+                                         for job_id, description, updated_at in rows])
+        db.session.commit()
+        last_id = rows[-1].id
+        filled += len(rows)
+
+
+@click.command('job-summary-backfill')
+@click.option('--batch-size', default=500, show_default=True)
+@with_appcontext
+def job_summary_backfill_command(batch_size):
+    filled = backfill_summaries(batch_size)
+    click.echo('Đã điền summary cho %d job' % filled)
+
+
+def init_app(app):
+    app.cli.add_command(job_summary_backfill_command)
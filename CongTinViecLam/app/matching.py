@@ -0,0 +1,274 @@
+import heapq
+import math
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload, load_only
+
+from app import db
+from app.models import Job, JobStatus, CV, Candidate, JOB_LISTING
+from app.search import tokenize
+
+# Trọng số theo trường khi so khớp CV với job: kỹ năng <-> yêu cầu quan trọng nhất
+JOB_FIELDS = {'requirements': 3, 'title': 2, 'description': 1}
+CV_FIELDS = {'skills': 3, 'position': 2, 'objective': 1}
+# Mỗi tài liệu chỉ giữ các từ nặng nhất để ma trận thưa và phép nhân nhanh
+MAX_DOC_TERMS = 64
+MAX_QUERY_TERMS = 32
+MIN_TERM_LENGTH = 2
+# Từ xuất hiện trong quá 5% số dòng gần như không phân biệt được gì mà lại có danh sách dài nhất,
+# nên bỏ khỏi vector truy vấn (ma trận nhỏ thì vẫn giữ)
+MAX_DF_RATIO = 0.05
+MIN_DF_LIMIT = 50
+SYNC_OVERLAP = timedelta(seconds=5)
+LOAD_BATCH_SIZE = 1000
+
+
+def terms(text):
+    # Tiếng Việt tách theo âm tiết nên thêm cặp âm tiết liền nhau ("ke_toan") để phân biệt từ ghép
+    tokens = [token for token in tokenize(text) if len(token) >= MIN_TERM_LENGTH]
+    return tokens + ['%s_%s' % pair for pair in zip(tokens, tokens[1:])]
+
+
+def document_vector(obj, fields):
+    # TF dạng log, chuẩn hóa L2; IDF áp ở phía truy vấn để khỏi tính lại cả ma trận khi df đổi
+    weights = Counter()
+    for field, weight in fields.items():
+        for term, tf in Counter(terms(getattr(obj, field))).items():
+            weights[term] += weight * (1 + math.log(tf))
+    top = weights.most_common(MAX_DOC_TERMS)
+    norm = math.sqrt(sum(w * w for _, w in top))
+    return {term: w / norm for term, w in top} if norm else {}
+
+
+def job_vector(job):
+    status = job.status.value if isinstance(job.status, JobStatus) else job.status
+    return document_vector(job, JOB_FIELDS) if status == JobStatus.active.value else None
+
+
+def cv_vector(cv):
+    return document_vector(cv, CV_FIELDS)
+
+
+class SparseMatrix:
+    # Ma trận thưa lưu theo cả hai chiều: rows (id -> {từ: trọng số}) để cập nhật/xóa một dòng,
+    # columns (từ -> {id: trọng số}) để nhân với vector truy vấn chỉ qua các cột có giá trị
+    def __init__(self):
+        self.rows = {}
+        self.columns = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def set_row(self, row_id, vector):
+        self.remove_row(row_id)
+        if not vector:
+            return
+        self.rows[row_id] = vector
+        for term, weight in vector.items():
+            self.columns.setdefault(term, {})[row_id] = weight
+
+    def remove_row(self, row_id):
+        for term in self.rows.pop(row_id, ()):
+            column = self.columns[term]
+            del column[row_id]
+            if not column:
+                del self.columns[term]
+
+    def idf(self, term):
+        return math.log((1 + len(self.rows)) / (1 + len(self.columns.get(term, ())))) + 1
+
+    def query_vector(self, vector):
+        max_df = max(MAX_DF_RATIO * len(self.rows), MIN_DF_LIMIT)
+        weighted = {term: w * self.idf(term) for term, w in vector.items()
+                    if 0 < len(self.columns.get(term, ())) <= max_df}
+        top = heapq.nlargest(MAX_QUERY_TERMS, weighted.items(), key=lambda item: item[1])
+        norm = math.sqrt(sum(w * w for _, w in top))
+        return {term: w / norm for term, w in top} if norm else {}
+
+    def dot(self, vector):
+        # Tích vô hướng với mọi dòng, kết quả là cosine trong [0, 1]
+        scores = {}
+        for term, q in self.query_vector(vector).items():
+            for row_id, weight in self.columns[term].items():
+                scores[row_id] = scores.get(row_id, 0.0) + q * weight
+        return scores
+
+    def top_k(self, vector, k, exclude=()):
+        scores = self.dot(vector)
+        for row_id in exclude:
+            scores.pop(row_id, None)
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def scores_for(self, vector, row_ids):
+        query = self.query_vector(vector)
+        result = {}
+        for row_id in row_ids:
+            row = self.rows.get(row_id, {})
+            result[row_id] = sum(q * row[term] for term, q in query.items() if term in row)
+        return result
+
+
+class Matcher:
+    # Ma trận job đang active và ma trận CV, giữ trong bộ nhớ của tiến trình. Thay đổi trong tiến trình
+    # này được áp ngay sau commit; thay đổi từ worker khác được đồng bộ theo updated_at mỗi MATCHING_SYNC_SECONDS
+    def __init__(self):
+        self.jobs = SparseMatrix()
+        self.cvs = SparseMatrix()
+        self.loaded = False
+        self._synced_at = None
+        self._checked_at = 0
+        self._reconciled_at = 0
+        self._lock = threading.RLock()
+
+    def _load(self, since=None):
+        jobs = db.session.query(Job).options(load_only(Job.id, Job.status, *[getattr(Job, f) for f in JOB_FIELDS]))
+        cvs = db.session.query(CV).options(load_only(CV.id, *[getattr(CV, f) for f in CV_FIELDS]))
+        if since is None:
+            jobs = jobs.filter(Job.status == JobStatus.active)
+        else:
+            jobs = jobs.filter(Job.updated_at >= since)
+            cvs = cvs.filter(CV.updated_at >= since)
+
+        for job in jobs.yield_per(LOAD_BATCH_SIZE):
+            self.jobs.set_row(job.id, job_vector(job))
+        for cv in cvs.yield_per(LOAD_BATCH_SIZE):
+            self.cvs.set_row(cv.id, cv_vector(cv))
+
+    def _remove_deleted(self):
+        # Job/CV bị xóa hẳn ở worker khác không còn dòng nào để đồng bộ theo updated_at (như facets)
+        active = {job_id for (job_id,) in db.session.query(Job.id).filter(Job.status == JobStatus.active)}
+        for job_id in [job_id for job_id in self.jobs.rows if job_id not in active]:
+            self.jobs.remove_row(job_id)
+        existing = {cv_id for (cv_id,) in db.session.query(CV.id)}
+        for cv_id in [cv_id for cv_id in self.cvs.rows if cv_id not in existing]:
+            self.cvs.remove_row(cv_id)
+
+    def ensure_fresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.loaded and now - self._checked_at < current_app.config["MATCHING_SYNC_SECONDS"]:
+                return
+            started = datetime.utcnow()
+            if not self.loaded:
+                self._reconciled_at = now
+            elif now - self._reconciled_at >= current_app.config["MATCHING_RECONCILE_SECONDS"]:
+                self._remove_deleted()
+                self._reconciled_at = now
+            self._load(since=self._synced_at - SYNC_OVERLAP if self.loaded else None)
+            self.loaded = True
+            self._synced_at = started
+            self._checked_at = now
+
+    def apply(self, jobs, cvs):
+        with self._lock:
+            if not self.loaded:
+                return
+            for job_id, vector in jobs.items():
+                self.jobs.set_row(job_id, vector)
+            for cv_id, vector in cvs.items():
+                self.cvs.set_row(cv_id, vector)
+
+    def top_jobs(self, cv, k, exclude=()):
+        self.ensure_fresh()
+        with self._lock:
+            # CV đã có trong ma trận thì dùng lại vector, không cần đọc objective/skills của CV
+            vector = self.cvs.rows.get(cv.id)
+            return self.jobs.top_k(vector if vector is not None else cv_vector(cv), k, exclude)
+
+    def top_cvs(self, job, k, exclude=()):
+        self.ensure_fresh()
+        with self._lock:
+            return self.cvs.top_k(document_vector(job, JOB_FIELDS), k, exclude)
+
+    def cv_scores(self, job, cv_ids):
+        self.ensure_fresh()
+        with self._lock:
+            return self.cvs.scores_for(document_vector(job, JOB_FIELDS), cv_ids)
+
+    def reset(self):
+        with self._lock:
+            self.__init__()
+
+
+matcher = Matcher()
+
+
+def init_app(app):
+    app.config.setdefault("MATCHING_SYNC_SECONDS", int(os.environ.get("MATCHING_SYNC_SECONDS", 30)))
+    app.config.setdefault("MATCHING_RECONCILE_SECONDS", int(os.environ.get("MATCHING_RECONCILE_SECONDS", 300)))
+    # Ma trận gắn với CSDL của app, app mới thì nạp lại từ đầu
+    matcher.reset()
+
+
+# GỢI Ý CHO DASHBOARD ỨNG VIÊN VÀ TRANG ỨNG VIÊN CỦA JOB
+def recommended_jobs(cvs, limit=5, exclude_job_ids=()):
+    # Lấy điểm cao nhất của từng job trên các CV của ứng viên
+    best = {}
+    for cv in cvs:
+        for job_id, score in matcher.top_jobs(cv, limit, exclude_job_ids):
+            if score > best.get(job_id, (0, None))[0]:
+                best[job_id] = (score, cv)
+    ranked = heapq.nlargest(limit, best.items(), key=lambda item: item[1][0])
+    if not ranked:
+        return []
+
+    jobs = {job.id: job for job in Job.query.options(joinedload(Job.employer), *JOB_LISTING)
+            .filter(Job.id.in_([job_id for job_id, _ in ranked]), Job.status == JobStatus.active)}
+    return [{'job': jobs[job_id], 'score': score, 'cv': cv}
+            for job_id, (score, cv) in ranked if job_id in jobs]
+
+
+def suggested_cvs(job, limit=5, exclude_cv_ids=()):
+    ranked = [(cv_id, score) for cv_id, score in matcher.top_cvs(job, limit, exclude_cv_ids) if score > 0]
+    if not ranked:
+        return []
+
+    cvs = {cv.id: cv for cv in CV.query.options(load_only(CV.id, CV.title, CV.position, CV.skills),
+                                                joinedload(CV.candidate).load_only(Candidate.full_name))
+           .filter(CV.id.in_([cv_id for cv_id, _ in ranked]))}
+    return [{'cv': cvs[cv_id], 'score': score} for cv_id, score in ranked if cv_id in cvs]
+
+
+# Cập nhật ma trận sau commit (manage_cv, tạo/sửa/đóng job, admin); rollback thì bỏ qua
+_JOB_ATTRS = ('status',) + tuple(JOB_FIELDS)
+_CV_ATTRS = tuple(CV_FIELDS)
+
+
+def _changed(obj, attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_matching_changes(session, flush_context):
+    if not matcher.loaded:
+        return
+    jobs, cvs = session.info.setdefault('matching_changes', ({}, {}))
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Job) and (obj in session.new or _changed(obj, _JOB_ATTRS)):
+            jobs[obj.id] = job_vector(obj)
+        elif isinstance(obj, CV) and (obj in session.new or _changed(obj, _CV_ATTRS)):
+            cvs[obj.id] = cv_vector(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            jobs[obj.id] = None
+        elif isinstance(obj, CV):
+            cvs[obj.id] = None
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_after_commit(session):
+    changes = session.info.pop('matching_changes', None)
+    if changes:
+        matcher.apply(*changes)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('matching_changes', None)
@@ -1,9 +1,11 @@
 from werkzeug.security import generate_password_hash, check_password_hash
-from app import db, app
+from app import db
 from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import validates, defer
 from flask_login import UserMixin
 from datetime import datetime
 from enum import Enum
+import re
 
 
 class UserRole(Enum):
@@ -41,6 +43,15 @@ class User(UserMixin, db.Model):
     def get_id(self):
         return str(self.id)
 
+    # Cùng giao diện với identity.Principal để route dùng được cả hai
+    @property
+    def candidate_id(self):
+        return self.candidate.id if self.candidate else None
+
+    @property
+    def employer_id(self):
+        return self.employer.id if self.employer else None
+
 
 class Candidate(db.Model):
     __tablename__ = 'candidates'
@@ -54,6 +65,10 @@ class Candidate(db.Model):
 
     applications = db.relationship('Application', backref='candidate', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_candidates_user_id', 'user_id'),
+    )
+
 
 class Employer(db.Model):
     __tablename__ = 'employers'
@@ -63,9 +78,15 @@ class Employer(db.Model):
     company_name = db.Column(db.String(255), nullable=False)
     company_address = db.Column(db.Text, nullable=True)
     contact_person = db.Column(db.String(255), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     jobs = db.relationship('Job', backref='employer', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_employers_user_id', 'user_id'),
+        db.Index('ix_employers_updated_at', 'updated_at'),  # autocomplete đồng bộ tên công ty theo updated_at
+    )
+
 
 class CV(db.Model):
     __tablename__ = 'cvs'
@@ -81,14 +102,96 @@ class CV(db.Model):
 
     objective = db.Column(db.Text)
     skills = Column(String(255), nullable=True)
-    experience = db.Column(db.Text)  # Format: company|position|period|description|||...
-    education = db.Column(db.Text)  # Format: school|degree|period|description|||...
+    # Định dạng cũ company|position|period|description|||..., chỉ còn giữ cho tới khi chạy
+    # `flask cv-migrate`; dữ liệu mới nằm trong cv_experiences / cv_educations
+    experience = db.Column(db.Text)
+    education = db.Column(db.Text)
 
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     candidate = db.relationship('Candidate', backref='cvs', lazy=True)
     applications = db.relationship('Application', backref='cv', lazy=True)
+    experiences = db.relationship('CVExperience', backref='cv', lazy=True, order_by='CVExperience.sort_order',
+                                  cascade='all, delete-orphan', passive_deletes=True)
+    educations = db.relationship('CVEducation', backref='cv', lazy=True, order_by='CVEducation.sort_order',
+                                 cascade='all, delete-orphan', passive_deletes=True)
+
+    __table_args__ = (
+        db.Index('ix_cvs_candidate_id', 'candidate_id'),
+        db.Index('ix_cvs_updated_at', 'updated_at'),  # matching đồng bộ theo updated_at
+    )
+
+
+YEAR_PATTERN = re.compile(r'\b(?:19|20)\d{2}\b')
+ONGOING_PATTERN = re.compile(r'nay|hiện tại|present|now', re.IGNORECASE)
+
+
+def parse_period(period):
+    # "2020-2022" -> (2020, 2022); "2021 - nay" -> (2021, None); không có năm -> (None, None)
+    years = [int(year) for year in YEAR_PATTERN.findall(period or '')]
+    if not years:
+        return None, None
+    if len(years) == 1 and ONGOING_PATTERN.search(period):
+        return years[0], None
+    return min(years), max(years)
+
+
+class CVPeriodMixin:
+    period = db.Column(db.String(50))
+    # Năm bắt đầu/kết thúc tách từ period để lọc bằng SQL; period_end NULL = đến nay
+    period_start = db.Column(db.Integer)
+    period_end = db.Column(db.Integer)
+    description = db.Column(db.Text)
+    sort_order = db.Column(db.Integer, nullable=False, default=0)
+
+    @validates('period')
+    def _sync_period_years(self, key, period):
+        self.period_start, self.period_end = parse_period(period)
+        return period
+
+
+class CVExperience(CVPeriodMixin, db.Model):
+    __tablename__ = 'cv_experiences'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cv_id = db.Column(db.Integer, db.ForeignKey('cvs.id', ondelete='CASCADE'), nullable=False, index=True)
+    company = db.Column(db.String(255), nullable=False, index=True)
+    position = db.Column(db.String(255))
+
+    def to_dict(self):
+        return {"company": self.company, "position": self.position, "period": self.period,
+                "period_start": self.period_start, "period_end": self.period_end,
+                "description": self.description}
+
+
+class CVEducation(CVPeriodMixin, db.Model):
+    __tablename__ = 'cv_educations'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cv_id = db.Column(db.Integer, db.ForeignKey('cvs.id', ondelete='CASCADE'), nullable=False, index=True)
+    school = db.Column(db.String(255), nullable=False)
+    degree = db.Column(db.String(255), index=True)
+
+    def to_dict(self):
+        return {"school": self.school, "degree": self.degree, "period": self.period,
+                "period_start": self.period_start, "period_end": self.period_end,
+                "description": self.description}
+
+
+SUMMARY_LENGTH = 200
+
+
+def make_summary(text):
+    # Đoạn xem trước trên thẻ job: gộp khoảng trắng/xuống dòng, cắt ở ranh giới từ
+    text = ' '.join((text or '').split())
+    if len(text) <= SUMMARY_LENGTH:
+        return text
+    cut = text[:SUMMARY_LENGTH]
+    space = cut.rfind(' ')
+    if space > SUMMARY_LENGTH // 2:
+        cut = cut[:space]
+    return cut.rstrip(' ,.;:-') + '…'
 
 
 class Job(db.Model):
@@ -99,6 +202,8 @@ class Job(db.Model):
 
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=False)
+    # Bản rút gọn của description cho trang danh sách, tự cập nhật khi gán description
+    summary = db.Column(db.String(255))
     requirements = db.Column(db.Text)
     location = db.Column(db.String(255))
     salary = db.Column(db.Numeric(10, 2))
@@ -111,9 +216,25 @@ class Job(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     status = db.Column(db.Enum(JobStatus), default='pending')
+    external_ref = db.Column(db.String(100), nullable=True)  # Mã tin từ nguồn đối tác, dùng để upsert
 
     applications = db.relationship('Application', backref='job', lazy=True)
 
+    __table_args__ = (
+        db.UniqueConstraint('employer_id', 'external_ref', name='unique_job_external_ref'),
+        # Danh sách /job, trang chủ, đếm job active: lọc status, xếp posted_date (id nằm sẵn cuối index)
+        db.Index('ix_jobs_status_posted_date', 'status', 'posted_date'),
+        # Dashboard nhà tuyển dụng: danh sách job theo ngày đăng và đếm theo trạng thái (covering)
+        db.Index('ix_jobs_employer_posted_date', 'employer_id', 'posted_date'),
+        db.Index('ix_jobs_employer_status', 'employer_id', 'status'),
+        db.Index('ix_jobs_updated_at', 'updated_at'),
+    )
+
+    @validates('description')
+    def _sync_summary(self, key, description):
+        self.summary = make_summary(description)
+        return description
+
 
 class Application(db.Model):
     __tablename__ = 'applications'
@@ -124,14 +245,88 @@ class Application(db.Model):
     cv_id = db.Column(db.Integer, db.ForeignKey('cvs.id'), nullable=False)
     applied_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     status = db.Column(db.Enum('pending', 'reviewed', 'accepted', 'rejected'), default='pending')
+    # Header Idempotency-Key của lần nộp: client gửi lại cùng key thì nhận lại kết quả cũ
+    idempotency_key = db.Column(db.String(64))
 
     __table_args__ = (
         db.UniqueConstraint('job_id', 'candidate_id', name='unique_application'),
+        db.UniqueConstraint('candidate_id', 'idempotency_key', name='unique_application_idempotency_key'),
+        # Đếm theo (job, trạng thái) chỉ đọc index; lọc theo trạng thái rồi xếp theo ngày nộp
+        db.Index('ix_applications_job_status_applied', 'job_id', 'status', 'applied_date'),
+        db.Index('ix_applications_job_applied', 'job_id', 'applied_date'),
+        db.Index('ix_applications_candidate_applied', 'candidate_id', 'applied_date'),
+    )
+
+
+class OutboxEvent(db.Model):
+    __tablename__ = 'outbox_events'
+
+    # Ghi cùng transaction với thay đổi nghiệp vụ, worker (`flask outbox-worker`) xử lý sau
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = db.Column(db.String(64), nullable=False)  # application.created, job.updated...
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Thời điểm được thử lại
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+    __table_args__ = (
+        # Worker lấy các event pending đã tới hạn theo thứ tự id
+        db.Index('ix_outbox_events_status_available', 'status', 'available_at'),
     )
 
 
+class Notification(db.Model):
+    __tablename__ = 'notifications'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    event_id = db.Column(db.Integer)  # Event outbox tạo ra thông báo, chống tạo trùng khi event được giao lại
+    message = db.Column(db.String(500), nullable=False)
+    link = db.Column(db.String(255))
+    is_read = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at'),
+        db.UniqueConstraint('event_id', 'user_id', name='unique_notification_event_user'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'message': self.message,
+            'link': self.link,
+            'is_read': self.is_read,
+            'created_at': self.created_at.isoformat(),
+        }
+
+
+class JobSearchTerm(db.Model):
+    __tablename__ = 'job_search_terms'
+    # Lưu theo khóa chính (term, job_id) như InnoDB để đọc danh sách job của một từ không cần tra bảng
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    # Chỉ mục đảo: mỗi dòng là một từ (đã bỏ dấu) xuất hiện trong một job đang active
+    term = db.Column(db.String(64), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True, index=True)
+    weight = db.Column(db.Integer, nullable=False, default=1)
+    in_location = db.Column(db.Boolean, nullable=False, default=False)
+    posted_date = db.Column(db.DateTime, nullable=False)  # Sao chép từ jobs để xếp hạng không cần join
+
+
+# Trang danh sách chỉ hiện tiêu đề, thông tin ngắn và summary: không nạp các cột Text dài
+# (truy cập tới thì SQLAlchemy mới nạp riêng cột đó)
+JOB_LISTING = (defer(Job.description), defer(Job.requirements), defer(Job.benefits))
+CV_LISTING = (defer(CV.objective), defer(CV.experience), defer(CV.education))
+
+
 if __name__ == "__main__":
-    with app.app_context():
+    from app import create_app
+
+    with create_app().app_context():
         db.create_all()
 
         import hashlib
@@ -139,4 +334,5 @@ if __name__ == "__main__":
         u = User(username='admin', password=str(hashlib.md5('123456'.encode('utf-8')).hexdigest()),
                  role=UserRole.ADMIN)
         db.session.add(u)
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
+
@@ -0,0 +1,63 @@
+from app import db, outbox
+from app.models import Notification, Job, Employer, Candidate
+
+STATUS_LABELS = {
+    'pending': 'đang chờ duyệt',
+    'reviewed': 'đã được xem',
+    'accepted': 'được chấp nhận',
+    'rejected': 'chưa phù hợp',
+}
+
+
+def _notify(event_id, user_id, message, link):
+    # Event có thể được giao lại (worker chết sau khi commit, trước khi đánh dấu done): đã có thông báo của
+    # event này thì bỏ qua. Hai worker cùng xử lý một event thì UNIQUE (event_id, user_id) chặn bản thứ hai,
+    # event đó được thử lại và lần sau rơi vào nhánh bỏ qua
+    exists = db.session.query(Notification.id).filter_by(event_id=event_id, user_id=user_id).first()
+    if exists is None:
+        db.session.add(Notification(event_id=event_id, user_id=user_id, message=message, link=link))
+
+
+# Chạy trong worker của outbox, không nằm trên đường xử lý request
+@outbox.subscribe('application.created')
+def notify_employer(event_id, payload):
+    # Ứng viên và job không có quan hệ trực tiếp: lấy tên ứng viên bằng subquery, tránh tích Descartes
+    full_name = db.session.query(Candidate.full_name) \
+        .filter(Candidate.id == payload['candidate_id']).scalar_subquery()
+    row = db.session.query(Employer.user_id, Job.title, full_name.label('full_name')) \
+        .join(Job, Job.employer_id == Employer.id) \
+        .filter(Job.id == payload['job_id']) \
+        .first()
+    if row is None or row.full_name is None:
+        return
+    _notify(event_id, row.user_id, 'Ứng viên %s vừa ứng tuyển vị trí %s' % (row.full_name, row.title),
+            '/employer/job/%d/candidate' % payload['job_id'])
+
+
+@outbox.subscribe('application.reviewed')
+def notify_candidate(event_id, payload):
+    title = db.session.query(Job.title).filter(Job.id == payload['job_id']).scalar_subquery()
+    row = db.session.query(Candidate.user_id, title.label('title')) \
+        .filter(Candidate.id == payload['candidate_id']) \
+        .first()
+    if row is None or row.title is None:
+        return
+    _notify(event_id, row.user_id,
+            'Hồ sơ ứng tuyển %s của bạn %s' % (row.title, STATUS_LABELS.get(payload['status'], payload['status'])),
+            '/candidate/dashboard')
+
+
+def recent_notifications(user_id, limit=20):
+    return Notification.query.filter_by(user_id=user_id) \
+        .order_by(Notification.created_at.desc()).limit(limit).all()
+
+
+def unread_count(user_id):
+    return Notification.query.filter_by(user_id=user_id, is_read=False).count()
+
+
+def mark_all_read(user_id):
+    count = Notification.query.filter_by(user_id=user_id, is_read=False) \
+        .update({'is_read': True}, synchronize_session=False)
+    db.session.commit()
+    return count
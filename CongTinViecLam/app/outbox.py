@@ -0,0 +1,187 @@
+import json
+import os
+import random
+import signal
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect, update, or_
+
+from app import db
+from app.models import OutboxEvent, Application, Job
+
+# Các event đang phát ra:
+#   application.created   {application_id, job_id, candidate_id, cv_id}
+#   application.reviewed  {application_id, job_id, candidate_id, status, previous_status}
+#   job.created / job.updated / job.deleted  {job_id, employer_id, status}
+# Worker giao event ít nhất một lần (at-least-once): handler(event_id, payload) phải chịu được việc nhận lại
+# cùng event, vd. dùng event_id làm khóa chống ghi trùng
+_handlers = {}
+
+
+def subscribe(*event_types):
+    def decorator(fn):
+        for event_type in event_types:
+            _handlers.setdefault(event_type, []).append(fn)
+        return fn
+    return decorator
+
+
+def publish(connection, event_type, payloads):
+    # Ghi bằng connection của transaction hiện tại: event chỉ tồn tại nếu thay đổi nghiệp vụ được commit
+    if payloads:
+        connection.execute(OutboxEvent.__table__.insert(),
+                           [{'event_type': event_type, 'payload': json.dumps(payload)} for payload in payloads])
+
+
+def _job_payload(job):
+    return {'job_id': job.id, 'employer_id': job.employer_id,
+            'status': job.status.value if hasattr(job.status, 'value') else job.status}
+
+
+@event.listens_for(db.session, 'after_flush')
+def _record_events(session, flush_context):
+    # Event sinh từ flush của ORM (apply_job, review_application, tạo/sửa/đóng/xóa job, admin).
+    # Câu lệnh Core (duyệt hàng loạt, nhập job) không đi qua đây nên tự gọi publish()
+    events = {}
+    for obj in session.new:
+        if isinstance(obj, Application):
+            events.setdefault('application.created', []).append(
+                {'application_id': obj.id, 'job_id': obj.job_id, 'candidate_id': obj.candidate_id, 'cv_id': obj.cv_id})
+        elif isinstance(obj, Job):
+            events.setdefault('job.created', []).append(_job_payload(obj))
+    for obj in session.dirty:
+        if isinstance(obj, Application):
+            history = inspect(obj).attrs.status.history
+            if history.has_changes():
+                events.setdefault('application.reviewed', []).append(
+                    {'application_id': obj.id, 'job_id': obj.job_id, 'candidate_id': obj.candidate_id,
+                     'status': obj.status, 'previous_status': history.deleted[0] if history.deleted else None})
+        elif isinstance(obj, Job) and session.is_modified(obj, include_collections=False):
+            events.setdefault('job.updated', []).append(_job_payload(obj))
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            events.setdefault('job.deleted', []).append(_job_payload(obj))
+
+    for event_type, payloads in events.items():
+        publish(session.connection(), event_type, payloads)
+
+
+# WORKER
+def _backoff(attempts):
+    config = current_app.config
+    delay = min(config["OUTBOX_MAX_BACKOFF_SECONDS"], config["OUTBOX_BACKOFF_SECONDS"] * 2 ** (attempts - 1))
+    # Jitter để các event lỗi cùng lúc không cùng thử lại một lúc
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _claim(batch_size):
+    # Lấy các event tới hạn và giữ chỗ (lease) cho worker này. SKIP LOCKED (MySQL 8) để nhiều worker
+    # chạy song song không lấy trùng; event đang 'processing' quá hạn lease là của worker đã chết, lấy lại
+    now = datetime.utcnow()
+    events = OutboxEvent.query \
+        .filter(or_(OutboxEvent.status == 'pending', OutboxEvent.status == 'processing'),
+                OutboxEvent.available_at <= now) \
+        .order_by(OutboxEvent.id) \
+        .limit(batch_size) \
+        .with_for_update(skip_locked=True) \
+        .all()
+    if events:
+        db.session.execute(update(OutboxEvent)
+                           .where(OutboxEvent.id.in_([e.id for e in events]))
+                           .values(status='processing',
+                                   available_at=now + timedelta(seconds=current_app.config["OUTBOX_LEASE_SECONDS"]))
+                           .execution_options(synchronize_session=False))
+    claimed = [(e.id, e.event_type, e.payload, e.attempts) for e in events]
+    db.session.commit()
+    return claimed
+
+
+def _dispatch(event_id, event_type, payload):
+    for handler in _handlers.get(event_type, ()):
+        handler(event_id, payload)
+
+
+def process_batch(batch_size=None):
+    batch_size = batch_size or current_app.config["OUTBOX_BATCH_SIZE"]
+    claimed = _claim(batch_size)
+    done, failed = [], []
+    for event_id, event_type, payload, attempts in claimed:
+        # Mỗi event một transaction: handler lỗi chỉ rollback phần việc của event đó
+        try:
+            _dispatch(event_id, event_type, json.loads(payload))
+            db.session.commit()
+            done.append(event_id)
+        except Exception as ex:
+            db.session.rollback()
+            current_app.logger.exception('Outbox event %s (%s) lỗi', event_id, event_type)
+            failed.append((event_id, attempts + 1, '%s: %s' % (ex.__class__.__name__, ex)))
+
+    now = datetime.utcnow()
+    if done:
+        db.session.execute(update(OutboxEvent).where(OutboxEvent.id.in_(done))
+                           .values(status='done', processed_at=now, attempts=OutboxEvent.attempts + 1)
+                           .execution_options(synchronize_session=False))
+    for event_id, attempts, error in failed:
+        gave_up = attempts >= current_app.config["OUTBOX_MAX_ATTEMPTS"]
+        db.session.execute(update(OutboxEvent).where(OutboxEvent.id == event_id)
+                           .values(status='failed' if gave_up else 'pending', attempts=attempts,
+                                   available_at=now + timedelta(seconds=_backoff(attempts)),
+                                   last_error=error[:2000])
+                           .execution_options(synchronize_session=False))
+    db.session.commit()
+    return {'claimed': len(claimed), 'done': len(done), 'failed': len(failed)}
+
+
+def run_worker(batch_size=None, poll_interval=None, once=False):
+    poll_interval = poll_interval or current_app.config["OUTBOX_POLL_SECONDS"]
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+
+    totals = {'claimed': 0, 'done': 0, 'failed': 0}
+    while not stopping:
+        result = process_batch(batch_size)
+        for key, value in result.items():
+            totals[key] += value
+        if not result['claimed']:
+            if once:
+                break
+            time.sleep(poll_interval)
+        db.session.remove()
+    return totals
+
+
+def requeue_failed():
+    # Đưa các event đã hết lượt thử về hàng đợi (sau khi sửa lỗi của handler)
+    count = db.session.execute(update(OutboxEvent).where(OutboxEvent.status == 'failed')
+                               .values(status='pending', attempts=0, available_at=datetime.utcnow())
+                               .execution_options(synchronize_session=False)).rowcount
+    db.session.commit()
+    return count
+
+
+@click.command('outbox-worker')
+@click.option('--batch-size', type=int, help='Số event lấy mỗi lần (mặc định OUTBOX_BATCH_SIZE)')
+@click.option('--poll-interval', type=float, help='Số giây chờ khi hàng đợi rỗng (mặc định OUTBOX_POLL_SECONDS)')
+@click.option('--once', is_flag=True, help='Xử lý hết các event đang tới hạn rồi thoát')
+@click.option('--retry-failed', is_flag=True, help='Đưa các event failed về pending trước khi chạy')
+@with_appcontext
+def outbox_worker_command(batch_size, poll_interval, once, retry_failed):
+    if retry_failed:
+        click.echo('Đưa lại %d event lỗi vào hàng đợi' % requeue_failed())
+    totals = run_worker(batch_size, poll_interval, once)
+    click.echo('Đã xử lý %(done)d event, lỗi %(failed)d' % totals)
+
+
+def init_app(app):
+    app.config.setdefault("OUTBOX_BATCH_SIZE", int(os.environ.get("OUTBOX_BATCH_SIZE", 100)))
+    app.config.setdefault("OUTBOX_POLL_SECONDS", float(os.environ.get("OUTBOX_POLL_SECONDS", 1)))
+    app.config.setdefault("OUTBOX_MAX_ATTEMPTS", int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 8)))
+    app.config.setdefault("OUTBOX_BACKOFF_SECONDS", float(os.environ.get("OUTBOX_BACKOFF_SECONDS", 5)))
+    app.config.setdefault("OUTBOX_MAX_BACKOFF_SECONDS", float(os.environ.get("OUTBOX_MAX_BACKOFF_SECONDS", 3600)))
+    # Worker chết giữa chừng thì event được worker khác lấy lại sau khoảng này
+    app.config.setdefault("OUTBOX_LEASE_SECONDS", int(os.environ.get("OUTBOX_LEASE_SECONDS", 300)))
+    app.cli.add_command(outbox_worker_command)
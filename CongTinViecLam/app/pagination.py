@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from flask import current_app
+from itsdangerous import URLSafeSerializer, BadSignature
+from sqlalchemy import and_, or_
+
+
+def _serializer():
+    # Cursor được ký bằng secret_key nên client không đọc/sửa được khóa bên trong
+    return URLSafeSerializer(current_app.secret_key, salt='keyset-cursor')
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(key, direction='next'):
+    return _serializer().dumps({'d': direction, 'k': [_dump_value(v) for v in key]})
+
+
+def decode_cursor(token, key_size):
+    # Cursor hỏng hoặc không khớp kiểu truy vấn thì quay về trang đầu
+    if not token:
+        return 'next', None
+    try:
+        data = _serializer().loads(token)
+        direction, key = data['d'], [_load_value(v) for v in data['k']]
+    except (BadSignature, KeyError, TypeError, ValueError):
+        return 'next', None
+    if direction not in ('next', 'prev') or len(key) != key_size:
+        return 'next', None
+    return direction, key
+
+
+def keyset_condition(columns, key, direction):
+    # (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y); các cột đều sắp xếp giảm dần
+    clauses = []
+    for i, column in enumerate(columns):
+        compare = column < key[i] if direction == 'next' else column > key[i]
+        clauses.append(and_(*[columns[j] == key[j] for j in range(i)], compare))
+    return or_(*clauses)
+
+
+class CursorPage:
+    def __init__(self, items, first_key, last_key, has_next, has_prev, total=None, total_capped=False):
+        self.items = items
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = encode_cursor(last_key, 'next') if has_next else None
+        self.prev_cursor = encode_cursor(first_key, 'prev') if has_prev else None
+        self.total = total
+        self.total_capped = total_capped
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def keyset_paginate(query, columns, key_of, cursor=None, per_page=10, load=None):
+    # Phân trang theo khóa (không OFFSET, không COUNT): chi phí mỗi trang không đổi dù trang sâu
+    direction, key = decode_cursor(cursor, len(columns))
+    if key is not None:
+        query = query.filter(keyset_condition(columns, key, direction))
+
+    if direction == 'next':
+        query = query.order_by(*[column.desc() for column in columns])
+    else:
+        query = query.order_by(*[column.asc() for column in columns])
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'prev':
+        rows.reverse()
+
+    if direction == 'next':
+        has_next, has_prev = has_more, key is not None
+    else:
+        has_next, has_prev = True, has_more
+
+    first_key = key_of(rows[0]) if rows else None
+    last_key = key_of(rows[-1]) if rows else None
+    items = load(rows) if load else rows
+    return CursorPage(items, first_key, last_key, has_next and bool(rows), has_prev and bool(rows))
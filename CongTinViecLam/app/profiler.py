@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import g, request, current_app, has_request_context, before_render_template, template_rendered
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.models import UserRole
+
+STATEMENT_MAX_LENGTH = 500
+
+
+class RequestLog:
+    # Ring buffer: đầy thì bản ghi cũ nhất bị đẩy ra, bộ nhớ không tăng theo thời gian chạy
+    def __init__(self, size):
+        self._records = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def resize(self, size):
+        with self._lock:
+            self._records = deque(self._records, maxlen=size)
+
+    def stats(self):
+        endpoints = {}
+        for record in self.records():
+            endpoints.setdefault(record['endpoint'], []).append(record)
+
+        result = []
+        for endpoint, records in endpoints.items():
+            totals = sorted(record['total_ms'] for record in records)
+            slowest = sorted((statement for record in records for statement in record['slowest']),
+                             key=lambda statement: statement[0], reverse=True)
+            result.append({
+                'endpoint': endpoint,
+                'count': len(records),
+                'errors': sum(1 for record in records if record['status'] >= 500),
+                'p50_ms': _percentile(totals, 50),
+                'p95_ms': _percentile(totals, 95),
+                'max_ms': totals[-1],
+                'avg_queries': sum(record['queries'] for record in records) / len(records),
+                'max_queries': max(record['queries'] for record in records),
+                'avg_db_ms': sum(record['db_ms'] for record in records) / len(records),
+                'avg_render_ms': sum(record['render_ms'] for record in records) / len(records),
+                'total_ms': sum(totals),
+                'slowest': slowest[:current_app.config["PROFILER_SLOW_STATEMENTS"]],
+            })
+        # Endpoint tốn nhiều thời gian nhất (cộng dồn) lên đầu
+        result.sort(key=lambda item: item['total_ms'], reverse=True)
+        return result
+
+
+def _percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+request_log = RequestLog(1000)
+
+
+def _current():
+    return g.get('_profile') if has_request_context() else None
+
+
+# Đo mọi câu SQL chạy trong request (gắn vào lớp Engine nên áp dụng cho mọi engine)
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current() is not None:
+        conn.info.setdefault('_profile_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current()
+    started = conn.info.get('_profile_started')
+    if profile is None or not started:
+        return
+    elapsed = (time.perf_counter() - started.pop()) * 1000
+    profile['queries'] += 1
+    profile['db_ms'] += elapsed
+
+    slowest = profile['slowest']
+    limit = current_app.config["PROFILER_SLOW_STATEMENTS"]
+    if len(slowest) < limit or elapsed > slowest[-1][0]:
+        slowest.append((elapsed, statement[:STATEMENT_MAX_LENGTH]))
+        slowest.sort(key=lambda item: item[0], reverse=True)
+        del slowest[limit:]
+
+
+def _before_render(sender, template, context, **extra):
+    profile = _current()
+    if profile is not None:
+        profile['render_started'] = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    profile = _current()
+    if profile is not None and profile.get('render_started'):
+        profile['render_ms'] += (time.perf_counter() - profile.pop('render_started')) * 1000
+
+
+def start_profile():
+    if current_app.config["PROFILER_ENABLED"] and request.endpoint != 'static':
+        g._profile = {'started': time.perf_counter(), 'queries': 0, 'db_ms': 0.0, 'render_ms': 0.0,
+                      'slowest': []}
+
+
+def _finish(status):
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return None
+    record = {
+        'endpoint': request.endpoint or request.path,
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'status': status,
+        'at': datetime.now(),
+        'total_ms': (time.perf_counter() - profile['started']) * 1000,
+        'db_ms': profile['db_ms'],
+        # Câu SQL lazy-load chạy trong lúc render được tính vào cả db lẫn render
+        'render_ms': profile['render_ms'],
+        'queries': profile['queries'],
+        'slowest': profile['slowest'],
+    }
+    request_log.add(record)
+    return record
+
+
+def _show_server_timing():
+    # Header lộ thời gian truy vấn/số câu SQL: chỉ gửi khi bật riêng (mặc định khi debug) hoặc cho admin
+    if current_app.config["PROFILER_SERVER_TIMING"]:
+        return True
+    # Không có cookie session thì không thể là admin: không đọc session để response công khai không bị
+    # thêm Vary: Cookie
+    if current_app.config["SESSION_COOKIE_NAME"] not in request.cookies:
+        return False
+    return current_user.is_authenticated and current_user.role == UserRole.ADMIN
+
+
+def add_server_timing(response):
+    record = _finish(response.status_code)
+    if record is not None and _show_server_timing():
+        response.headers.add('Server-Timing', 'db;dur=%.1f;desc="%d queries", render;dur=%.1f, total;dur=%.1f' % (
+            record['db_ms'], record['queries'], record['render_ms'], record['total_ms']))
+    return response
+
+
+def record_failed_request(exc):
+    # after_request không chạy khi có exception chưa được xử lý
+    if exc is not None:
+        _finish(500)
+
+
+def init_app(app):
+    app.config.setdefault("PROFILER_ENABLED", os.environ.get("PROFILER_ENABLED", "1") != "0")
+    # Gửi header Server-Timing cho mọi client; tắt thì chỉ admin nhận được
+    app.config.setdefault("PROFILER_SERVER_TIMING",
+                          os.environ.get("PROFILER_SERVER_TIMING", "1" if app.debug else "0") != "0")
+    # Số request gần nhất được giữ lại trong bộ nhớ
+    app.config.setdefault("PROFILER_BUFFER_SIZE", int(os.environ.get("PROFILER_BUFFER_SIZE", 1000)))
+    # Số câu SQL chậm nhất giữ lại cho mỗi request
+    app.config.setdefault("PROFILER_SLOW_STATEMENTS", int(os.environ.get("PROFILER_SLOW_STATEMENTS", 3)))
+    request_log.resize(app.config["PROFILER_BUFFER_SIZE"])
+
+    app.before_request(start_profile)
+    app.after_request(add_server_timing)
+    app.teardown_request(record_failed_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
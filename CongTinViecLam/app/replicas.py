@@ -0,0 +1,67 @@
+import random
+import time
+
+from flask import g, request, session, current_app, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+
+# Module này không import db: app/__init__.py cần RoutingSession trước khi tạo db
+
+# Thời điểm (epoch) mà trước đó người dùng vừa ghi phải đọc từ primary, lưu trong session cookie
+PRIMARY_UNTIL_KEY = '_primary_until'
+READ_ONLY_METHODS = ('GET', 'HEAD')
+
+
+def create_engines(uris, options_for):
+    # Không dùng SQLALCHEMY_BINDS: bind của Flask-SQLAlchemy gắn với metadata/model, còn replica có cùng
+    # schema với primary và được chọn theo request
+    return [create_engine(uri, **options_for(uri)) for uri in uris]
+
+
+class RoutingSession(Session):
+    # SELECT trong request chỉ đọc đi replica (nếu có), còn lại (flush, INSERT/UPDATE/DELETE,
+    # session.connection(), CLI, test) vẫn dùng primary như bình thường
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select):
+            engine = _replica_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _replica_engine():
+    return g.get('_db_replica') if has_request_context() else None
+
+
+def choose_replica():
+    # Cả request đọc cùng một replica để không thấy dữ liệu lệch nhau giữa các replica
+    engines = current_app.extensions['db_replicas']
+    if not engines or request.method not in READ_ONLY_METHODS:
+        return
+    # Chỉ đọc session khi có cookie: đọc session làm response bị thêm Vary: Cookie
+    if current_app.config["SESSION_COOKIE_NAME"] in request.cookies \
+            and session.get(PRIMARY_UNTIL_KEY, 0) > time.time():
+        return
+    g._db_replica = random.choice(engines)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _track_writes(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and (context.isinsert or context.isupdate or context.isdelete) and has_request_context():
+        # Đã ghi thì phần còn lại của request đọc từ primary
+        g._db_wrote = True
+        g._db_replica = None
+
+
+def keep_primary_after_write(response):
+    # Read-your-writes: sau khi tự ghi, người dùng đọc từ primary thêm một khoảng để replica kịp đồng bộ
+    if g.get('_db_wrote') and current_app.extensions['db_replicas']:
+        session[PRIMARY_UNTIL_KEY] = time.time() + current_app.config["DB_READ_YOUR_WRITES_SECONDS"]
+    return response
+
+
+def init_app(app):
+    app.before_request(choose_replica)
+    app.after_request(keep_primary_after_write)
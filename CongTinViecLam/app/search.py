@@ -0,0 +1,364 @@
+import re
+import time
+import unicodedata
+from collections import Counter
+
+import click
+from flask.cli import with_appcontext
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.cache import cache
+from app.models import Job, JobStatus, JobSearchTerm, JOB_LISTING
+from app.pagination import keyset_paginate
+
+# Trọng số theo trường: khớp ở tiêu đề quan trọng hơn khớp ở mô tả
+FIELD_WEIGHTS = {
+    'title': 5,
+    'location': 3,
+    'requirements': 1,
+    'description': 1,
+}
+# Giới hạn số lần đếm một từ trong một trường để mô tả dài không lấn át tiêu đề
+MAX_TERM_FREQUENCY = 3
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+DF_CACHE_SIZE = 10000
+DF_CACHE_TTL = 600
+# Từ cuối cùng của từ khóa khớp theo tiền tố ("dev" -> developer, devops) như ilike '%kw%' trước đây
+# vẫn tìm được khi người dùng gõ dở; từ quá ngắn khớp quá nhiều job nên chỉ khớp nguyên từ
+MIN_PREFIX_LENGTH = 3
+COUNT_CAP = 10000
+COUNT_TTL = 300
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Số job chứa mỗi từ, chỉ dùng để chọn thứ tự join nên không cần chính xác tuyệt đối,
+# nhưng vẫn hết hạn sau DF_CACHE_TTL giây để theo kịp dữ liệu
+_df_cache = {}
+
+
+def fold(text):
+    # Bỏ dấu tiếng Việt: "Kế toán Hà Nội" -> "ke toan ha noi"
+    if not text:
+        return ''
+    text = text.replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+    return text.lower()
+
+
+def tokenize(text):
+    return [t[:MAX_TERM_LENGTH] for t in _TOKEN_RE.findall(fold(text))]
+
+
+def _status_value(status):
+    return status.value if isinstance(status, JobStatus) else status
+
+
+def job_terms(job):
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        counts = Counter(tokenize(getattr(job, field)))
+        for term, tf in counts.items():
+            weights[term] += weight * min(tf, MAX_TERM_FREQUENCY)
+
+    location_terms = set(tokenize(job.location))
+    return [{
+        'term': term,
+        'job_id': job.id,
+        'weight': weight,
+        'in_location': term in location_terms,
+        'posted_date': job.posted_date,
+    } for term, weight in weights.items()]
+
+
+def remove_job(connection, job_id):
+    connection.execute(JobSearchTerm.__table__.delete().where(JobSearchTerm.job_id == job_id))
+
+
+def index_job(connection, job):
+    # Chỉ job đang active mới nằm trong chỉ mục
+    remove_job(connection, job.id)
+    if _status_value(job.status) != JobStatus.active.value:
+        return
+    rows = job_terms(job)
+    if rows:
+        connection.execute(JobSearchTerm.__table__.insert(), rows)
+
+
+def index_jobs(connection, jobs):
+    # Cập nhật chỉ mục cho nhiều job cùng lúc (dùng khi ghi bằng câu lệnh Core, không qua flush)
+    job_ids = [job.id for job in jobs]
+    if not job_ids:
+        return
+    connection.execute(JobSearchTerm.__table__.delete().where(JobSearchTerm.job_id.in_(job_ids)))
+    rows = [row for job in jobs if _status_value(job.status) == JobStatus.active.value
+            for row in job_terms(job)]
+    if rows:
+        connection.execute(JobSearchTerm.__table__.insert(), rows)
+
+
+def rebuild_index(batch_size=1000):
+    connection = db.session.connection()
+    connection.execute(JobSearchTerm.__table__.delete())
+
+    # Đọc theo lô khóa chính để không giữ toàn bộ bảng jobs trong bộ nhớ
+    last_id = 0
+    while True:
+        batch = Job.query.filter(Job.status == JobStatus.active, Job.id > last_id) \
+            .order_by(Job.id).limit(batch_size).all()
+        if not batch:
+            break
+        rows = [row for job in batch for row in job_terms(job)]
+        if rows:
+            connection.execute(JobSearchTerm.__table__.insert(), rows)
+        last_id = batch[-1].id
+        db.session.expunge_all()
+    db.session.commit()
+
+
+def _document_frequency(term):
+    now = time.monotonic()
+    cached = _df_cache.get(term)
+    if cached is None or now - cached[1] > DF_CACHE_TTL:
+        if len(_df_cache) >= DF_CACHE_SIZE:
+            _df_cache.clear()
+        cached = _df_cache[term] = (
+            db.session.query(func.count()).filter(JobSearchTerm.term == term).scalar(), now)
+    return cached[0]
+
+
+def query_terms(text):
+    # (các từ khớp nguyên từ, từ cuối khớp theo tiền tố hoặc None). Gõ xong từ cuối bằng khoảng trắng
+    # ("dev ") thì từ đó chỉ khớp nguyên từ
+    tokens = tokenize(text)
+    prefix = None
+    if tokens and len(tokens[-1]) >= MIN_PREFIX_LENGTH and not text[-1:].isspace():
+        prefix = tokens.pop()
+    exact = sorted(set(tokens) - {prefix})[:MAX_QUERY_TERMS - (prefix is not None)]
+    return exact, prefix
+
+
+def query_key(keyword, location):
+    # Khóa cache của một lượt tìm: hai chuỗi cho cùng tập từ (kể cả từ khớp tiền tố) thì cùng kết quả.
+    # Rỗng nếu không có từ nào
+    parts = []
+    for text in (keyword, location):
+        exact, prefix = query_terms(text or '')
+        parts.append(' '.join(exact) + ('|%s*' % prefix if prefix else ''))
+    return '' if not any(parts) else '|'.join(parts)
+
+
+def _prefix_subquery(prefix, location_only=False):
+    # Khoảng [prefix, tiền tố kế tiếp) đọc thẳng trên khóa chính (term, job_id). Một job có thể chứa
+    # nhiều từ cùng tiền tố (developer, devops): gộp lại, lấy trọng số lớn nhất
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    query = db.session.query(JobSearchTerm.job_id.label('job_id'),
+                             func.max(JobSearchTerm.weight).label('score'),
+                             func.max(JobSearchTerm.posted_date).label('posted_date')) \
+        .filter(JobSearchTerm.term >= prefix, JobSearchTerm.term < upper)
+    if location_only:
+        query = query.filter(JobSearchTerm.in_location.is_(True))
+    return query.group_by(JobSearchTerm.job_id).subquery()
+
+
+def _match_subquery(tokens, location_only=False, prefix=None):
+    # Job phải chứa tất cả các từ khóa; điểm = tổng trọng số các từ khớp.
+    # Bắt đầu từ từ hiếm nhất rồi tra khóa chính (term, job_id) cho các từ còn lại,
+    # thay vì GROUP BY trên toàn bộ danh sách job của mọi từ
+    matched_prefix = _prefix_subquery(prefix, location_only) if prefix else None
+    if not tokens:
+        return matched_prefix
+
+    tokens = sorted(tokens, key=_document_frequency)
+    terms = [aliased(JobSearchTerm) for _ in tokens]
+    first = terms[0]
+    score = sum((t.weight for t in terms[1:]), first.weight)
+    if matched_prefix is not None:
+        score = score + matched_prefix.c.score
+
+    query = db.session.query(first.job_id.label('job_id'), score.label('score'),
+                             first.posted_date.label('posted_date')) \
+        .filter(first.term == tokens[0])
+    for term, token in zip(terms[1:], tokens[1:]):
+        query = query.join(term, (term.job_id == first.job_id) & (term.term == token))
+    if matched_prefix is not None:
+        query = query.join(matched_prefix, matched_prefix.c.job_id == first.job_id)
+    if location_only:
+        query = query.filter(*[t.in_location.is_(True) for t in terms])
+    return query.subquery()
+
+
+def _ranked_subquery(keyword, location):
+    keyword_tokens, keyword_prefix = query_terms(keyword)
+    location_tokens, location_prefix = query_terms(location)
+    has_keyword = bool(keyword_tokens or keyword_prefix)
+    has_location = bool(location_tokens or location_prefix)
+    if not has_keyword and not has_location:
+        return None
+    if not has_keyword:
+        return _match_subquery(location_tokens, location_only=True, prefix=location_prefix)
+
+    ranked = _match_subquery(keyword_tokens, prefix=keyword_prefix)
+    if has_location:
+        matched_location = _match_subquery(location_tokens, location_only=True, prefix=location_prefix)
+        ranked = db.session.query(ranked.c.job_id, ranked.c.score, ranked.c.posted_date) \
+            .join(matched_location, matched_location.c.job_id == ranked.c.job_id) \
+            .subquery()
+    return ranked
+
+
+def _filtered(ranked, conditions):
+    # Lọc thêm theo cột của bảng jobs (nhóm lọc ở trang /job)
+    if ranked is None or not conditions:
+        return ranked
+    return db.session.query(ranked.c.job_id, ranked.c.score, ranked.c.posted_date) \
+        .join(Job, Job.id == ranked.c.job_id) \
+        .filter(*conditions) \
+        .subquery()
+
+
+def matching_job_ids(keyword='', location=''):
+    # Id mọi job khớp từ khóa (chỉ đọc bảng chỉ mục), dùng để đếm theo nhóm lọc
+    ranked = _ranked_subquery(keyword, location)
+    if ranked is None:
+        return []
+    return [row.job_id for row in db.session.query(ranked.c.job_id)]
+
+
+def _ranked_order(ranked):
+    # Xếp theo độ liên quan, sau đó theo tin mới nhất
+    return ranked.c.score.desc(), ranked.c.posted_date.desc(), ranked.c.job_id.desc()
+
+
+def search_jobs(keyword='', location='', conditions=()):
+    query = Job.query.options(*JOB_LISTING).filter(Job.status == JobStatus.active, *conditions)
+    ranked = _ranked_subquery(keyword, location)
+    if ranked is None:
+        return query.order_by(Job.posted_date.desc(), Job.id.desc())
+    return query.join(ranked, ranked.c.job_id == Job.id).order_by(*_ranked_order(ranked))
+
+
+def _load_jobs(ids):
+    if not ids:
+        return []
+    jobs = {job.id: job for job in Job.query.options(*JOB_LISTING)
+            .filter(Job.id.in_(ids), Job.status == JobStatus.active)}
+    return [jobs[job_id] for job_id in ids if job_id in jobs]
+
+
+class SearchPagination(Pagination):
+    # Xếp hạng và đếm hoàn toàn trên bảng chỉ mục, chỉ nạp các job của trang hiện tại
+
+    def _query_items(self):
+        ranked = self._query_args['ranked']
+        ids = [row.job_id for row in db.session.query(ranked.c.job_id)
+               .order_by(*_ranked_order(ranked))
+               .limit(self.per_page).offset(self._query_offset)]
+        return _load_jobs(ids)
+
+    def _query_count(self):
+        ranked = self._query_args['ranked']
+        return db.session.query(func.count()).select_from(ranked).scalar()
+
+
+def paginate_jobs(keyword='', location='', page=1, per_page=10, conditions=()):
+    ranked = _filtered(_ranked_subquery(keyword, location), conditions)
+    if ranked is None:
+        return search_jobs(conditions=conditions).paginate(page=page, per_page=per_page)
+    return SearchPagination(page=page, per_page=per_page, ranked=ranked)
+
+
+def cursor_jobs(keyword='', location='', cursor=None, per_page=10, conditions=()):
+    ranked = _filtered(_ranked_subquery(keyword, location), conditions)
+    if ranked is None:
+        # Không có từ khóa: duyệt theo (posted_date, id)
+        query = Job.query.options(*JOB_LISTING).filter(Job.status == JobStatus.active, *conditions)
+        return keyset_paginate(query, [Job.posted_date, Job.id],
+                               lambda job: (job.posted_date, job.id),
+                               cursor=cursor, per_page=per_page)
+
+    columns = [ranked.c.score, ranked.c.posted_date, ranked.c.job_id]
+    return keyset_paginate(db.session.query(*columns), columns, tuple,
+                           cursor=cursor, per_page=per_page,
+                           load=lambda rows: _load_jobs([row.job_id for row in rows]))
+
+
+def cursor_job_rows(query, keyword='', location='', cursor=None, per_page=10, conditions=()):
+    # Như cursor_jobs nhưng trả về các dòng chỉ gồm cột của query (phải có Job.id, Job.posted_date),
+    # không dựng đối tượng Job
+    query = query.filter(Job.status == JobStatus.active)
+    ranked = _filtered(_ranked_subquery(keyword, location), conditions)
+    if ranked is None:
+        return keyset_paginate(query.filter(*conditions), [Job.posted_date, Job.id],
+                               lambda row: (row.posted_date, row.id),
+                               cursor=cursor, per_page=per_page)
+
+    def load(rows):
+        ids = [row.job_id for row in rows]
+        found = {row.id: row for row in query.filter(Job.id.in_(ids))} if ids else {}
+        return [found[job_id] for job_id in ids if job_id in found]
+
+    columns = [ranked.c.score, ranked.c.posted_date, ranked.c.job_id]
+    return keyset_paginate(db.session.query(*columns), columns, tuple,
+                           cursor=cursor, per_page=per_page, load=load)
+
+
+def _count_jobs(keyword, location):
+    ranked = _ranked_subquery(keyword, location)
+    if ranked is None:
+        rows = db.session.query(Job.id).filter(Job.status == JobStatus.active)
+    else:
+        rows = db.session.query(ranked.c.job_id)
+    limited = rows.limit(COUNT_CAP + 1).subquery()
+    total = db.session.query(func.count()).select_from(limited).scalar()
+    return min(total, COUNT_CAP), total > COUNT_CAP
+
+
+def approximate_total(keyword='', location=''):
+    # Tổng số kết quả chỉ để hiển thị: đếm tối đa COUNT_CAP dòng và cache COUNT_TTL giây
+    # (không gắn tag jobs nên không bị xóa mỗi khi có job thay đổi)
+    return tuple(cache.get_or_set('job_count:%s' % query_key(keyword, location),
+                                  lambda: _count_jobs(keyword, location), ttl=COUNT_TTL))
+
+
+_INDEXED_ATTRS = ('status', 'posted_date') + tuple(FIELD_WEIGHTS)
+
+
+def _needs_reindex(job):
+    state = inspect(job)
+    return any(state.attrs[attr].history.has_changes() for attr in _INDEXED_ATTRS)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _remove_deleted_jobs(session, flush_context, instances):
+    # Xóa các từ của job trước khi xóa job để không vi phạm khóa ngoại
+    for obj in session.deleted:
+        if isinstance(obj, Job) and obj.id is not None:
+            remove_job(session.connection(), obj.id)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    # Cập nhật chỉ mục trong cùng transaction với thay đổi của job
+    # (create_job, edit_job, toggle_job_status, delete_job, /api/jobs, admin)
+    for obj in session.new:
+        if isinstance(obj, Job):
+            index_job(session.connection(), obj)
+    for obj in session.dirty:
+        if isinstance(obj, Job) and _needs_reindex(obj):
+            index_job(session.connection(), obj)
+
+
+@click.command('search-reindex')
+@click.option('--batch-size', default=1000, show_default=True)
+@with_appcontext
+def search_reindex_command(batch_size):
+    rebuild_index(batch_size=batch_size)
+    click.echo('Đã xây dựng lại chỉ mục tìm kiếm: %d từ' % JobSearchTerm.query.count())
+
+
+def init_app(app):
+    app.cli.add_command(search_reindex_command)
@@ -0,0 +1,69 @@
+import datetime
+import enum
+import json
+from decimal import Decimal
+
+from flask import current_app
+
+from app.models import Job, Employer
+
+# Trường của API đọc job -> cột tương ứng; ?fields=id,title,salary chỉ SELECT đúng các cột đó
+JOB_FIELDS = {
+    'id': Job.id,
+    'title': Job.title,
+    'company': Employer.company_name.label('company'),
+    'employer_id': Job.employer_id,
+    'location': Job.location,
+    'salary': Job.salary,
+    'work_type': Job.work_type,
+    'experience_level': Job.experience_level,
+    'status': Job.status,
+    'posted_date': Job.posted_date,
+    'updated_at': Job.updated_at,
+    'summary': Job.summary,
+    'description': Job.description,
+    'requirements': Job.requirements,
+    'benefits': Job.benefits,
+}
+# Mặc định của danh sách giữ nguyên các trường /api/jobs trả về trước đây (không kèm nội dung dài)
+LIST_FIELDS = ('id', 'title', 'location', 'salary', 'work_type', 'experience_level', 'posted_date')
+DETAIL_FIELDS = tuple(JOB_FIELDS)
+# Cột phân trang theo cursor luôn được SELECT, chỉ trả về nếu được yêu cầu
+KEY_FIELDS = ('id', 'posted_date')
+
+
+def parse_fields(value, default):
+    # Trả về (danh sách trường, các trường không hợp lệ)
+    if not value:
+        return list(default), []
+    fields = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    return fields, [name for name in fields if name not in JOB_FIELDS]
+
+
+def job_columns(fields):
+    # Các cột cần SELECT và có cần join employers hay không
+    names = list(dict.fromkeys(tuple(fields) + KEY_FIELDS))
+    return [JOB_FIELDS[name] for name in names], 'company' in fields
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        # Lương lưu Numeric(10, 2): số nguyên thì trả int cho gọn
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError('%r không chuyển được sang JSON' % type(value))
+
+
+def row_dict(row, fields):
+    mapping = row._mapping
+    return {name: mapping[name] for name in fields}
+
+
+def json_response(payload, status=200):
+    # Không thụt lề, không khoảng trắng thừa, giữ nguyên tiếng Việt thay vì \uXXXX; Decimal/datetime
+    # chỉ được chuyển khi json gặp tới, không dựng đối tượng ORM hay dict trung gian cho từng dòng
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False, default=_default)
+    return current_app.response_class(body, status=status, mimetype='application/json')
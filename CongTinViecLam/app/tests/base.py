@@ -0,0 +1,54 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app, db, matching
+from app.cache import cache
+from app.fragments import fragment_cache
+
+
+class AppTestCase(unittest.TestCase):
+    # App trên SQLite trong bộ nhớ với CSDL trống. Lớp con thêm cấu hình qua CONFIG; PUSH_CONTEXT = False
+    # khi test chỉ đi qua test client (mỗi request một app context và một session riêng như khi chạy thật)
+    CONFIG = {}
+    PUSH_CONTEXT = True
+
+    def setUp(self):
+        self.app = create_app(dict({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'}, **self.CONFIG))
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.drop_all()
+        db.create_all()
+        # Cache trong tiến trình sống qua các app: dữ liệu và thống kê của test trước không được lẫn vào
+        cache.clear()
+        fragment_cache.clear()
+        if not self.PUSH_CONTEXT:
+            self.app_context.pop()
+
+    def tearDown(self):
+        if not self.PUSH_CONTEXT:
+            self.app_context.push()
+        db.session.remove()
+        db.drop_all()
+        matching.matcher.reset()
+        self.app_context.pop()
+
+    def login(self, client, user_id, user_type):
+        # Giả lập đăng nhập
+        with client.session_transaction() as sess:
+            sess['user_type'] = user_type
+            sess['_user_id'] = str(user_id)
+
+    def count_queries(self, fn, statements=None):
+        # Số câu SQL fn() gửi xuống CSDL; truyền statements để lấy cả nội dung các câu
+        statements = [] if statements is None else statements
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        return len(statements)
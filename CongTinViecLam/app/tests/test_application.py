@@ -1,19 +1,18 @@
 import unittest
-from app import app, db
+from sqlalchemy import event
+from app import create_app, db
 from app.models import User, Candidate, Employer, Job, CV, Application, UserRole
 
 
 class TestApplicationAPI(unittest.TestCase):
     def setUp(self):
         # Khởi tạo app context
-        self.app_context = app.app_context()
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': "sqlite:///:memory:"})
+        self.app_context = self.app.app_context()
         self.app_context.push()
 
-        app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:///:memory:"
-        app.config['TESTING'] = True
-
         # Tạo client Flask
-        self.client = app.test_client()
+        self.client = self.app.test_client()
 
         # Reset DB
         db.drop_all()
@@ -63,21 +62,29 @@ class TestApplicationAPI(unittest.TestCase):
         db.session.add(self.job)
 
         db.session.commit()
+        self.candidate_user_id = self.candidate.user_id
+        self.employer_user_id = self.employer.user_id
+        self.job_id = self.job.id
+        self.cv_id = self.cv.id
 
-    def tearDown(self):
+        # Mỗi request tự mở app context riêng (g, current_user không bị dùng lại giữa các request)
         db.session.remove()
-        db.drop_all()
         self.app_context.pop()
 
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
     def test_apply_and_review(self):
         # 🔹 Ứng viên apply job
         with self.client.session_transaction() as sess:
             sess['user_type'] = 'candidate'
-            sess['_user_id'] = str(self.candidate.user_id)  # giả lập login
+            sess['_user_id'] = str(self.candidate_user_id)  # giả lập login
 
         res = self.client.post(
             "/api/apply",
-            json={"job_id": self.job.id, "cv_id": self.cv.id}
+            json={"job_id": self.job_id, "cv_id": self.cv_id}
         )
         self.assertEqual(res.status_code, 201)
         data = res.get_json()
@@ -88,7 +95,7 @@ class TestApplicationAPI(unittest.TestCase):
         # 🔹 Employer review application
         with self.client.session_transaction() as sess:
             sess['user_type'] = 'employer'
-            sess['_user_id'] = str(self.employer.user_id)  # giả lập login
+            sess['_user_id'] = str(self.employer_user_id)  # giả lập login
 
         res2 = self.client.put(
             f"/api/application/{app_id}/review",
@@ -98,6 +105,80 @@ class TestApplicationAPI(unittest.TestCase):
         data2 = res2.get_json()
         self.assertIn("Hồ sơ đã cập nhật sang trạng thái accepted", data2["message"])
 
+    def _login_candidate(self):
+        with self.client.session_transaction() as sess:
+            sess['user_type'] = 'candidate'
+            sess['_user_id'] = str(self.candidate_user_id)
+
+    def _add_other_cv(self):
+        with self.app.app_context():
+            other_user = User(username="cand2", role=UserRole.CANDIDATE)
+            other_user.set_password("123")
+            other = Candidate(user=other_user, full_name="Tran Thi B", email="b@example.com", phone="0987654321")
+            other_cv = CV(title="CV khac", candidate=other)
+            db.session.add_all([other_user, other, other_cv])
+            db.session.commit()
+            return other_cv.id
+
+    def test_apply_rejects_cv_of_other_candidate(self):
+        other_cv_id = self._add_other_cv()
+        self._login_candidate()
+
+        res = self.client.post("/api/apply", json={"job_id": self.job_id, "cv_id": other_cv_id})
+        self.assertEqual(res.status_code, 404)
+        with self.app.app_context():
+            self.assertEqual(Application.query.count(), 0)
+
+    def test_apply_validates_in_one_query(self):
+        self._login_candidate()
+        self.client.get("/api/candidate/cvs")  # nạp sẵn user vào cache của identity
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            res = self.client.post("/api/apply", json={"job_id": self.job_id, "cv_id": self.cv_id})
+            self.assertEqual(res.status_code, 201)
+            selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+            self.assertEqual(len(selects), 1)
+
+            statements.clear()
+            res = self.client.post("/api/apply", json={"job_id": self.job_id, "cv_id": self.cv_id})
+            self.assertEqual(res.status_code, 400)
+            # Trùng được phát hiện bằng chính câu kiểm tra, không cần INSERT rồi rollback
+            self.assertEqual(len(statements), 1)
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    def test_apply_idempotency_key(self):
+        self._login_candidate()
+        headers = {"Idempotency-Key": "5b0c1a7e-apply-1"}
+        payload = {"job_id": self.job_id, "cv_id": self.cv_id}
+
+        first = self.client.post("/api/apply", json=payload, headers=headers)
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", first.headers)
+
+        retry = self.client.post("/api/apply", json=payload, headers=headers)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.get_json()["application_id"], first.get_json()["application_id"])
+
+        # Không có key thì vẫn là nộp trùng
+        self.assertEqual(self.client.post("/api/apply", json=payload).status_code, 400)
+
+        other_cv_id = self._add_other_cv()
+        conflict = self.client.post("/api/apply", json={"job_id": self.job_id, "cv_id": other_cv_id},
+                                    headers=headers)
+        self.assertEqual(conflict.status_code, 422)
+        with self.app.app_context():
+            self.assertEqual(Application.query.count(), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,81 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+import brotli
+from flask import url_for
+
+from app import create_app, assets
+
+
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        static = os.path.join(self.tmp, 'static')
+        os.makedirs(os.path.join(static, 'css'))
+        self.css = ('.card { margin: 0 auto; padding: 1rem; }\n' * 50).encode('utf-8')
+        with open(os.path.join(static, 'css', 'site.css'), 'wb') as f:
+            f.write(self.css)
+
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'STATIC_FINGERPRINT': False})
+        self.app.static_folder = static
+        self.app.config.update(STATIC_FINGERPRINT=True, STATIC_BUILD_DIR=os.path.join(self.tmp, 'build'))
+        assets.build(self.app.static_folder, self.app.config["STATIC_BUILD_DIR"])
+        assets.init_app(self.app)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _url(self, filename):
+        with self.app.test_request_context():
+            return url_for('static', filename=filename)
+
+    def test_url_for_uses_content_hash(self):
+        url = self._url('css/site.css')
+        self.assertRegex(url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        self.assertEqual(self._url('missing.js'), '/static/missing.js')
+
+        # Nội dung đổi thì tên đổi
+        with open(os.path.join(self.app.static_folder, 'css', 'site.css'), 'ab') as f:
+            f.write(b'body { color: red; }\n')
+        self.app.test_cli_runner().invoke(args=['assets-build'])
+        assets.init_app(self.app)
+        self.assertNotEqual(self._url('css/site.css'), url)
+
+    def test_serves_precompressed_variant_with_immutable_caching(self):
+        url = self._url('css/site.css')
+        res = self.client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(res.mimetype, 'text/css')
+        self.assertIn('Accept-Encoding', res.headers['Vary'])
+        self.assertIn('immutable', res.headers['Cache-Control'])
+        self.assertIn('max-age=31536000', res.headers['Cache-Control'])
+        self.assertEqual(gzip.decompress(res.data), self.css)
+
+        br = self.client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(br.headers['Content-Encoding'], 'br')
+        self.assertIn('immutable', br.headers['Cache-Control'])
+        self.assertEqual(brotli.decompress(br.data), self.css)
+
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(plain.data, self.css)
+
+        # Tên gốc vẫn phục vụ được nhưng không được cache lâu dài
+        legacy = self.client.get('/static/css/site.css')
+        self.assertEqual(legacy.status_code, 200)
+        self.assertNotIn('immutable', legacy.headers['Cache-Control'])
+
+    def test_create_app_does_not_build(self):
+        build_dir = os.path.join(self.tmp, 'startup')
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'STATIC_BUILD_DIR': build_dir})
+        self.assertFalse(os.path.exists(build_dir))
+        self.assertEqual(app.extensions['static_assets']['manifest'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
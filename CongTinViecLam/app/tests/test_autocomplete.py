@@ -0,0 +1,99 @@
+import unittest
+
+from sqlalchemy import delete, update
+
+from app import db, autocomplete
+from app.models import User, Employer, Job, JobStatus, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestAutocomplete(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username="emp%d" % i, role=UserRole.EMPLOYER, password="x") for i in range(2)]
+        self.fpt = Employer(user=users[0], company_name="FPT Software")
+        self.kms = Employer(user=users[1], company_name="KMS Technology")
+        rows = [
+            (self.fpt, "Kế toán tổng hợp", "Hà Nội"),
+            (self.fpt, "Kế toán tổng hợp", "Hà Nội"),
+            (self.fpt, "Kế toán thuế", "Hải Phòng"),
+            (self.kms, "Kỹ sư phần mềm", "Hà Nội"),
+        ]
+        self.jobs = [Job(employer=employer, title=title, description="Mô tả", location=location, status="active")
+                     for employer, title, location in rows]
+        db.session.add_all(users + [self.fpt, self.kms] + self.jobs)
+        db.session.commit()
+
+    def _texts(self, query, kinds=autocomplete.KINDS):
+        return [(item['text'], item['count']) for item in autocomplete.index.suggest(query, kinds)]
+
+    def test_prefix_without_diacritics_ranked_by_popularity(self):
+        self.assertEqual(self._texts("ke", ('title',)), [("Kế toán tổng hợp", 2), ("Kế toán thuế", 1)])
+        self.assertEqual(self._texts("ha", ('location',)), [("Hà Nội", 3), ("Hải Phòng", 1)])
+        # Khớp cả từ giữa cụm
+        self.assertEqual(self._texts("tong", ('title',)), [("Kế toán tổng hợp", 2)])
+        self.assertEqual(self._texts("ke toan t", ('title',)), [("Kế toán tổng hợp", 2), ("Kế toán thuế", 1)])
+        self.assertEqual(self._texts("fpt"), [("FPT Software", 3)])
+        self.assertEqual(self._texts("   "), [])
+
+    def test_incremental_updates(self):
+        self._texts("ke")
+
+        self.jobs[2].status = JobStatus.inactive
+        self.kms.company_name = "KMS Solutions"
+        db.session.add(Job(employer=self.kms, title="Kế hoạch sản xuất", description="Mô tả",
+                           location="Đà Nẵng", status="active"))
+        db.session.commit()
+
+        def lookups():
+            self.assertEqual(self._texts("ke", ('title',)), [("Kế toán tổng hợp", 2), ("Kế hoạch sản xuất", 1)])
+            self.assertEqual(self._texts("kms"), [("KMS Solutions", 2)])
+            self.assertEqual(self._texts("hai"), [])
+        self.assertEqual(self.count_queries(lookups), 0)
+
+        db.session.delete(self.jobs[3])
+        db.session.commit()
+        self.assertEqual(self._texts("ky"), [])
+
+    def test_sync_from_other_workers(self):
+        self.app.config.update(AUTOCOMPLETE_SYNC_SECONDS=0, AUTOCOMPLETE_RECONCILE_SECONDS=0)
+        self._texts("ke")
+
+        # Worker khác đổi tên công ty và xóa hẳn job bằng câu lệnh SQL (không qua sự kiện ORM)
+        db.session.execute(update(Employer).where(Employer.id == self.kms.id)
+                           .values(company_name="KMS Solutions"))
+        db.session.execute(delete(Job).where(Job.id == self.jobs[2].id))
+        db.session.commit()
+
+        statements = []
+        self.count_queries(lambda: self.assertEqual(self._texts("kms"), [("KMS Solutions", 1)]), statements)
+        self.assertEqual(self._texts("hai"), [])
+        # Chỉ đọc lại công ty vừa đổi, không đọc cả bảng employers
+        employers = [s for s in statements if 'FROM employers' in s]
+        self.assertEqual(len(employers), 1)
+        self.assertIn('updated_at', employers[0])
+
+    def test_short_prefix_not_truncated(self):
+        db.session.add_all([Job(employer=self.kms, title="Kế %s" % word, description="Mô tả", location="Huế",
+                                status="active") for word in ("an", "ba", "ca")])
+        db.session.commit()
+        old, autocomplete.MAX_SCAN = autocomplete.MAX_SCAN, 1
+        try:
+            self.assertEqual(self._texts("k", ('title',))[:2], [("Kế toán tổng hợp", 2), ("Kế an", 1)])
+            self.assertEqual(self._texts("ke", ('title',))[0], ("Kế toán tổng hợp", 2))
+        finally:
+            autocomplete.MAX_SCAN = old
+
+    def test_endpoint_sets_cache_headers(self):
+        client = self.app.test_client()
+        res = client.get('/api/autocomplete?q=Ha&type=location&limit=1')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()['suggestions'], [{'text': 'Hà Nội', 'type': 'location', 'count': 3}])
+        self.assertIn('public', res.headers['Cache-Control'])
+        self.assertIn('max-age=300', res.headers['Cache-Control'])
+        self.assertNotIn('Set-Cookie', res.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
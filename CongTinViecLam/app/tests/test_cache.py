@@ -0,0 +1,74 @@
+import time
+import unittest
+
+from app import db, dao
+from app.cache import Cache, MemoryBackend, cache, JOBS_TAG
+from app.models import User, Employer, Job, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestMemoryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = Cache(MemoryBackend(max_entries=2), default_ttl=60)
+        self.loads = 0
+
+    def _loader(self, value):
+        def load():
+            self.loads += 1
+            return value
+        return load
+
+    def test_hit_miss_and_invalidate(self):
+        self.assertEqual(self.cache.get_or_set('a', self._loader(1), tags=('t',)), 1)
+        self.assertEqual(self.cache.get_or_set('a', self._loader(2), tags=('t',)), 1)
+        self.cache.invalidate('t')
+        self.assertEqual(self.cache.get_or_set('a', self._loader(3), tags=('t',)), 3)
+
+        self.assertEqual(self.loads, 2)
+        self.assertEqual(self.cache.stats()['a']['hits'], 1)
+        self.assertEqual(self.cache.stats()['a']['misses'], 2)
+
+    def test_ttl_and_lru(self):
+        self.cache.get_or_set('a', self._loader(1), ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(self.cache.get_or_set('a', self._loader(2)), 2)
+
+        self.cache.get_or_set('b', self._loader(1))
+        self.cache.get_or_set('c', self._loader(1))
+        self.cache.get_or_set('a', self._loader(4))
+        self.assertEqual(self.loads, 5)
+
+
+class TestRecentJobsCache(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER)
+        employer_user.set_password("123")
+        db.session.add(employer_user)
+        db.session.commit()
+
+        self.employer = Employer(user_id=employer_user.id, company_name="ABC Corp")
+        db.session.add(self.employer)
+        db.session.add(Job(employer=self.employer, title="Job 1", description="Mo ta", status="active"))
+        db.session.commit()
+
+    def test_recent_jobs_cached_until_job_commit(self):
+        invalidations = cache.stats()['tag:' + JOBS_TAG]['invalidations']
+        self.assertEqual([job['company'] for job in dao.recent_jobs()], ["ABC Corp"])
+        self.assertEqual(self.count_queries(dao.recent_jobs), 0)
+
+        # Rollback không xóa cache
+        db.session.add(Job(employer=self.employer, title="Job 2", description="Mo ta", status="active"))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(self.count_queries(dao.recent_jobs), 0)
+
+        db.session.add(Job(employer=self.employer, title="Job 3", description="Mo ta", status="active"))
+        db.session.commit()
+        self.assertEqual([job['title'] for job in dao.recent_jobs()], ["Job 3", "Job 1"])
+        self.assertEqual(cache.stats()['tag:' + JOBS_TAG]['invalidations'], invalidations + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from datetime import datetime, timedelta
+
+from flask import template_rendered
+from sqlalchemy import event
+
+from app import db
+from app.models import User, Candidate, Employer, Job, CV, Application, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestConditionalGet(AppTestCase):
+    PUSH_CONTEXT = False
+
+    def setUp(self):
+        super().setUp()
+        with self.app.app_context():
+            candidate_user = User(username="cand1", role=UserRole.CANDIDATE, password="x")
+            employer_user = User(username="emp1", role=UserRole.EMPLOYER, password="x")
+            candidate = Candidate(user=candidate_user, full_name="Nguyen Van A", email="a@example.com")
+            employer = Employer(user=employer_user, company_name="ABC Corp")
+            job = Job(employer=employer, title="Flask Developer", description="API", status="active")
+            cv = CV(title="Backend CV", candidate=candidate)
+            db.session.add_all([candidate_user, employer_user, candidate, employer, job, cv])
+            db.session.commit()
+            self.ids = {'candidate_user': candidate_user.id, 'employer_user': employer_user.id,
+                        'candidate': candidate.id, 'job': job.id, 'cv': cv.id}
+            db.session.remove()
+        self.client = self.app.test_client()
+
+    def _login(self, role):
+        self.login(self.client, self.ids['%s_user' % role], role)
+
+    def _revalidate(self, url, response):
+        return self.client.get(url, headers={'If-None-Match': response.headers['ETag'],
+                                             'If-Modified-Since': response.headers.get('Last-Modified', '')})
+
+    def _touch(self, model, obj_id, **values):
+        with self.app.app_context():
+            obj = db.session.get(model, obj_id)
+            for key, value in values.items():
+                setattr(obj, key, value)
+            db.session.commit()
+
+    def test_job_detail_not_modified_without_rendering(self):
+        url = '/job/%d' % self.ids['job']
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Cookie', first.headers['Vary'])
+        self.assertIn('no-cache', first.headers['Cache-Control'])
+        self.assertIsNotNone(first.headers.get('Last-Modified'))
+
+        rendered, statements = [], []
+        with self.app.app_context():
+            engine = db.engine
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            with template_rendered.connected_to(lambda sender, template, context, **extra: rendered.append(template),
+                                                self.app):
+                second = self._revalidate(url, first)
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(rendered, [])
+        self.assertEqual(len(statements), 1)
+
+        self._touch(Job, self.ids['job'], title="Senior Flask Developer",
+                    updated_at=datetime.utcnow() + timedelta(seconds=5))
+        third = self._revalidate(url, first)
+        self.assertEqual(third.status_code, 200)
+        self.assertIn('Senior Flask Developer', third.get_data(as_text=True))
+
+    def test_job_detail_etag_depends_on_user_and_application(self):
+        url = '/job/%d' % self.ids['job']
+        anonymous = self.client.get(url)
+        self._login('candidate')
+        candidate = self.client.get(url)
+        self.assertNotEqual(candidate.headers['ETag'], anonymous.headers['ETag'])
+        self.assertEqual(self._revalidate(url, candidate).status_code, 304)
+
+        with self.app.app_context():
+            db.session.add(Application(job_id=self.ids['job'], candidate_id=self.ids['candidate'],
+                                       cv_id=self.ids['cv'], applied_date=datetime.utcnow() + timedelta(seconds=5)))
+            db.session.commit()
+        after_apply = self._revalidate(url, candidate)
+        self.assertEqual(after_apply.status_code, 200)
+        self.assertIn('Đã ứng tuyển', after_apply.get_data(as_text=True))
+
+    def test_cv_endpoints(self):
+        self._login('employer')
+        url = '/api/cv/%d' % self.ids['cv']
+        first = self.client.get(url)
+        self.assertEqual(self._revalidate(url, first).status_code, 304)
+        self._touch(CV, self.ids['cv'], skills="Python", updated_at=datetime.utcnow() + timedelta(seconds=5))
+        self.assertEqual(self._revalidate(url, first).get_json()['skills'], "Python")
+        self.assertEqual(self.client.get('/api/cv/9999').status_code, 404)
+
+        self._login('candidate')
+        first = self.client.get('/api/candidate/cvs')
+        self.assertNotIn('Last-Modified', first.headers)
+        self.assertEqual(self._revalidate('/api/candidate/cvs', first).status_code, 304)
+        with self.app.app_context():
+            db.session.add(CV(title="CV thứ hai", candidate_id=self.ids['candidate'],
+                              updated_at=datetime.utcnow() - timedelta(days=1)))
+            db.session.commit()
+        self.assertEqual(len(self._revalidate('/api/candidate/cvs', first).get_json()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+from werkzeug.datastructures import MultiDict
+
+from app import db, dao, cv_store
+from app.models import User, Candidate, CV, CVExperience, CVEducation, UserRole, parse_period
+from app.tests.base import AppTestCase
+
+
+class TestCVStore(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        user = User(username="cand1", role=UserRole.CANDIDATE)
+        user.set_password("123")
+        db.session.add(user)
+        db.session.commit()
+
+        self.candidate = Candidate(user_id=user.id, full_name="Nguyen Van A")
+        db.session.add(self.candidate)
+        db.session.commit()
+
+    def _add_legacy_cv(self, title, experience, education):
+        cv = CV(candidate_id=self.candidate.id, title=title, experience=experience, education=education)
+        db.session.add(cv)
+        db.session.commit()
+        return cv.id
+
+    def test_parse_period(self):
+        self.assertEqual(parse_period("2020-2022"), (2020, 2022))
+        self.assertEqual(parse_period("03/2021 - nay"), (2021, None))
+        self.assertEqual(parse_period("2019"), (2019, 2019))
+        self.assertEqual(parse_period("3 năm"), (None, None))
+
+    def test_migrate_legacy_in_batches(self):
+        first = self._add_legacy_cv("CV 1", "FPT Software|Backend|2019-2021|API | microservices|||Viettel|Dev|2021 - nay|",
+                                    "ĐH Bách Khoa|Kỹ sư|2014-2019|")
+        second = self._add_legacy_cv("CV 2", "", "ĐH Kinh tế|Cử nhân|2015-2019|Kế toán")
+        self._add_legacy_cv("CV 3", None, None)
+
+        self.assertEqual(cv_store.migrate_legacy(batch_size=1), 2)
+        self.assertEqual(cv_store.migrate_legacy(batch_size=1), 0)
+
+        cv = db.session.get(CV, first)
+        self.assertIsNone(cv.experience)
+        self.assertEqual([(e.company, e.period_start, e.period_end) for e in cv.experiences],
+                         [("FPT Software", 2019, 2021), ("Viettel", 2021, None)])
+        self.assertEqual(cv.experiences[0].description, "API | microservices")
+        self.assertEqual([e.degree for e in db.session.get(CV, second).educations], ["Cử nhân"])
+
+    def test_filter_cvs_in_sql(self):
+        form = MultiDict([("company[]", "FPT Software"), ("position[]", "Backend"), ("period[]", "2019-2021"),
+                          ("description[]", "a|b"), ("company[]", " "), ("position[]", ""), ("period[]", ""),
+                          ("description[]", ""), ("school[]", "ĐH Bách Khoa"), ("degree[]", "Kỹ sư"),
+                          ("edu_period[]", "2014-2019"), ("edu_description[]", "")])
+        db.session.add(CV(candidate_id=self.candidate.id, title="CV form",
+                          experiences=cv_store.experiences_from_form(form),
+                          educations=cv_store.educations_from_form(form)))
+        db.session.add(CV(candidate_id=self.candidate.id, title="CV khac",
+                          experiences=[CVExperience(company="Viettel", period="2022 - nay")]))
+        db.session.commit()
+
+        def titles(**filters):
+            return sorted(cv.title for cv in dao.filter_cvs(**filters))
+
+        self.assertEqual(CVExperience.query.count(), 2)
+        self.assertEqual(titles(company="fpt"), ["CV form"])
+        self.assertEqual(titles(degree="Kỹ sư"), ["CV form"])
+        self.assertEqual(titles(company="FPT", year_from=2022), [])
+        self.assertEqual(titles(year_from=2023, year_to=2024), ["CV khac"])
+        self.assertEqual(titles(year_from=2020, year_to=2020), ["CV form"])
+        self.assertEqual(titles(company="100%"), [])
+
+    def test_edit_cv_route_replaces_sections(self):
+        cv = CV(candidate_id=self.candidate.id, title="CV cu",
+                experiences=[CVExperience(company="Viettel", period="2020-2022")],
+                educations=[CVEducation(school="ĐH Quốc gia", degree="Cử nhân")])
+        db.session.add(cv)
+        db.session.commit()
+        cv_id, updated_at = cv.id, cv.updated_at
+
+        client = self.app.test_client()
+        self.login(client, self.candidate.user_id, 'candidate')
+        res = client.post('/candidate/cv/%d' % cv_id, data=MultiDict([
+            ("title", "CV moi"), ("full_name", "Nguyen Van A"), ("email", "a@example.com"),
+            ("company[]", "FPT Software"), ("position[]", "Backend"), ("period[]", "2022 - nay"),
+            ("description[]", ""), ("school[]", "ĐH Bách Khoa"), ("degree[]", "Kỹ sư"),
+            ("edu_period[]", "2014-2019"), ("edu_description[]", "")]))
+        self.assertEqual(res.status_code, 302)
+
+        db.session.expire_all()
+        cv = db.session.get(CV, cv_id)
+        self.assertEqual(cv.title, "CV moi")
+        self.assertGreater(cv.updated_at, updated_at)
+        self.assertEqual([(e.company, e.period_start, e.period_end) for e in cv.experiences],
+                         [("FPT Software", 2022, None)])
+        self.assertEqual([(e.school, e.degree) for e in cv.educations], [("ĐH Bách Khoa", "Kỹ sư")])
+        self.assertEqual(CVExperience.query.count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
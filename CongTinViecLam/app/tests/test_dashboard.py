@@ -0,0 +1,157 @@
+import unittest
+
+from app import db, dao
+from app.models import User, Candidate, Employer, Job, CV, Application, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestEmployerDashboard(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER)
+        employer_user.set_password("123")
+        db.session.add(employer_user)
+        db.session.commit()
+
+        self.employer = Employer(user_id=employer_user.id, company_name="ABC Corp")
+        db.session.add(self.employer)
+        db.session.commit()
+        self.employer_id = self.employer.id
+
+        self.candidates = []
+        for i in range(3):
+            user = User(username="cand%d" % i, role=UserRole.CANDIDATE)
+            user.set_password("123")
+            db.session.add(user)
+            db.session.commit()
+            candidate = Candidate(user_id=user.id, full_name="Ung vien %d" % i)
+            db.session.add(candidate)
+            cv = CV(title="CV %d" % i)
+            cv.candidate = candidate
+            db.session.add(cv)
+            self.candidates.append((candidate, cv))
+        db.session.commit()
+
+    def _add_jobs(self, n):
+        statuses = ['active', 'pending', 'inactive']
+        for i in range(n):
+            job = Job(employer=self.employer, title="Job %d" % i, description="Mo ta",
+                      status=statuses[i % len(statuses)])
+            db.session.add(job)
+            db.session.flush()
+            for candidate, cv in self.candidates[:i % 4]:
+                db.session.add(Application(job_id=job.id, candidate_id=candidate.id, cv_id=cv.id,
+                                           status='accepted' if i % 2 else 'pending'))
+        db.session.commit()
+
+    def _load_dashboard(self):
+        stats = dao.employer_job_stats(self.employer_id)
+        return stats, dao.employer_jobs_page(self.employer_id, page=1, per_page=20, total=stats['total_jobs'])
+
+    def test_stats_and_counts(self):
+        self._add_jobs(6)
+
+        stats, (jobs, counts) = self._load_dashboard()
+        self.assertEqual(stats['total_jobs'], 6)
+        self.assertEqual(stats['jobs'], {'active': 2, 'pending': 2, 'inactive': 2})
+        self.assertEqual(stats['total_applications'], 0 + 1 + 2 + 3 + 0 + 1)
+        self.assertEqual(stats['applications']['accepted'], 1 + 3 + 1)
+        self.assertEqual(jobs.total, 6)
+        self.assertEqual(sum(c['total'] for c in counts.values()), stats['total_applications'])
+
+    def test_query_count_does_not_grow_with_jobs(self):
+        self._add_jobs(3)
+        db.session.expire_all()
+        few = self.count_queries(self._load_dashboard)
+
+        self._add_jobs(30)
+        db.session.expire_all()
+        many = self.count_queries(self._load_dashboard)
+
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 4)
+
+    def test_rendered_dashboard_query_count_does_not_grow_with_jobs(self):
+        client = self.app.test_client()
+        self.login(client, self.employer.user_id, 'employer')
+
+        pages = []
+
+        def render():
+            res = client.get('/employer/dashboard')
+            self.assertEqual(res.status_code, 200)
+            pages.append(res.get_data(as_text=True))
+
+        # Request đầu nạp principal vào cache
+        render()
+        self._add_jobs(3)
+        db.session.expire_all()
+        few = self.count_queries(render)
+
+        self._add_jobs(30)
+        db.session.expire_all()
+        statements = []
+        many = self.count_queries(render, statements)
+        self.assertEqual(len([s for s in statements if 'FROM employers' in s]), 1)
+
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 5)
+        self.assertEqual(pages[-1].count("ABC Corp"), 20)
+
+    def test_job_applications_page_loads_candidate_and_cv_in_one_query(self):
+        self._add_jobs(4)
+        job = Job.query.filter_by(title="Job 3").first()
+        job_id = job.id
+        db.session.expire_all()
+
+        def load():
+            counts = dao.application_counts_by_job([job_id])[job_id]
+            page = dao.job_applications_page(job_id, status='accepted', sort='name', page=1, per_page=2,
+                                             counts=counts)
+            return counts, page, [(a.candidate.full_name, a.cv.title) for a in page.items]
+
+        result = []
+        self.assertEqual(self.count_queries(lambda: result.append(load())), 2)
+
+        counts, page, rows = result[0]
+        self.assertEqual(counts['accepted'], 3)
+        self.assertEqual(page.total, 3)
+        self.assertEqual(page.pages, 2)
+        self.assertEqual(rows, [("Ung vien 0", "CV 0"), ("Ung vien 1", "CV 1")])
+
+    def test_bulk_review_checks_ownership_in_one_query(self):
+        self._add_jobs(4)
+        other_user = User(username="emp2", role=UserRole.EMPLOYER)
+        other_user.set_password("123")
+        db.session.add(other_user)
+        db.session.commit()
+        other = Employer(user_id=other_user.id, company_name="XYZ Corp")
+        other_job = Job(employer=other, title="Job khac", description="Mo ta", status="active")
+        db.session.add(other_job)
+        db.session.flush()
+        candidate, cv = self.candidates[0]
+        foreign = Application(job_id=other_job.id, candidate_id=candidate.id, cv_id=cv.id)
+        db.session.add(foreign)
+        db.session.commit()
+
+        own_ids = [app_id for (app_id,) in db.session.query(Application.id)
+                   .join(Job).filter(Job.employer_id == self.employer_id).order_by(Application.id)]
+        foreign_id = foreign.id
+        ids = own_ids + [foreign_id, 9999, own_ids[0]]
+
+        result = []
+        # SELECT kiểm tra quyền + UPDATE + một INSERT vào outbox cho cả lô (không tính COMMIT)
+        queries = self.count_queries(lambda: result.append(
+            dao.review_applications(self.employer_id, ids, 'rejected')))
+        self.assertEqual(queries, 3)
+
+        updated, rejected = result[0]
+        self.assertEqual(updated, own_ids)
+        self.assertEqual(rejected, [foreign_id, 9999])
+        self.assertEqual(dao.application_counts_by_job([job.id for job in Job.query])[other_job.id]['pending'], 1)
+        self.assertEqual(dao.employer_job_stats(self.employer_id)['applications']['rejected'], len(own_ids))
+
+
+if __name__ == "__main__":
+    unittest.main()
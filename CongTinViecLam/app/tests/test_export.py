@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+import unittest
+
+from app import db, export
+from app.models import User, Candidate, Employer, Job, CV, Application, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestApplicationExport(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_users = [User(username="emp%d" % i, role=UserRole.EMPLOYER) for i in range(2)]
+        for user in employer_users:
+            user.set_password("123")
+        db.session.add_all(employer_users)
+        db.session.commit()
+
+        employers = [Employer(user_id=user.id, company_name="Cong ty %d" % user.id) for user in employer_users]
+        jobs = [Job(employer=employers[i % 2], title="Job %d" % i, description="Mo ta", status="active")
+                for i in range(3)]
+        db.session.add_all(employers + jobs)
+        db.session.commit()
+        self.employer_id = employers[0].id
+        self.job_ids = [job.id for job in jobs]
+
+        for i in range(5):
+            user = User(username="cand%d" % i, role=UserRole.CANDIDATE)
+            user.set_password("123")
+            candidate = Candidate(user=user, full_name="Ung vien %d" % i, email="uv%d@example.com" % i,
+                                  phone="=1+1" if i == 0 else None)
+            cv = CV(candidate=candidate, title="CV %d" % i, skills="Python")
+            db.session.add_all([user, candidate, cv])
+            db.session.flush()
+            for job in jobs:
+                db.session.add(Application(job_id=job.id, candidate_id=candidate.id, cv_id=cv.id,
+                                           status='accepted' if i % 2 else 'pending'))
+        db.session.commit()
+
+    def test_csv_streams_owned_applications_in_one_query(self):
+        export.CHUNK_ROWS = 3
+        self.addCleanup(setattr, export, 'CHUNK_ROWS', 200)
+
+        stream = export.csv_stream(export.export_rows(self.employer_id))
+        # Phần đầu được gửi trước khi chạy truy vấn
+        chunks = []
+        self.assertEqual(self.count_queries(lambda: chunks.append(next(stream))), 0)
+        self.assertTrue(chunks[0].startswith('\ufeffapplication_id,'))
+        self.assertEqual(self.count_queries(lambda: chunks.extend(stream)), 1)
+        self.assertEqual(len(chunks), 5)
+
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks).lstrip('\ufeff'))))
+        # Employer 0 sở hữu job 0 và job 2
+        self.assertEqual(len(rows), 10)
+        self.assertEqual({int(row['job_id']) for row in rows}, {self.job_ids[0], self.job_ids[2]})
+        self.assertEqual(rows[0]['phone'], "'=1+1")
+        self.assertEqual(rows[0]['cv_title'], "CV 0")
+
+    def test_ndjson_filters_by_job_and_status(self):
+        body = ''.join(export.ndjson_stream(
+            export.export_rows(self.employer_id, job_id=self.job_ids[0], status='accepted')))
+        items = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([item['full_name'] for item in items], ["Ung vien 1", "Ung vien 3"])
+        self.assertEqual({item['status'] for item in items}, {'accepted'})
+
+        self.assertEqual(list(export.export_rows(self.employer_id, job_id=self.job_ids[1])), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
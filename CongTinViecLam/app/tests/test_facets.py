@@ -0,0 +1,123 @@
+import unittest
+
+from sqlalchemy import delete
+from werkzeug.datastructures import MultiDict
+
+from app import db, facets
+from app.models import User, Employer, Job, JobStatus, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestFacets(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER)
+        employer_user.set_password("123")
+        self.employer = Employer(user=employer_user, company_name="ABC Corp")
+        rows = [
+            ("Kế toán tổng hợp", "Hà Nội", "fulltime", "junior", 12000000),
+            ("Kế toán thuế", "Ha Noi", "fulltime", "senior", 25000000),
+            ("Lập trình viên Python", "Hà Nội", "remote", "senior", 40000000),
+            ("Lập trình viên Java", "Đà Nẵng", "fulltime", "mid", None),
+            ("Nhân viên kinh doanh", "Hồ Chí Minh", "parttime", "fresher", 8000000),
+        ]
+        self.jobs = [Job(employer=self.employer, title=title, description="Mô tả", location=location,
+                         work_type=work_type, experience_level=level, salary=salary, status="active")
+                     for title, location, work_type, level, salary in rows]
+        db.session.add_all([employer_user, self.employer] + self.jobs)
+        db.session.commit()
+
+    def _counts(self, base=None, selected=None):
+        total, groups = facets.index.summarize(base, selected or {})
+        return total, {group['name']: {item['value']: item['count'] for item in group['values']} for group in groups}
+
+    def test_counts_for_all_active_jobs(self):
+        total, counts = self._counts()
+        self.assertEqual(total, 5)
+        # Địa điểm gộp theo dạng bỏ dấu
+        self.assertEqual(counts['location'], {'ha noi': 3, 'da nang': 1, 'ho chi minh': 1})
+        self.assertEqual(counts['work_type'], {'fulltime': 3, 'remote': 1, 'parttime': 1})
+        self.assertEqual(counts['salary_band'], {'duoi-10': 1, '10-15': 1, '20-30': 1, '30-50': 1,
+                                                 'thoa-thuan': 1})
+
+    def test_counts_exclude_own_facet_selection(self):
+        total, counts = self._counts(selected={'location': ['ha noi'], 'work_type': ['fulltime']})
+        self.assertEqual(total, 2)
+        # Nhóm địa điểm đếm trên job fulltime, nhóm hình thức đếm trên job ở Hà Nội
+        self.assertEqual(counts['location'], {'ha noi': 2, 'da nang': 1})
+        self.assertEqual(counts['work_type'], {'fulltime': 2, 'remote': 1})
+        self.assertEqual(counts['experience_level'], {'junior': 1, 'senior': 1})
+
+    def test_keyword_base_and_sql_conditions_agree(self):
+        base = facets.base_bitmap(keyword="ke toan")
+        total, counts = self._counts(base, {'experience_level': ['senior']})
+        self.assertEqual(total, 1)
+        self.assertEqual(counts['experience_level'], {'junior': 1, 'senior': 1})
+
+        selected = {'location': ['ha noi'], 'salary_band': ['10-15', '20-30']}
+        conditions = facets.index.conditions(selected)
+        filtered = Job.query.filter(Job.status == JobStatus.active, *conditions).order_by(Job.id).all()
+        self.assertEqual(filtered, self.jobs[:2])
+        self.assertEqual(self._counts(selected=selected)[0], 2)
+
+    def test_incremental_updates_without_reload(self):
+        self._counts()
+
+        self.jobs[3].status = JobStatus.inactive
+        self.jobs[4].location = "Hà Nội"
+        db.session.add(Job(employer=self.employer, title="Tester", description="Mô tả", location="Đà Nẵng",
+                           work_type="hybrid", status="active"))
+        db.session.commit()
+
+        result = []
+        self.assertEqual(self.count_queries(lambda: result.append(self._counts())), 0)
+        total, counts = result[0]
+        self.assertEqual(total, 5)
+        self.assertEqual(counts['location'], {'ha noi': 4, 'da nang': 1})
+        self.assertEqual(counts['work_type'], {'fulltime': 2, 'remote': 1, 'parttime': 1, 'hybrid': 1})
+
+        db.session.delete(self.jobs[0])
+        db.session.commit()
+        self.assertEqual(self._counts()[1]['experience_level'].get('junior', 0), 0)
+
+    def test_bitmap_from_ids(self):
+        self.assertEqual(facets.bitmap_from_ids([]), 0)
+        self.assertEqual(facets.bitmap_from_ids([0, 3, 64, 3]), 1 | 1 << 3 | 1 << 64)
+
+    def test_removes_jobs_deleted_by_other_workers(self):
+        self._counts()
+        # Worker khác xóa hẳn job: không có event nào trong tiến trình này, cũng không còn dòng để đồng bộ
+        db.session.execute(delete(Job).where(Job.id == self.jobs[2].id))
+        db.session.commit()
+        self.app.config.update(FACETS_SYNC_SECONDS=0)
+        self.assertEqual(self._counts()[0], 5)
+
+        self.app.config.update(FACETS_RECONCILE_SECONDS=0)
+        total, counts = self._counts()
+        self.assertEqual(total, 4)
+        self.assertEqual(counts['work_type'], {'fulltime': 3, 'parttime': 1})
+
+    def test_keyword_bitmap_follows_job_changes(self):
+        self.assertEqual(facets.base_bitmap("ke toan"), 1 << self.jobs[0].id | 1 << self.jobs[1].id)
+        self.jobs[2].title = "Kế toán nội bộ"
+        db.session.commit()
+        self.assertEqual(facets.base_bitmap("ke toan").bit_count(), 3)
+
+    def test_job_page_filters_and_shows_counts(self):
+        selected = facets.parse_selection(MultiDict([('f_work_type', 'fulltime'), ('f_work_type', ''),
+                                                     ('f_unknown', 'x')]))
+        self.assertEqual(selected, {'work_type': ['fulltime']})
+
+        client = self.app.test_client()
+        res = client.get('/job?f_location=ha+noi&f_work_type=fulltime')
+        html = res.get_data(as_text=True)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('Kế toán tổng hợp', html)
+        self.assertNotIn('Lập trình viên Python', html)
+        self.assertIn('2 việc làm', html)
+        self.assertIn('Toàn thời gian', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.fragments import fragment_cache
+from app.models import User, Employer, Job, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestFragmentCache(AppTestCase):
+    PUSH_CONTEXT = False
+
+    def setUp(self):
+        super().setUp()
+        with self.app.app_context():
+            employer_user = User(username="emp1", role=UserRole.EMPLOYER, password="x")
+            employer = Employer(user=employer_user, company_name="ABC Corp")
+            job = Job(employer=employer, title="Flask Developer", description="API <b>Flask</b>",
+                      location="Hà Nội", status="active")
+            db.session.add_all([employer_user, employer, job])
+            db.session.commit()
+            self.employer_id, self.job_id = employer.id, job.id
+            db.session.remove()
+        self.client = self.app.test_client()
+
+    def _update(self, model, obj_id, **values):
+        with self.app.app_context():
+            obj = db.session.get(model, obj_id)
+            for key, value in values.items():
+                setattr(obj, key, value)
+            db.session.commit()
+
+    def test_job_card_cached_until_job_or_company_changes(self):
+        first = self.client.get('/job').get_data(as_text=True)
+        second = self.client.get('/job').get_data(as_text=True)
+        self.assertEqual(first, second)
+        self.assertIn('ABC Corp', second)
+        # HTML lấy từ cache không bị escape lần nữa
+        self.assertIn('<p class="card-text">API &lt;b&gt;Flask&lt;/b&gt;</p>', second)
+        stats = fragment_cache.stats()['fragment:job_card']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+        self._update(Job, self.job_id, title="Senior Flask Developer",
+                     updated_at=datetime.utcnow() + timedelta(seconds=5))
+        self.assertIn('Senior Flask Developer', self.client.get('/job').get_data(as_text=True))
+
+        self._update(Employer, self.employer_id, company_name="XYZ Corp")
+        body = self.client.get('/job').get_data(as_text=True)
+        self.assertIn('XYZ Corp', body)
+        self.assertNotIn('ABC Corp', body)
+
+    def test_job_detail_fragments(self):
+        url = '/job/%d' % self.job_id
+        self.client.get(url)
+        self.client.get(url)
+        stats = fragment_cache.stats()
+        self.assertEqual(stats['fragment:job_detail']['hits'], 1)
+        self.assertEqual(stats['fragment:job_employer']['hits'], 1)
+
+        self._update(Employer, self.employer_id, contact_person="Chị Lan")
+        self.assertIn('Chị Lan', self.client.get(url).get_data(as_text=True))
+
+    def test_disabled(self):
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'FRAGMENT_CACHE_ENABLED': False})
+        template = app.jinja_env.from_string("{% cache 'x', n %}{{ n }}{% endcache %}")
+        with app.app_context():
+            self.assertEqual(template.render(n=1), '1')
+            self.assertEqual(template.render(n=1), '1')
+        self.assertNotIn('fragment:x', fragment_cache.stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
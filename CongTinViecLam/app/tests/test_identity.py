@@ -0,0 +1,63 @@
+import unittest
+
+from app import db, identity
+from app.models import User, Candidate, Employer, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestPrincipalCache(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        user = User(username="cand1", role=UserRole.CANDIDATE)
+        user.set_password("123")
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+
+        db.session.add(Candidate(user_id=user.id, full_name="Nguyen Van A"))
+        db.session.commit()
+
+    def test_principal_is_loaded_once(self):
+        loaded = []
+        self.assertEqual(self.count_queries(lambda: loaded.append(identity.load_principal(self.user_id))), 1)
+        self.assertEqual(self.count_queries(lambda: loaded.append(identity.load_principal(self.user_id))), 0)
+
+        principal = loaded[-1]
+        self.assertEqual(principal.role, UserRole.CANDIDATE)
+        self.assertTrue(principal.is_active)
+        self.assertIsNotNone(principal.candidate_id)
+        self.assertIsNone(principal.employer_id)
+        self.assertEqual(principal.candidate.full_name, "Nguyen Van A")
+
+    def test_commit_invalidates_principal(self):
+        identity.load_principal(self.user_id)
+
+        user = db.session.get(User, self.user_id)
+        user.is_active = False
+        db.session.commit()
+        self.assertFalse(identity.load_principal(self.user_id).is_active)
+
+        db.session.add(Employer(user_id=self.user_id, company_name="ABC Corp"))
+        db.session.commit()
+        self.assertIsNotNone(identity.load_principal(self.user_id).employer_id)
+
+    def test_profile_is_loaded_once_per_request(self):
+        principal = identity.load_principal(self.user_id)
+        self.assertEqual(self.count_queries(lambda: principal.candidate), 1)
+        # Commit giữa request làm hết hạn các đối tượng trong session nhưng không nạp lại candidate
+        db.session.commit()
+        self.assertEqual(self.count_queries(lambda: [principal.candidate for _ in range(5)]), 0)
+        self.assertIsNone(principal.employer)
+
+    def test_rollback_keeps_cached_principal(self):
+        identity.load_principal(self.user_id)
+
+        db.session.get(User, self.user_id).username = "other"
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(self.count_queries(lambda: identity.load_principal(self.user_id)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import json
+import unittest
+
+from app import db, search, ingest
+from app.models import User, Employer, Job, JobStatus, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestIngestJobs(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER)
+        employer_user.set_password("123")
+        db.session.add(employer_user)
+        db.session.commit()
+
+        employer = Employer(user_id=employer_user.id, company_name="ABC Corp")
+        db.session.add(employer)
+        db.session.commit()
+        self.employer_id = employer.id
+
+    def _ingest(self, payload, chunk_size=16, batch_size=2):
+        items = ingest.iter_items(io.BytesIO(payload.encode('utf-8')), chunk_size=chunk_size)
+        return ingest.ingest_jobs(self.employer_id, items, batch_size=batch_size)
+
+    def test_ndjson_with_errors(self):
+        lines = [
+            {"external_ref": "A1", "title": "Kế toán tổng hợp", "description": "Mo ta", "location": "Hà Nội", "salary": 1500},
+            {"external_ref": "A2", "title": "Lập trình viên", "description": "Mo ta"},
+            {"external_ref": "A3", "description": "Thiếu tiêu đề"},
+            {"external_ref": "A4", "title": "Job", "description": "Mo ta", "salary": -1},
+        ]
+        payload = '\n'.join(json.dumps(line, ensure_ascii=False) for line in lines) + '\n{hỏng\n'
+        result = self._ingest(payload)
+
+        self.assertEqual(result['summary'], {'created': 2, 'updated': 0, 'error': 3})
+        self.assertEqual([item['status'] for item in result['items']],
+                         ['created', 'created', 'error', 'error', 'error'])
+        self.assertEqual(result['items'][2]['external_ref'], "A3")
+        self.assertEqual(Job.query.count(), 2)
+        self.assertEqual([job.id for job in search.search_jobs("ke toan", "ha noi")], [result['items'][0]['job_id']])
+
+    def test_malformed_array_element_stops_reading(self):
+        payload = json.dumps([{"external_ref": "B1", "title": "Thu ngân", "description": "Mo ta"}],
+                             ensure_ascii=False)[:-1] + ', {"external_ref": tru}, ' + '{"title": "x"}, ' * 10000 + ']'
+        stream = io.StringIO(payload)
+        old, ingest.MAX_ITEM_SIZE = ingest.MAX_ITEM_SIZE, 1000
+        try:
+            items = list(ingest.iter_items(stream, chunk_size=16))
+        finally:
+            ingest.MAX_ITEM_SIZE = old
+        self.assertEqual([error is None for _, _, error in items], [True, False])
+        self.assertLess(stream.tell(), 1200)
+
+    def test_json_array_split_at_any_chunk_boundary(self):
+        jobs = [{"external_ref": "E%d" % i, "title": "Kế toán \"trưởng\"\n%d" % i, "description": "Mô tả\t\u2028",
+                 "salary": -12.5 * i, "remote": i % 2 == 0, "benefits": None, "tags": [True, False, None, -1]}
+                for i in range(20)]
+        for ensure_ascii in (True, False):
+            payload = json.dumps(jobs, ensure_ascii=ensure_ascii)
+            for chunk_size in (1, 7, 64):
+                items = list(ingest.iter_items(io.StringIO(payload), chunk_size=chunk_size))
+                self.assertEqual([item for _, item, _ in items], jobs, (ensure_ascii, chunk_size))
+                self.assertTrue(all(error is None for _, _, error in items))
+
+    def test_invalid_status_type(self):
+        item = {"external_ref": "C1", "title": "Job", "description": "Mo ta"}
+        for status in (["active"], {"a": 1}, 1):
+            self.assertEqual(ingest.validate_item(dict(item, status=status)), (None, 'status không hợp lệ'))
+        self.assertEqual(ingest.validate_item(dict(item, status="pending"))[0]['status'], JobStatus.pending)
+
+    def test_json_array_replay_is_idempotent(self):
+        jobs = [{"external_ref": "R%d" % i, "title": "Nhân viên kinh doanh %d" % i, "description": "Mo ta"}
+                for i in range(5)]
+        first = self._ingest(json.dumps(jobs, ensure_ascii=False))
+        self.assertEqual(first['summary']['created'], 5)
+
+        jobs[0]['title'] = "Trưởng phòng marketing"
+        jobs[1]['status'] = JobStatus.inactive.value
+        second = self._ingest(json.dumps(jobs, ensure_ascii=False))
+        self.assertEqual(second['summary'], {'created': 0, 'updated': 5, 'error': 0})
+        self.assertEqual([item['job_id'] for item in first['items']], [item['job_id'] for item in second['items']])
+
+        self.assertEqual(Job.query.count(), 5)
+        self.assertEqual([job.title for job in search.search_jobs("marketing", None)], ["Trưởng phòng marketing"])
+        self.assertEqual(search.search_jobs("kinh doanh", None).count(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from datetime import datetime, timedelta
+
+from app import db, search
+from app.models import User, Employer, Job, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestJobsApi(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER, password="x")
+        employer = Employer(user=employer_user, company_name="Công ty ABC")
+        now = datetime.utcnow().replace(microsecond=0)
+        self.jobs = [Job(employer=employer, title="Kế toán %d" % i if i % 2 else "Lập trình viên %d" % i,
+                         description="Mô tả dài " * 50, location="Hà Nội",
+                         salary=15000000 if i % 3 else 12500000.5, work_type='remote' if i % 2 else 'onsite',
+                         status="active" if i != 5 else "inactive", posted_date=now - timedelta(days=i // 3))
+                     for i in range(12)]
+        db.session.add_all([employer_user, employer] + self.jobs)
+        db.session.commit()
+        self.employer_user_id = employer_user.id
+        self.client = self.app.test_client()
+
+    def _walk(self, url):
+        items, cursor = [], ''
+        while True:
+            data = self.client.get(url + '&cursor=' + cursor).get_json()
+            items += data['items']
+            if not data['next_cursor']:
+                return items
+            cursor = data['next_cursor']
+
+    def test_list_selects_only_requested_columns(self):
+        statements, responses = [], []
+        self.count_queries(lambda: responses.append(self.client.get('/api/jobs?fields=id,title,salary&limit=3')),
+                           statements)
+        res = responses[0]
+        data = res.get_json()
+        self.assertEqual(res.headers['Content-Type'], 'application/json')
+        self.assertEqual([set(item) for item in data['items']], [{'id', 'title', 'salary'}] * 3)
+        self.assertNotIn(' ', res.get_data(as_text=True).split('"title"')[0])
+        selects = [s for s in statements if 'FROM jobs' in s]
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('description', selects[0])
+        self.assertNotIn('employers', selects[0])
+
+        salaries = {item['id']: item['salary'] for item in self._walk('/api/jobs?fields=id,salary&limit=4')}
+        self.assertEqual(salaries[self.jobs[0].id], 12500000.5)
+        self.assertEqual(salaries[self.jobs[1].id], 15000000)
+        self.assertIsInstance(salaries[self.jobs[1].id], int)
+
+        self.assertEqual(self.client.get('/api/jobs?fields=id,password').status_code, 400)
+
+    def test_filters_match_job_page(self):
+        expected = [job.id for job in search.search_jobs(keyword='ke toan').all() if job.work_type == 'remote']
+        items = self._walk('/api/jobs?keyword=k%E1%BA%BF+to%C3%A1n&f_work_type=remote&fields=id,company&limit=2')
+        self.assertEqual([item['id'] for item in items], expected)
+        self.assertEqual({item['company'] for item in items}, {"Công ty ABC"})
+
+        data = self.client.get('/api/jobs?f_work_type=onsite&count=1&fields=id').get_json()
+        self.assertEqual(data['total'], 6)
+
+    def test_detail(self):
+        job = self.jobs[1]
+        url = '/api/jobs/%d?fields=id,title,company,posted_date' % job.id
+        res = self.client.get(url)
+        self.assertEqual(res.get_json(), {'id': job.id, 'title': job.title, 'company': "Công ty ABC",
+                                          'posted_date': job.posted_date.isoformat()})
+        self.assertEqual(res.headers['Cache-Control'], 'public, no-cache')
+        self.assertNotIn('Cookie', res.headers.get('Vary', ''))
+        not_modified = self.client.get(url, headers={'If-None-Match': res.headers['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.headers['Cache-Control'], 'public, no-cache')
+
+        # Người đăng nhập nhận cùng ETag với khách
+        self.login(self.client, self.employer_user_id, 'employer')
+        self.assertEqual(self.client.get(url).headers['ETag'], res.headers['ETag'])
+        self.assertEqual(set(self.client.get('/api/jobs/%d' % job.id).get_json()), set(
+            ['id', 'title', 'company', 'employer_id', 'location', 'salary', 'work_type', 'experience_level',
+             'status', 'posted_date', 'updated_at', 'summary', 'description', 'requirements', 'benefits']))
+        self.assertEqual(self.client.get('/api/jobs/%d' % self.jobs[5].id).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
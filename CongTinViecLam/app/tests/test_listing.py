@@ -0,0 +1,68 @@
+import unittest
+
+from sqlalchemy import update
+
+from app import db, ingest, maintenance
+from app.models import User, Employer, Job, UserRole, make_summary, SUMMARY_LENGTH
+from app.tests.base import AppTestCase
+
+
+class TestListingColumns(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER, password="x")
+        self.employer = Employer(user=employer_user, company_name="ABC Corp")
+        self.job = Job(employer=self.employer, title="Kế toán", description="Lập báo cáo\n\nthuế " * 40,
+                       requirements="Có chứng chỉ " * 50, location="Hà Nội", status="active")
+        db.session.add_all([employer_user, self.employer, self.job])
+        db.session.commit()
+
+    def test_make_summary(self):
+        self.assertEqual(make_summary(" Mô tả\n ngắn "), "Mô tả ngắn")
+        self.assertEqual(make_summary(None), "")
+        summary = make_summary("từ " * 100)
+        self.assertTrue(summary.endswith("từ…"))
+        self.assertLessEqual(len(summary), SUMMARY_LENGTH + 1)
+
+    def test_summary_synced_on_write(self):
+        self.assertEqual(self.job.summary, make_summary(self.job.description))
+        self.job.description = "Mô tả mới"
+        db.session.commit()
+        self.assertEqual(db.session.query(Job.summary).filter_by(id=self.job.id).scalar(), "Mô tả mới")
+
+        result = ingest.ingest_jobs(self.employer.id, [(0, {'external_ref': 'x1', 'title': "Thu ngân",
+                                                             'description': "Thu ngân  ca sáng"}, None)])
+        self.assertEqual(result['summary']['created'], 1)
+        self.assertEqual(db.session.query(Job.summary).filter_by(external_ref='x1').scalar(), "Thu ngân ca sáng")
+
+    def test_backfill_summaries(self):
+        db.session.add(Job(employer=self.employer, title="Thu ngân", description="Ca  sáng\nca chiều",
+                           location="Huế", status="active"))
+        db.session.commit()
+        before = dict(db.session.query(Job.id, Job.updated_at))
+        db.session.execute(update(Job).values(summary=None, updated_at=Job.updated_at))
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['job-summary-backfill', '--batch-size', '1'])
+        self.assertIn('2 job', result.output)
+        db.session.expire_all()
+        self.assertEqual({job.id: job.summary for job in Job.query},
+                         {self.job.id: make_summary(self.job.description), max(before): "Ca sáng ca chiều"})
+        self.assertEqual(dict(db.session.query(Job.id, Job.updated_at)), before)
+        self.assertEqual(maintenance.backfill_summaries(), 0)
+
+    def test_job_list_does_not_load_text_columns(self):
+        statements, bodies = [], []
+        self.count_queries(lambda: bodies.append(self.app.test_client().get('/job').get_data(as_text=True)),
+                           statements)
+        body = bodies[0]
+        self.assertIn(self.job.summary, body)
+        selects = [s for s in statements if 'FROM jobs' in s]
+        self.assertTrue(selects)
+        for column in ('description', 'requirements', 'benefits'):
+            self.assertFalse(any('jobs.%s' % column in s for s in selects), column)
+
+
+if __name__ == '__main__':
+    unittest.main()
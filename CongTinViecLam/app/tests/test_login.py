@@ -1,9 +1,27 @@
+import hashlib
 import unittest
 
-from app import dao
+from app import create_app, db, dao
+from app.models import User, UserRole
 
 
 class TestLogin(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username="user", password=hashlib.md5("123".encode('utf-8')).hexdigest(),
+                            role=UserRole.CANDIDATE))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
     def test_case_1(self):
         self.assertTrue(dao.auth_user("user", "123"))
 
@@ -15,4 +33,4 @@ class TestLogin(unittest.TestCase):
 
 
 if __name__=="__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
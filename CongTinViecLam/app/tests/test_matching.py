@@ -0,0 +1,88 @@
+import unittest
+
+from sqlalchemy import delete
+
+from app import db, matching
+from app.models import User, Candidate, Employer, Job, JobStatus, CV, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestMatching(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER)
+        employer_user.set_password("123")
+        candidate_user = User(username="cand1", role=UserRole.CANDIDATE)
+        candidate_user.set_password("123")
+        db.session.add_all([employer_user, candidate_user])
+        db.session.commit()
+
+        self.employer = Employer(user_id=employer_user.id, company_name="ABC Corp")
+        self.candidate = Candidate(user_id=candidate_user.id, full_name="Nguyen Van A")
+        db.session.add_all([self.employer, self.candidate])
+        self.python_job = Job(employer=self.employer, title="Lập trình viên Python", status="active",
+                              description="Phát triển hệ thống web", requirements="Python, Django, SQL")
+        self.accounting_job = Job(employer=self.employer, title="Kế toán tổng hợp", status="active",
+                                  description="Báo cáo thuế", requirements="Excel, thuế, kế toán")
+        self.cv = CV(candidate=self.candidate, title="CV Backend", position="Lập trình viên",
+                     skills="Python, Flask, SQL", objective="Phát triển web")
+        db.session.add_all([self.python_job, self.accounting_job, self.cv])
+        db.session.commit()
+
+    def test_top_k_ranking(self):
+        ranked = matching.matcher.top_jobs(self.cv, 5)
+        self.assertEqual(ranked[0][0], self.python_job.id)
+        self.assertTrue(0 < ranked[0][1] <= 1)
+        self.assertNotIn(self.accounting_job.id, [job_id for job_id, score in ranked if score > 0.1])
+
+        suggested = matching.suggested_cvs(self.python_job, limit=5)
+        self.assertEqual([item['cv'].id for item in suggested], [self.cv.id])
+        self.assertEqual(matching.suggested_cvs(self.python_job, limit=5, exclude_cv_ids={self.cv.id}), [])
+
+    def test_incremental_update_after_commit(self):
+        matching.matcher.ensure_fresh()
+
+        # Rollback không thay đổi ma trận
+        db.session.add(Job(employer=self.employer, title="Python Flask developer", status="active",
+                           description="Flask API", requirements="Python Flask SQL"))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(len(matching.matcher.jobs), 2)
+
+        new_job = Job(employer=self.employer, title="Python Flask developer", status="active",
+                      description="Flask API", requirements="Python Flask SQL")
+        db.session.add(new_job)
+        self.python_job.status = JobStatus.inactive
+        db.session.commit()
+
+        db.session.refresh(self.cv)
+        result = []
+        # Trong khoảng MATCHING_SYNC_SECONDS không cần đọc lại DB
+        self.assertEqual(self.count_queries(lambda: result.append(matching.matcher.top_jobs(self.cv, 1))), 0)
+        self.assertEqual(result[0][0][0], new_job.id)
+        self.assertNotIn(self.python_job.id, matching.matcher.jobs.rows)
+
+        self.cv.skills = "Excel, thuế, kế toán"
+        db.session.commit()
+        self.assertEqual(matching.matcher.top_jobs(self.cv, 1)[0][0], self.accounting_job.id)
+
+    def test_rows_deleted_by_other_workers_drop_out(self):
+        self.app.config.update(MATCHING_SYNC_SECONDS=0, MATCHING_RECONCILE_SECONDS=0)
+        matching.matcher.ensure_fresh()
+        self.assertIn(self.python_job.id, matching.matcher.jobs.rows)
+
+        # Worker khác xóa hẳn job và CV bằng câu lệnh SQL (không qua sự kiện ORM)
+        job_id, cv_id = self.python_job.id, self.cv.id
+        db.session.execute(delete(Job).where(Job.id == job_id))
+        db.session.execute(delete(CV).where(CV.id == cv_id))
+        db.session.commit()
+
+        matching.matcher.ensure_fresh()
+        self.assertNotIn(job_id, matching.matcher.jobs.rows)
+        self.assertNotIn(cv_id, matching.matcher.cvs.rows)
+        self.assertIn(self.accounting_job.id, matching.matcher.jobs.rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+
+from app import db, dao, outbox
+from app.models import User, Candidate, Employer, Job, CV, Application, UserRole, OutboxEvent, Notification
+from app.tests.base import AppTestCase
+
+
+class TestOutbox(AppTestCase):
+    CONFIG = {'OUTBOX_MAX_ATTEMPTS': 2}
+
+    def setUp(self):
+        super().setUp()
+
+        self.candidate_user = User(username='cand1', password='x', role=UserRole.CANDIDATE)
+        self.employer_user = User(username='emp1', password='x', role=UserRole.EMPLOYER)
+        db.session.add_all([self.candidate_user, self.employer_user])
+        db.session.flush()
+        self.candidate = Candidate(user_id=self.candidate_user.id, full_name='Nguyen Van A', email='a@example.com')
+        self.employer = Employer(user_id=self.employer_user.id, company_name='ABC Corp')
+        self.job = Job(employer=self.employer, title='Flask Developer', description='API',
+                       location='HCM', status='active')
+        self.cv = CV(title='Backend CV', candidate=self.candidate)
+        db.session.add_all([self.candidate, self.employer, self.job, self.cv])
+        db.session.commit()
+        db.session.query(OutboxEvent).delete()
+        db.session.commit()
+
+    def _apply(self):
+        application = Application(job_id=self.job.id, candidate_id=self.candidate.id, cv_id=self.cv.id)
+        db.session.add(application)
+        db.session.commit()
+        return application
+
+    def _events(self, event_type):
+        return OutboxEvent.query.filter_by(event_type=event_type).order_by(OutboxEvent.id).all()
+
+    def test_event_written_in_same_transaction(self):
+        db.session.add(Application(job_id=self.job.id, candidate_id=self.candidate.id, cv_id=self.cv.id))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(OutboxEvent.query.count(), 0)
+
+        application = self._apply()
+        events = self._events('application.created')
+        self.assertEqual(len(events), 1)
+        self.assertEqual(json.loads(events[0].payload)['application_id'], application.id)
+        self.assertEqual(events[0].status, 'pending')
+
+    def test_worker_creates_notification(self):
+        self._apply()
+        result = outbox.process_batch()
+        self.assertEqual(result, {'claimed': 1, 'done': 1, 'failed': 0})
+
+        notification = Notification.query.filter_by(user_id=self.employer_user.id).one()
+        self.assertIn('Flask Developer', notification.message)
+        event = self._events('application.created')[0]
+        self.assertEqual(event.status, 'done')
+        self.assertEqual(event.attempts, 1)
+        # Không còn gì để xử lý
+        self.assertEqual(outbox.process_batch()['claimed'], 0)
+
+    def test_redelivered_event_does_not_duplicate_notification(self):
+        self._apply()
+        outbox.process_batch()
+        # Worker chết sau khi commit thông báo nhưng trước khi đánh dấu done: event được giao lại
+        db.session.query(OutboxEvent).update({'status': 'pending', 'available_at': datetime.utcnow()})
+        db.session.commit()
+        self.assertEqual(outbox.process_batch(), {'claimed': 1, 'done': 1, 'failed': 0})
+        self.assertEqual(Notification.query.filter_by(user_id=self.employer_user.id).count(), 1)
+
+    def test_failing_handler_retries_with_backoff(self):
+        @outbox.subscribe('test.broken')
+        def broken(event_id, payload):
+            raise RuntimeError('hỏng')
+
+        try:
+            outbox.publish(db.session.connection(), 'test.broken', [{'x': 1}])
+            db.session.commit()
+
+            self.assertEqual(outbox.process_batch()['failed'], 1)
+            event = self._events('test.broken')[0]
+            self.assertEqual((event.status, event.attempts), ('pending', 1))
+            self.assertIn('RuntimeError', event.last_error)
+            self.assertGreater(event.available_at, datetime.utcnow())
+            # Chưa tới hạn thử lại
+            self.assertEqual(outbox.process_batch()['claimed'], 0)
+
+            event.available_at = datetime.utcnow() - timedelta(seconds=1)
+            db.session.commit()
+            outbox.process_batch()
+            db.session.refresh(event)
+            self.assertEqual((event.status, event.attempts), ('failed', 2))
+
+            self.assertEqual(outbox.requeue_failed(), 1)
+            db.session.refresh(event)
+            self.assertEqual((event.status, event.attempts), ('pending', 0))
+        finally:
+            outbox._handlers.pop('test.broken', None)
+
+    def test_expired_lease_is_reclaimed(self):
+        self._apply()
+        db.session.query(OutboxEvent).update({'status': 'processing',
+                                              'available_at': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+        self.assertEqual(outbox.process_batch()['done'], 1)
+
+    def test_bulk_review_publishes_events(self):
+        application = self._apply()
+        dao.review_applications(self.employer.id, [application.id], 'accepted')
+
+        events = self._events('application.reviewed')
+        self.assertEqual(len(events), 1)
+        payload = json.loads(events[0].payload)
+        self.assertEqual((payload['status'], payload['previous_status']), ('accepted', 'pending'))
+
+        outbox.process_batch()
+        notification = Notification.query.filter_by(user_id=self.candidate_user.id).one()
+        self.assertIn('được chấp nhận', notification.message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime, timedelta
+
+from app import db, search
+from app.cache import cache
+from app.models import User, Employer, Job, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestCursorPagination(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER)
+        employer_user.set_password("123")
+        db.session.add(employer_user)
+        db.session.commit()
+
+        employer = Employer(user_id=employer_user.id, company_name="ABC Corp")
+        db.session.add(employer)
+
+        # Nhiều job trùng posted_date để kiểm tra khóa phụ id
+        now = datetime.utcnow().replace(microsecond=0)
+        for i in range(23):
+            db.session.add(Job(employer=employer, title="Kế toán %d" % i if i % 2 else "Lập trình viên %d" % i,
+                               description="Mô tả", location="Hà Nội",
+                               status="active" if i != 5 else "inactive",
+                               posted_date=now - timedelta(days=i // 3)))
+        db.session.commit()
+
+    def _walk(self, **kwargs):
+        pages = []
+        page = search.cursor_jobs(per_page=5, **kwargs)
+        pages.append(page)
+        while page.has_next:
+            page = search.cursor_jobs(cursor=page.next_cursor, per_page=5, **kwargs)
+            pages.append(page)
+        return pages
+
+    def test_forward_and_backward_match_offset_order(self):
+        expected = search.search_jobs().all()
+        pages = self._walk()
+        self.assertEqual([job for page in pages for job in page.items], expected)
+        self.assertFalse(pages[0].has_prev)
+
+        # Quay lại từ trang cuối bằng prev_cursor
+        back = [pages[-1].items]
+        page = pages[-1]
+        while page.has_prev:
+            page = search.cursor_jobs(cursor=page.prev_cursor, per_page=5)
+            back.insert(0, page.items)
+        self.assertEqual([job for items in back for job in items], expected)
+
+    def test_ranked_search_is_paged_by_cursor(self):
+        expected = search.search_jobs(keyword="ke toan").all()
+        pages = self._walk(keyword="ke toan")
+        self.assertEqual([job for page in pages for job in page.items], expected)
+        self.assertEqual(len(expected), 10)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        first = search.cursor_jobs(per_page=5)
+        tampered = search.cursor_jobs(cursor=first.next_cursor[:-2] + "xx", per_page=5)
+        self.assertEqual(tampered.items, first.items)
+
+    def test_approximate_total_is_cached(self):
+        self.assertEqual(search.approximate_total(), (22, False))
+        Job.query.filter_by(status="active").first().status = "inactive"
+        db.session.commit()
+        self.assertEqual(search.approximate_total(), (22, False))
+
+        cache.clear()
+        self.assertEqual(search.approximate_total(), (21, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
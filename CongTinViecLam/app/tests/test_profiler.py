@@ -0,0 +1,88 @@
+import unittest
+
+from flask import Response, g, render_template_string
+from flask_login import AnonymousUserMixin
+
+from app import db, profiler, identity
+from app.models import User, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestProfiler(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        db.session.add_all([User(username="u%d" % i, password="x", role=UserRole.CANDIDATE) for i in range(3)])
+        db.session.commit()
+        db.session.remove()
+        profiler.request_log.clear()
+
+    def tearDown(self):
+        profiler.request_log.clear()
+        super().tearDown()
+
+    def _request(self, path, handler, user=None):
+        # Chạy các hook before/after_request quanh handler giống một request thật; người đã đăng nhập
+        # luôn gửi kèm cookie session
+        headers = {'Cookie': '%s=x' % self.app.config["SESSION_COOKIE_NAME"]} if user else {}
+        with self.app.test_request_context(path, headers=headers):
+            g._login_user = user or AnonymousUserMixin()
+            self.app.preprocess_request()
+            response = self.app.process_response(Response(handler()))
+        return response
+
+    def test_records_queries_render_time_and_server_timing(self):
+        def handler():
+            users = User.query.all()
+            db.session.get(User, users[0].id)  # đã có trong identity map, không chạy SQL
+            User.query.count()
+            return render_template_string("{% for u in users %}{{ u.username }}{% endfor %}", users=users)
+
+        admin = identity.Principal(1, "admin", UserRole.ADMIN, True, None, None)
+        response = self._request('/profile?x=1', handler, admin)
+        self.assertEqual(response.get_data(as_text=True), "u0u1u2")
+        timing = response.headers['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="2 queries"', timing)
+        self.assertIn('render;dur=', timing)
+
+        record, = profiler.request_log.records()
+        self.assertEqual(record['path'], '/profile?x=1')
+        self.assertEqual(record['queries'], 2)
+        self.assertEqual(len(record['slowest']), 2)
+        self.assertTrue(all(statement.startswith('SELECT') for _, statement in record['slowest']))
+        self.assertGreaterEqual(record['total_ms'], record['db_ms'])
+
+        # SQL chạy ngoài request không bị tính
+        User.query.all()
+        self.assertEqual(len(profiler.request_log.records()), 1)
+
+    def test_server_timing_only_for_admin_unless_enabled(self):
+        self.assertFalse(self.app.config["PROFILER_SERVER_TIMING"])
+        response = self._request('/', lambda: "ok")
+        self.assertNotIn('Server-Timing', response.headers)
+        # Request vẫn được ghi lại cho trang thống kê của admin
+        self.assertEqual(len(profiler.request_log.records()), 1)
+
+        self.app.config["PROFILER_SERVER_TIMING"] = True
+        self.assertIn('Server-Timing', self._request('/', lambda: "ok").headers)
+
+    def test_ring_buffer_is_bounded_and_aggregated_per_endpoint(self):
+        log = profiler.RequestLog(5)
+        for i in range(8):
+            log.add({'endpoint': 'jobs' if i % 2 else 'index', 'status': 500 if i == 7 else 200,
+                     'total_ms': float(i), 'db_ms': 1.0, 'render_ms': 0.5, 'queries': i,
+                     'slowest': [(float(i), 'SELECT %d' % i)]})
+
+        self.assertEqual([record['total_ms'] for record in log.records()], [3.0, 4.0, 5.0, 6.0, 7.0])
+        stats = {item['endpoint']: item for item in log.stats()}
+        self.assertEqual(stats['jobs']['count'], 3)
+        self.assertEqual(stats['jobs']['errors'], 1)
+        self.assertEqual(stats['jobs']['max_ms'], 7.0)
+        self.assertEqual(stats['jobs']['max_queries'], 7)
+        self.assertEqual(stats['jobs']['slowest'][0], (7.0, 'SELECT 7'))
+        self.assertEqual(stats['index']['count'], 2)
+        self.assertEqual(log.stats()[0]['endpoint'], 'jobs')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import re
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import db, dao, search, identity, export, matching
+from app.models import User, Candidate, Employer, Job, CV, Application, UserRole, JobStatus
+from app.tests.base import AppTestCase
+
+# Truy vấn nóng chỉ được SEARCH trên bảng; SCAN (đọc cả bảng hoặc cả một index) là đã hỏng index.
+# SCAN trên subquery (anon_1...) chỉ là đọc kết quả trung gian nên bỏ qua
+FULL_SCAN = re.compile(r'^SCAN (\w+)')
+# Các truy vấn phân trang phải lấy thứ tự từ index thay vì sắp xếp tạm
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+class TestQueryPlans(AppTestCase):
+    # Không chạy ANALYZE: với dữ liệu mẫu nhỏ, SQLite có thể cho rằng quét cả bảng rẻ hơn,
+    # trong khi ta muốn kiểm tra kế hoạch cho bảng lớn
+    def setUp(self):
+        super().setUp()
+
+        now = datetime.utcnow()
+        employers = []
+        for i in range(3):
+            user = User(username="emp%d" % i, password="x", role=UserRole.EMPLOYER)
+            employers.append(Employer(user=user, company_name="Cong ty %d" % i))
+        db.session.add_all(employers)
+
+        jobs = []
+        for i in range(60):
+            jobs.append(Job(employer=employers[i % 3], title="Ke toan %d" % i, description="Mo ta",
+                            location="Ha Noi", status=list(JobStatus)[i % 3],
+                            posted_date=now - timedelta(hours=i)))
+        db.session.add_all(jobs)
+        db.session.flush()
+
+        for i in range(20):
+            user = User(username="cand%d" % i, password="x", role=UserRole.CANDIDATE)
+            candidate = Candidate(user=user, full_name="Ung vien %d" % i)
+            cv = CV(candidate=candidate, title="CV %d" % i, skills="Ke toan")
+            db.session.add_all([candidate, cv])
+            db.session.flush()
+            for job in jobs[i::7]:
+                db.session.add(Application(job_id=job.id, candidate_id=candidate.id, cv_id=cv.id))
+        db.session.commit()
+
+        self.employer_id = employers[0].id
+        self.employer_user_id = employers[0].user_id
+        self.job_id = jobs[0].id
+        self.candidate_id = candidate.id
+
+    def _capture(self, fn):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertTrue(statements)
+        return statements
+
+    def _plan(self, statement, parameters):
+        rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[-1] for row in rows]
+
+    def _assert_uses_indexes(self, name, fn, ordered=False):
+        for statement, parameters in self._capture(fn):
+            plan = self._plan(statement, parameters)
+            detail = '%s\n%s\n%s' % (name, statement, '\n'.join(plan))
+            scans = [step for step in plan
+                     if FULL_SCAN.match(step) and FULL_SCAN.match(step).group(1) in db.metadata.tables]
+            self.assertEqual(scans, [], 'Quét toàn bảng trong truy vấn ' + detail)
+            if ordered:
+                self.assertNotIn(TEMP_SORT, plan, 'Sắp xếp tạm trong truy vấn ' + detail)
+
+    def test_job_listing_queries(self):
+        self._assert_uses_indexes('trang chủ', lambda: dao._load_recent_jobs(10), ordered=True)
+        self._assert_uses_indexes('/job', lambda: search.cursor_jobs(None, None, None, 10).items, ordered=True)
+        self._assert_uses_indexes('/job tổng số', lambda: search.approximate_total(None, None))
+        self._assert_uses_indexes('/job?page=', lambda: search.paginate_jobs(None, None, 2, 10).items, ordered=True)
+        self._assert_uses_indexes('/job?keyword=', lambda: search.paginate_jobs("ke toan", "ha noi", 1, 10).items)
+
+    def test_employer_queries(self):
+        self._assert_uses_indexes('dashboard thống kê', lambda: dao.employer_job_stats(self.employer_id))
+        self._assert_uses_indexes('dashboard danh sách',
+                                  lambda: dao.employer_jobs_page(self.employer_id, 1, 20, total=20), ordered=True)
+        self._assert_uses_indexes('job_candidates đếm', lambda: dao.application_counts_by_job([self.job_id]))
+        for status in (None, 'pending'):
+            self._assert_uses_indexes('job_candidates %s' % status, lambda: dao.job_applications_page(
+                self.job_id, status=status, sort='newest', page=1, per_page=20, counts={'pending': 3, 'total': 3}),
+                ordered=True)
+        self._assert_uses_indexes('job_candidates CV đã nộp', lambda: dao.applied_cv_ids(self.job_id))
+        self._assert_uses_indexes('xuất ứng viên', lambda: list(export.export_rows(self.employer_id)))
+        # Trạng thái giữ nguyên: chỉ cần câu SELECT kiểm tra quyền sở hữu
+        self._assert_uses_indexes('duyệt hàng loạt',
+                                  lambda: dao.review_applications(self.employer_id, [1, 2, 3], 'pending'))
+
+    def test_candidate_and_login_queries(self):
+        # candidate_dashboard
+        self._assert_uses_indexes('đơn ứng tuyển', lambda: dao.candidate_applications(self.candidate_id),
+                                  ordered=True)
+        self._assert_uses_indexes('CV của ứng viên', lambda: dao.candidate_cvs(self.candidate_id))
+        identity.clear()
+        self._assert_uses_indexes('load_user', lambda: identity.load_principal(self.employer_user_id))
+        # Lần nạp đầu đọc cả bảng; các lần đồng bộ sau chỉ đọc dòng đổi theo updated_at
+        matching.matcher.ensure_fresh()
+        self.app.config['MATCHING_SYNC_SECONDS'] = 0
+        self._assert_uses_indexes('đồng bộ matching', matching.matcher.ensure_fresh)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app, db, replicas
+from app.models import User, Candidate, Employer, Job, CV, UserRole
+
+
+class TestReplicaRouting(unittest.TestCase):
+    # Hai file SQLite: primary và replica (bản sao chép tại một thời điểm, coi như replica bị trễ)
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        primary = os.path.join(self.tmp, 'primary.db')
+        replica = os.path.join(self.tmp, 'replica.db')
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + primary,
+                               'SQLALCHEMY_REPLICA_URIS': ['sqlite:///' + replica],
+                               'DB_READ_YOUR_WRITES_SECONDS': 30})
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+        employer_user = User(username="emp", password="x", role=UserRole.EMPLOYER)
+        candidate_user = User(username="cand", password="x", role=UserRole.CANDIDATE)
+        employer = Employer(user=employer_user, company_name="ABC Corp")
+        candidate = Candidate(user=candidate_user, full_name="Nguyen Van A")
+        cv = CV(candidate=candidate, title="CV", skills="Python")
+        job = Job(employer=employer, title="Lap trinh vien", description="Mo ta", status="active")
+        db.session.add_all([employer, candidate, cv, job])
+        db.session.commit()
+        self.employer_user_id, self.candidate_user_id = employer_user.id, candidate_user.id
+        employer_id, self.cv_id, self.job_id = employer.id, cv.id, job.id
+        db.session.remove()
+        shutil.copy(primary, replica)
+
+        # Job mới chỉ có trên primary, replica chưa đồng bộ
+        db.session.add(Job(employer_id=employer_id, title="Ke toan", description="Mo ta", status="active"))
+        db.session.commit()
+        self.new_job_id = db.session.query(Job.id).order_by(Job.id.desc()).limit(1).scalar()
+        db.session.remove()
+        self.app_context.pop()
+
+        self.statements = {'primary': 0, 'replica': 0}
+        with self.app.app_context():
+            for name, engine in (('primary', db.engines[None]), ('replica', self.app.extensions['db_replicas'][0])):
+                event.listen(engine, 'before_cursor_execute', self._counter(name))
+
+    def tearDown(self):
+        with self.app.app_context():
+            for engine in list(db.engines.values()) + self.app.extensions['db_replicas']:
+                engine.dispose()
+        shutil.rmtree(self.tmp)
+
+    def _counter(self, name):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.statements[name] += 1
+        return before_cursor_execute
+
+    def _client(self, user_id=None, user_type=None):
+        client = self.app.test_client()
+        if user_id:
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user_id)
+                sess['user_type'] = user_type
+        return client
+
+    def _get(self, client, url):
+        self.statements.update(primary=0, replica=0)
+        response = client.get(url)
+        return response, dict(self.statements)
+
+    def test_read_only_requests_use_replica(self):
+        client = self._client()
+        response, counts = self._get(client, '/job/%d' % self.job_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(counts['primary'], 0)
+        self.assertGreater(counts['replica'], 0)
+
+        # Replica chưa có job mới
+        response, counts = self._get(client, '/job/%d' % self.new_job_id)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(counts['primary'], 0)
+
+        # Ngoài request (CLI, tác vụ nền) luôn dùng primary
+        self.statements.update(primary=0, replica=0)
+        with self.app.app_context():
+            self.assertIsNotNone(db.session.get(Job, self.new_job_id))
+        self.assertEqual(self.statements['replica'], 0)
+
+    def test_own_writes_are_read_from_primary(self):
+        candidate = self._client(self.candidate_user_id, 'candidate')
+        self.statements.update(primary=0, replica=0)
+        response = candidate.post('/api/apply', json={'job_id': self.new_job_id, 'cv_id': self.cv_id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.statements['replica'], 0)
+
+        # Ngay sau khi ứng tuyển, dashboard phải thấy đơn vừa nộp
+        response, counts = self._get(candidate, '/candidate/dashboard')
+        self.assertIn("Ke toan", response.get_data(as_text=True))
+        self.assertEqual(counts['replica'], 0)
+
+        # Người dùng khác vẫn đọc replica
+        _, counts = self._get(self._client(self.employer_user_id, 'employer'), '/employer/dashboard')
+        self.assertEqual(counts['primary'], 0)
+        self.assertGreater(counts['replica'], 0)
+
+        # Hết thời gian read-your-writes thì quay lại replica
+        with candidate.session_transaction() as sess:
+            self.assertGreater(sess[replicas.PRIMARY_UNTIL_KEY], time.time())
+            sess[replicas.PRIMARY_UNTIL_KEY] = time.time() - 1
+        _, counts = self._get(candidate, '/candidate/dashboard')
+        self.assertEqual(counts['primary'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
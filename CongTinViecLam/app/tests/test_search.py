@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timedelta
+
+from app import db, search
+from app.models import User, Employer, Job, JobSearchTerm, JobStatus, UserRole
+from app.tests.base import AppTestCase
+
+
+class TestJobSearch(AppTestCase):
+    def setUp(self):
+        super().setUp()
+
+        employer_user = User(username="emp1", role=UserRole.EMPLOYER)
+        employer_user.set_password("123")
+        db.session.add(employer_user)
+        db.session.commit()
+
+        self.employer = Employer(user_id=employer_user.id, company_name="ABC Corp")
+        db.session.add(self.employer)
+
+        now = datetime.utcnow()
+        self.accountant = Job(employer=self.employer, title="Kế toán tổng hợp",
+                              description="Lập báo cáo thuế", location="Hà Nội",
+                              status="active", posted_date=now - timedelta(days=3))
+        self.accountant_new = Job(employer=self.employer, title="Nhân viên văn phòng",
+                                  description="Hỗ trợ kế toán trưởng", location="Hà Nội",
+                                  status="active", posted_date=now)
+        self.developer = Job(employer=self.employer, title="Lập trình viên Python",
+                             description="Phát triển API", location="Đà Nẵng",
+                             status="active", posted_date=now)
+        db.session.add_all([self.accountant, self.accountant_new, self.developer])
+        db.session.commit()
+
+    def test_fold_removes_vietnamese_diacritics(self):
+        self.assertEqual(search.fold("Kế Toán Đà Nẵng"), "ke toan da nang")
+        self.assertEqual(search.tokenize("C++/Python, 3 năm"), ["c", "python", "3", "nam"])
+
+    def test_search_without_diacritics_ranks_title_match_first(self):
+        results = search.search_jobs(keyword="ke toan").all()
+        self.assertEqual(results, [self.accountant, self.accountant_new])
+
+    def test_location_filter_only_matches_location_field(self):
+        results = search.search_jobs(location="da nang").all()
+        self.assertEqual(results, [self.developer])
+
+    def test_index_follows_job_changes(self):
+        self.developer.title = "Kế toán thuế"
+        db.session.commit()
+        self.assertIn(self.developer, search.search_jobs(keyword="ke toan").all())
+
+        self.accountant.status = JobStatus.inactive
+        db.session.commit()
+        self.assertNotIn(self.accountant, search.search_jobs(keyword="ke toan").all())
+        self.assertEqual(JobSearchTerm.query.filter_by(job_id=self.accountant.id).count(), 0)
+
+        job_id = self.developer.id
+        db.session.delete(self.developer)
+        db.session.commit()
+        self.assertEqual(JobSearchTerm.query.filter_by(job_id=job_id).count(), 0)
+
+    def test_last_token_matches_prefix(self):
+        self.assertEqual(search.search_jobs(keyword="lap trin").all(), [self.developer])
+        self.assertEqual(search.search_jobs(keyword="pyt").all(), [self.developer])
+        self.assertEqual(search.search_jobs(keyword="toan").all(), [self.accountant, self.accountant_new])
+        self.assertEqual(search.search_jobs(keyword="lap", location="da nan").all(), [self.developer])
+        # Từ ngắn hơn MIN_PREFIX_LENGTH, hoặc đã gõ xong (có khoảng trắng), chỉ khớp nguyên từ
+        self.assertEqual(search.search_jobs(keyword="py").all(), [])
+        self.assertEqual(search.search_jobs(keyword="pyt ").all(), [])
+        # Tổng số và bitmap facet được cache theo khóa này
+        self.assertNotEqual(search.query_key("pyt", ""), search.query_key("pyt ", ""))
+        self.assertEqual(search.query_key("Kế toán ", None), search.query_key("toan  ke ", ""))
+        self.assertEqual(search.query_key("  ", None), "")
+
+    def test_document_frequency_expires(self):
+        search._df_cache.clear()
+        self.assertEqual(search._document_frequency("toan"), 2)
+        db.session.add(Job(employer=self.employer, title="Kế toán kho", description="Quản lý kho", location="Hà Nội", status="active"))
+        db.session.commit()
+        self.assertEqual(search._document_frequency("toan"), 2)
+
+        count, cached_at = search._df_cache["toan"]
+        search._df_cache["toan"] = (count, cached_at - search.DF_CACHE_TTL - 1)
+        self.assertEqual(search._document_frequency("toan"), 3)
+
+    def test_rebuild_index(self):
+        JobSearchTerm.query.delete()
+        db.session.commit()
+
+        search.rebuild_index(batch_size=2)
+        self.assertEqual(len(search.search_jobs(keyword="python").all()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
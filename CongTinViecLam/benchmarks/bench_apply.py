@@ -0,0 +1,88 @@
+import argparse
+import statistics
+import time
+import uuid
+
+# Đo thông lượng POST /api/apply (request/giây, một luồng) và số câu SQL mỗi request cho ba trường hợp:
+# nộp mới, nộp trùng và client gửi lại cùng Idempotency-Key. Dùng chung DB mẫu với bench_routes.
+# Chạy: python -m benchmarks.bench_apply --repeat 500
+from sqlalchemy import event, func, inspect
+
+# bench_routes đặt DATABASE_URL trỏ tới DB mẫu nên phải import trước app
+from benchmarks.bench_routes import _targets, _client
+from benchmarks.seed import SIZES, seed
+from app import create_app, db
+from app.models import Application, Job, OutboxEvent
+
+
+def _measure(client, engine, requests):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    latencies, sql_counts, codes = [], [], {}
+    try:
+        started = time.perf_counter()
+        for payload, headers in requests:
+            statements.clear()
+            request_started = time.perf_counter()
+            response = client.post("/api/apply", json=payload, headers=headers)
+            latencies.append((time.perf_counter() - request_started) * 1000)
+            sql_counts.append(len(statements))
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return {
+        'rps': len(requests) / elapsed,
+        'mean_ms': statistics.mean(latencies),
+        'sql_mean': statistics.mean(sql_counts),
+        'status': ",".join("%s×%d" % item for item in sorted(codes.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app({'TESTING': True})
+    with app.app_context():
+        if not inspect(db.engine).has_table('jobs') or db.session.query(Job.id).first() is None:
+            seed(SIZES)
+        targets = _targets()
+        last_event_id = db.session.query(func.max(OutboxEvent.id)).scalar() or 0
+        engine = db.engine
+        db.session.remove()
+    job_ids = targets['apply_job_ids'][:args.repeat]
+    cv_id = targets['cv_id']
+    keys = [str(uuid.uuid4()) for _ in job_ids]
+
+    client = _client(app, targets, 'candidate')
+    client.get("/api/candidate/cvs")  # làm nóng cache của identity
+    scenarios = [
+        ("nộp mới (có Idempotency-Key)",
+         [({'job_id': job_id, 'cv_id': cv_id}, {'Idempotency-Key': key}) for job_id, key in zip(job_ids, keys)]),
+        ("nộp trùng (không key)", [({'job_id': job_id, 'cv_id': cv_id}, {}) for job_id in job_ids]),
+        ("gửi lại cùng Idempotency-Key",
+         [({'job_id': job_id, 'cv_id': cv_id}, {'Idempotency-Key': key}) for job_id, key in zip(job_ids, keys)]),
+    ]
+
+    print("%-32s %10s %10s %8s %s" % ("trường hợp", "req/s", "mean ms", "SQL", "status"))
+    try:
+        for name, requests in scenarios:
+            r = _measure(client, engine, requests)
+            print("%-32s %10.0f %10.2f %8.2f %s" % (name, r['rps'], r['mean_ms'], r['sql_mean'], r['status']))
+    finally:
+        # Xóa các hồ sơ và event vừa tạo để chạy lại được trên cùng DB (--reuse)
+        with app.app_context():
+            Application.query.filter(Application.cv_id == cv_id, Application.job_id.in_(job_ids)) \
+                .delete(synchronize_session=False)
+            OutboxEvent.query.filter(OutboxEvent.id > last_event_id).delete(synchronize_session=False)
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
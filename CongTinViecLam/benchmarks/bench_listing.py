@@ -0,0 +1,99 @@
+import argparse
+import statistics
+import time
+import tracemalloc
+
+# So sánh truy vấn của các trang danh sách khi nạp đủ cột và khi dùng JOB_LISTING/CV_LISTING (defer các cột
+# Text dài): số byte dữ liệu đọc từ CSDL, bộ nhớ giữ lại cho một trang đối tượng ORM và thời gian.
+# Dùng chung DB mẫu với bench_routes.
+# Chạy: python -m benchmarks.bench_listing --repeat 50
+from sqlalchemy import func, inspect
+
+# bench_routes đặt DATABASE_URL trỏ tới DB mẫu nên phải import trước app
+import benchmarks.bench_routes  # noqa: F401
+from benchmarks.seed import SIZES, seed
+from app import create_app, db
+from app.models import Job, JobStatus, CV, JOB_LISTING, CV_LISTING
+
+
+def _cases(per_page):
+    employer_id = db.session.query(Job.employer_id).group_by(Job.employer_id) \
+        .order_by(func.count(Job.id).desc()).limit(1).scalar()
+    candidate_id = db.session.query(CV.candidate_id).group_by(CV.candidate_id) \
+        .order_by(func.count(CV.id).desc()).limit(1).scalar()
+    # (tên, hàm tạo truy vấn, tùy chọn nạp của trang danh sách)
+    return [
+        ("/job (trang đầu)", lambda: Job.query.filter(Job.status == JobStatus.active)
+         .order_by(Job.posted_date.desc(), Job.id.desc()).limit(per_page), JOB_LISTING),
+        ("dashboard nhà tuyển dụng", lambda: Job.query.filter_by(employer_id=employer_id)
+         .order_by(Job.posted_date.desc(), Job.id.desc()).limit(per_page), JOB_LISTING),
+        ("admin JobView", lambda: Job.query.order_by(Job.id).limit(per_page), JOB_LISTING),
+        ("dashboard ứng viên (CV)", lambda: CV.query.filter_by(candidate_id=candidate_id), CV_LISTING),
+    ]
+
+
+def _bytes(query):
+    # Tổng kích thước các giá trị trong các dòng CSDL trả về (chuỗi tính theo UTF-8, số/ngày 8 byte)
+    total = 0
+    # Chạy câu SELECT bằng Core để nhận giá trị từng cột thay vì đối tượng ORM
+    for row in db.session.connection().execute(query.statement):
+        for value in row:
+            if isinstance(value, str):
+                total += len(value.encode('utf-8'))
+            elif isinstance(value, bytes):
+                total += len(value)
+            elif value is not None:
+                total += 8
+    return total
+
+
+def _measure(build, options, repeat):
+    query = build().options(*options)
+    transferred = _bytes(query)
+
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        query.all()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = query.all()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del items
+    return {'rows': query.count(), 'bytes': transferred, 'memory': retained, 'mean_ms': statistics.mean(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app({'TESTING': True})
+    with app.app_context():
+        columns = {column['name'] for column in inspect(db.engine).get_columns('jobs')} \
+            if inspect(db.engine).has_table('jobs') else set()
+        if 'summary' not in columns or db.session.query(Job.id).first() is None:
+            # DB mẫu tạo từ phiên bản trước chưa có cột summary: sinh lại
+            db.drop_all()
+            seed(SIZES)
+
+        print("%-28s %5s %22s %22s %18s" % ("trang", "dòng", "byte đọc (đủ -> gọn)", "bộ nhớ (đủ -> gọn)",
+                                            "ms (đủ -> gọn)"))
+        for name, build, options in _cases(args.per_page):
+            full = _measure(build, (), args.repeat)
+            listing = _measure(build, options, args.repeat)
+            print("%-28s %5d %9d -> %9d %9d -> %9d %7.2f -> %7.2f   byte %+.0f%%, bộ nhớ %+.0f%%" % (
+                name, full['rows'], full['bytes'], listing['bytes'], full['memory'], listing['memory'],
+                full['mean_ms'], listing['mean_ms'],
+                listing['bytes'] * 100.0 / max(full['bytes'], 1) - 100,
+                listing['memory'] * 100.0 / max(full['memory'], 1) - 100))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+# Đo thời gian dựng ma trận CV và truy vấn top-K CV cho một job (chỉ trong bộ nhớ, không cần DB).
+# Chạy: python -m benchmarks.bench_matching --cvs 50000
+from benchmarks.bench_search import WORDS, WORD_WEIGHTS
+from app.matching import SparseMatrix, document_vector, JOB_FIELDS, CV_FIELDS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+
+    def text(n):
+        return " ".join(rnd.choices(WORDS, cum_weights=WORD_WEIGHTS, k=n))
+
+    matrix = SparseMatrix()
+    started = time.perf_counter()
+    for cv_id in range(args.cvs):
+        cv = SimpleNamespace(skills=text(8), position=text(2), objective=text(20))
+        matrix.set_row(cv_id, document_vector(cv, CV_FIELDS))
+    print("Dựng ma trận %d CV: %.1fs, %d cột" % (args.cvs, time.perf_counter() - started, len(matrix.columns)))
+
+    timings = []
+    for _ in range(args.queries):
+        job = SimpleNamespace(requirements=text(15), title=text(3), description=text(60))
+        vector = document_vector(job, JOB_FIELDS)
+        started = time.perf_counter()
+        matrix.top_k(vector, args.top)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print("top-%d: median %.1f ms, p95 %.1f ms" % (args.top, statistics.median(timings),
+                                                  timings[int(len(timings) * 0.95) - 1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Đo độ trễ (p50/p95/p99) và số câu SQL của từng route qua Flask test client trên SQLite có dữ liệu mẫu.
+# Chạy: python -m benchmarks.bench_routes --jobs 20000 --applications 50000
+#       python -m benchmarks.bench_routes --reuse --baseline benchmarks/results/before.json
+_db_file = os.path.join(tempfile.gettempdir(), "cttvl_bench_routes.db")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + _db_file)
+
+from sqlalchemy import event, func  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import User, Employer, Candidate, Job, JobStatus, CV, Application  # noqa: E402
+from benchmarks.seed import SIZES, PASSWORD, seed  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# Chênh lệch p95 dưới mức này (ms) coi là nhiễu, không tính là chậm đi
+MIN_REGRESSION_MS = 2.0
+
+
+def _targets():
+    # Chọn đối tượng đo: nhà tuyển dụng nhiều job nhất, job nhiều hồ sơ nhất của họ, ứng viên đầu tiên
+    employer_id, _ = db.session.query(Job.employer_id, func.count(Job.id)) \
+        .group_by(Job.employer_id).order_by(func.count(Job.id).desc()).first()
+    employer = db.session.get(Employer, employer_id)
+    job_id, _ = db.session.query(Application.job_id, func.count(Application.id)) \
+        .join(Job, Job.id == Application.job_id).filter(Job.employer_id == employer_id) \
+        .group_by(Application.job_id).order_by(func.count(Application.id).desc()).first()
+    candidate = Candidate.query.order_by(Candidate.id).first()
+    cv_id = db.session.query(CV.id).filter_by(candidate_id=candidate.id).order_by(CV.id).limit(1).scalar()
+    applied = db.session.query(Application.job_id).filter_by(candidate_id=candidate.id)
+    apply_job_ids = [row[0] for row in db.session.query(Job.id)
+                     .filter(Job.status == JobStatus.active, Job.id.notin_(applied))
+                     .order_by(Job.id).limit(1000)]
+    application_ids = [row[0] for row in db.session.query(Application.id)
+                       .filter_by(job_id=job_id).order_by(Application.id).limit(50)]
+    return {
+        'employer_user_id': employer.user_id,
+        'employer_username': db.session.get(User, employer.user_id).username,
+        'candidate_user_id': candidate.user_id,
+        'job_id': job_id,
+        'cv_id': cv_id,
+        'apply_job_ids': apply_job_ids,
+        'application_ids': application_ids,
+        'page': max(1, Job.query.filter_by(status=JobStatus.active).count() // 10 // 2),
+    }
+
+
+# (tên, vai trò, method, hàm sinh (url, tham số request) theo lần chạy thứ i)
+ROUTES = [
+    ("GET /", None, 'get', lambda t, i: ("/", {})),
+    ("GET /job", None, 'get', lambda t, i: ("/job", {})),
+    ("GET /job?keyword", None, 'get', lambda t, i: ("/job?keyword=kế+toán", {})),
+    ("GET /job?keyword&location", None, 'get', lambda t, i: ("/job?keyword=marketing&location=Hà+Nội", {})),
+    ("GET /job?page=N", None, 'get', lambda t, i: ("/job?page=%d" % t['page'], {})),
+    ("GET /job/<id>", None, 'get', lambda t, i: ("/job/%d" % t['job_id'], {})),
+    ("GET /api/jobs", None, 'get', lambda t, i: ("/api/jobs?limit=20", {})),
+    ("GET /api/jobs?keyword&fields", None, 'get',
+     lambda t, i: ("/api/jobs?keyword=kế+toán&fields=id,title,company,salary&limit=10", {})),
+    ("GET /api/jobs/<id>", None, 'get', lambda t, i: ("/api/jobs/%d" % t['job_id'], {})),
+    ("POST /login", None, 'post', lambda t, i: ("/login", {'data': {'username': t['employer_username'],
+                                                                    'password': PASSWORD}})),
+    ("GET /candidate/dashboard", 'candidate', 'get', lambda t, i: ("/candidate/dashboard", {})),
+    ("GET /candidate/cv/<id>", 'candidate', 'get', lambda t, i: ("/candidate/cv/%d" % t['cv_id'], {})),
+    ("GET /api/candidate/cvs", 'candidate', 'get', lambda t, i: ("/api/candidate/cvs", {})),
+    ("GET /profile", 'candidate', 'get', lambda t, i: ("/profile", {})),
+    ("POST /api/apply", 'candidate', 'post', lambda t, i: (
+        "/api/apply", {'json': {'job_id': t['apply_job_ids'][i % len(t['apply_job_ids'])], 'cv_id': t['cv_id']}})),
+    ("GET /employer/dashboard", 'employer', 'get', lambda t, i: ("/employer/dashboard", {})),
+    ("GET /employer/job/<id>/candidate", 'employer', 'get',
+     lambda t, i: ("/employer/job/%d/candidate" % t['job_id'], {})),
+    ("GET /employer/job/<id>/edit", 'employer', 'get', lambda t, i: ("/employer/job/%d/edit" % t['job_id'], {})),
+    ("GET /api/cv/<id>", 'employer', 'get', lambda t, i: ("/api/cv/%d" % t['cv_id'], {})),
+    ("GET export job applicants", 'employer', 'get',
+     lambda t, i: ("/employer/job/%d/applications/export?format=csv" % t['job_id'], {})),
+    ("POST /api/applications/review", 'employer', 'post', lambda t, i: (
+        "/api/applications/review", {'json': {'application_ids': t['application_ids'],
+                                              'status': ('reviewed', 'accepted')[i % 2]}})),
+]
+
+
+def _client(app, targets, role):
+    client = app.test_client()
+    if role:
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(targets['%s_user_id' % role])
+            sess['user_type'] = role
+    return client
+
+
+def _percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered) + 0.5)) - 1))]
+
+
+def run(app, engine, targets, warmup, repeat, only=None):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    results = {}
+    try:
+        for name, role, method, build in ROUTES:
+            if only and only not in name:
+                continue
+            client = _client(app, targets, role)
+            latencies, sql_counts, sizes, codes = [], [], [], {}
+            for i in range(warmup + repeat):
+                url, kwargs = build(targets, i)
+                if role is None:
+                    # Khách vãng lai: không giữ cookie giữa các lần (POST /login tạo phiên mới)
+                    client = _client(app, targets, role)
+                statements.clear()
+                started = time.perf_counter()
+                response = getattr(client, method)(url, **kwargs)
+                body = response.get_data()  # đọc hết body (cả response dạng stream)
+                elapsed = (time.perf_counter() - started) * 1000
+                if i < warmup:
+                    continue
+                latencies.append(elapsed)
+                sql_counts.append(len(statements))
+                sizes.append(len(body))
+                codes[response.status_code] = codes.get(response.status_code, 0) + 1
+            results[name] = {
+                'n': repeat,
+                'p50_ms': round(_percentile(latencies, 50), 2),
+                'p95_ms': round(_percentile(latencies, 95), 2),
+                'p99_ms': round(_percentile(latencies, 99), 2),
+                'max_ms': round(max(latencies), 2),
+                'mean_ms': round(statistics.mean(latencies), 2),
+                'sql_mean': round(statistics.mean(sql_counts), 2),
+                'sql_max': max(sql_counts),
+                'bytes': int(statistics.mean(sizes)),
+                'status': {str(code): count for code, count in sorted(codes.items())},
+            }
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return results
+
+
+def print_table(results, baseline=None, tolerance=0.2):
+    regressions = []
+    header = "%-34s %8s %8s %8s %8s %7s %8s %s" % ("route", "p50", "p95", "p99", "max", "SQL", "bytes", "status")
+    if baseline:
+        header += "   %-22s %s" % ("p95 so với baseline", "SQL baseline")
+    print(header)
+    for name, r in results.items():
+        line = "%-34s %8.1f %8.1f %8.1f %8.1f %7s %8s %s" % (
+            name, r['p50_ms'], r['p95_ms'], r['p99_ms'], r['max_ms'],
+            "%g/%d" % (r['sql_mean'], r['sql_max']), r.get('bytes', '-'), ",".join("%s×%d" % item for item in r['status'].items()))
+        base = (baseline or {}).get(name)
+        if base:
+            delta = r['p95_ms'] - base['p95_ms']
+            pct = delta / base['p95_ms'] * 100 if base['p95_ms'] else 0
+            slower = delta > MIN_REGRESSION_MS and r['p95_ms'] > base['p95_ms'] * (1 + tolerance)
+            more_sql = r['sql_max'] > base['sql_max']
+            line += "   %+8.1f ms (%+5.0f%%)   %d -> %d%s" % (
+                delta, pct, base['sql_max'], r['sql_max'], "  <-- CHẬM HƠN" if slower or more_sql else "")
+            if slower or more_sql:
+                regressions.append(name)
+        elif baseline is not None:
+            line += "   (mới)"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    for key, default in SIZES.items():
+        parser.add_argument("--" + key.replace('_', '-'), type=int, default=default)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reuse", action="store_true", help="Dùng lại DB đã sinh ở lần chạy trước")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--only", help="Chỉ chạy route có tên chứa chuỗi này")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", help="File kết quả của lần chạy trước để so sánh")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Cho phép p95 chậm hơn baseline (tỉ lệ)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    app = create_app({'TESTING': True, 'WTF_CSRF_ENABLED': False})
+    sizes = {key: getattr(args, key) for key in SIZES}
+
+    with app.app_context():
+        if not args.reuse:
+            started = time.perf_counter()
+            seed(sizes, seed_value=args.seed)
+            print("Sinh dữ liệu %s: %.1fs" % (sizes, time.perf_counter() - started))
+        targets = _targets()
+        engine = db.engine
+        db.session.remove()
+
+    results = run(app, engine, targets, args.warmup, args.repeat, only=args.only)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)['routes']
+    regressions = print_table(results, baseline, args.tolerance)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            'meta': {'sizes': sizes, 'seed': args.seed, 'repeat': args.repeat,
+                     'created_at': datetime.utcnow().isoformat(), 'python': platform.python_version(),
+                     'sqlite': sqlite3.sqlite_version},
+            'routes': results,
+        }, f, ensure_ascii=False, indent=2)
+    print("Đã lưu kết quả: %s" % args.output)
+
+    if regressions:
+        print("Chậm hơn baseline: %s" % ", ".join(regressions))
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
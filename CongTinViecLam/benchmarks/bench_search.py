@@ -0,0 +1,129 @@
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# So sánh tìm kiếm qua chỉ mục đảo với cách cũ dùng ilike '%kw%' trên SQLite.
+# Chạy: python -m benchmarks.bench_search --jobs 100000
+_db_file = os.path.join(tempfile.gettempdir(), "cttvl_bench_search.db")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + _db_file)
+
+from app import create_app, db, search  # noqa: E402
+from app.models import Employer, Job, JobStatus, User, UserRole  # noqa: E402
+
+TITLES = ["Kế toán", "Nhân viên kinh doanh", "Lập trình viên", "Kỹ sư phần mềm", "Chăm sóc khách hàng",
+          "Thiết kế đồ họa", "Quản lý dự án", "Giáo viên tiếng Anh", "Tài xế", "Nhân viên marketing"]
+LEVELS = ["thực tập", "junior", "senior", "trưởng nhóm", "tổng hợp", "Python", "Java", "bán hàng"]
+LOCATIONS = ["Hà Nội", "Hồ Chí Minh", "Đà Nẵng", "Cần Thơ", "Hải Phòng", "Bình Dương"]
+# Mô tả sinh từ vài nghìn từ ghép theo phân phối Zipf để tần suất từ gần với văn bản thật
+SYLLABLES = ["phát", "triển", "báo", "cáo", "khách", "hàng", "hệ", "thống", "dữ", "liệu", "đội", "nhóm",
+             "kinh", "nghiệm", "thuế", "doanh", "thu", "sản", "phẩm", "quy", "trình", "vận", "hành",
+             "chiến", "lược", "tài", "chính", "nhân", "sự", "kỹ", "thuật", "mạng", "bảo", "mật", "giao",
+             "tiếp", "đào", "tạo", "thị", "trường", "công", "nghệ", "thiết", "kế", "kiểm", "tra", "chất",
+             "lượng", "hợp", "đồng", "pháp", "lý", "xuất", "nhập", "khẩu", "kho", "chuyển", "ngân",
+             "sách", "điều", "phối", "tuyển", "dụng", "lương", "thưởng", "chế", "độ", "môi", "năng",
+             "động", "sáng", "ổn", "định", "mục", "tiêu", "kết", "quả", "đánh", "giá", "hiệu", "suất",
+             "cải", "tiến", "tối", "ưu", "chi", "phí", "đối", "tác", "cung", "ứng", "hồ", "sơ", "văn",
+             "bản", "ký", "duyệt", "lập", "kiến", "trúc", "ứng", "dụng", "phần", "mềm", "cứng"]
+WORDS = ["%s %s" % (a, b) for a in SYLLABLES for b in SYLLABLES if a != b]
+random.Random(7).shuffle(WORDS)
+WORD_WEIGHTS = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(WORDS))))
+# Cách cũ cần gõ đúng dấu mới khớp, nên dùng từ khóa có dấu cho cả hai bên
+QUERIES = [("Kế toán", ""), ("Lập trình viên Python", ""), ("marketing", "Hà Nội"), ("", "Đà Nẵng"),
+           ("thuế", ""), ("Kỹ sư senior", "Hồ Chí Minh"), ("kiểm tra chất lượng", "")]
+
+
+def _text(rnd, n):
+    return " ".join(rnd.choices(WORDS, cum_weights=WORD_WEIGHTS, k=n))
+
+
+def seed(n_jobs, seed_value=42):
+    rnd = random.Random(seed_value)
+    db.drop_all()
+    db.create_all()
+
+    user = User(username="bench_employer", password="x", role=UserRole.EMPLOYER)
+    db.session.add(user)
+    db.session.flush()
+    employer = Employer(user_id=user.id, company_name="Bench Corp")
+    db.session.add(employer)
+    db.session.commit()
+
+    now = datetime.utcnow()
+    batch = []
+    for i in range(n_jobs):
+        batch.append({
+            "employer_id": employer.id,
+            "title": "%s %s" % (rnd.choice(TITLES), rnd.choice(LEVELS)),
+            "description": _text(rnd, 40),
+            "requirements": _text(rnd, 15),
+            "location": rnd.choice(LOCATIONS),
+            "posted_date": now - timedelta(minutes=i),
+            "status": JobStatus.active if rnd.random() < 0.8 else JobStatus.inactive,
+        })
+        if len(batch) == 5000:
+            db.session.execute(Job.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Job.__table__.insert(), batch)
+    db.session.commit()
+
+
+def ilike_query(keyword, location):
+    query = Job.query.filter_by(status='active')
+    if keyword:
+        query = query.filter(Job.title.ilike(f'%{keyword}%'))
+    if location:
+        query = query.filter(Job.location.ilike(f'%{location}%'))
+    return query.order_by(Job.posted_date.desc())
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--per-page", type=int, default=10)
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        start = time.perf_counter()
+        seed(args.jobs)
+        print("Seed %d jobs: %.1fs" % (args.jobs, time.perf_counter() - start))
+
+        start = time.perf_counter()
+        search.rebuild_index()
+        print("Build index: %.1fs" % (time.perf_counter() - start))
+
+        print("%-24s %-12s %12s %8s %12s %8s" % ("keyword", "location", "ilike (ms)", "hits", "index (ms)", "hits"))
+        for keyword, location in QUERIES:
+            # Trang đầu + COUNT(*) như paginate() trong route /job
+            def run_ilike():
+                q = ilike_query(keyword, location)
+                return q.limit(args.per_page).all(), q.count()
+
+            def run_index():
+                page = search.paginate_jobs(keyword=keyword, location=location, per_page=args.per_page)
+                return page.items, page.total
+
+            ilike_ms = timed(run_ilike, args.repeat)
+            index_ms = timed(run_index, args.repeat)
+            print("%-24s %-12s %12.1f %8d %12.1f %8d" % (
+                keyword, location, ilike_ms, run_ilike()[1], index_ms, run_index()[1]))
+            db.session.remove()
+
+
+if __name__ == "__main__":
+    main()
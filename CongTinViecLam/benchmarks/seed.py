@@ -0,0 +1,152 @@
+import hashlib
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from app import db, search
+from app.models import (User, UserRole, Candidate, Employer, Job, JobStatus, CV, CVExperience, CVEducation,
+                        Application, parse_period, make_summary)
+from benchmarks.bench_search import TITLES, LEVELS, LOCATIONS, WORDS, WORD_WEIGHTS
+
+# Sinh dữ liệu mẫu cố định theo seed: cùng kích thước + cùng seed cho ra cùng dữ liệu,
+# để kết quả benchmark giữa các lần chạy so sánh được với nhau
+SIZES = {
+    'candidates': 2000,
+    'employers': 200,
+    'jobs': 20000,
+    'cvs_per_candidate': 2,
+    'applications': 50000,
+}
+PASSWORD = "123456"
+BASE_DATE = datetime(2025, 1, 1)
+BATCH_SIZE = 5000
+
+COMPANIES = ["FPT Software", "Viettel", "VNG", "Tiki", "Shopee", "MoMo", "Vingroup", "Techcombank", "VPBank",
+             "Grab", "KMS", "TMA Solutions", "Bosch", "NashTech", "Sun Asterisk"]
+SCHOOLS = ["ĐH Bách Khoa Hà Nội", "ĐH Quốc gia TP.HCM", "ĐH Kinh tế Quốc dân", "ĐH FPT", "ĐH Ngoại thương"]
+DEGREES = ["Cử nhân", "Kỹ sư", "Thạc sĩ", "Cao đẳng"]
+SKILLS = ["Python", "Java", "SQL", "Excel", "kế toán", "thuế", "marketing", "bán hàng", "tiếng Anh",
+          "Photoshop", "quản lý dự án", "chăm sóc khách hàng", "React", "Flask", "phân tích dữ liệu"]
+WORK_TYPES = ["fulltime", "parttime", "remote", "hybrid", "contract"]
+EXPERIENCE_LEVELS = ["intern", "fresher", "junior", "mid", "senior", "manager"]
+
+
+def _text(rnd, n):
+    return " ".join(rnd.choices(WORDS, cum_weights=WORD_WEIGHTS, k=n))
+
+
+def _zipf_weights(n):
+    # Vài nhà tuyển dụng / job rất lớn, phần lớn còn lại nhỏ
+    return list(itertools.accumulate(1.0 / (rank + 1) for rank in range(n)))
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(model.__table__.insert(), rows[start:start + BATCH_SIZE])
+
+
+def _ids(model):
+    return [row[0] for row in db.session.query(model.id).order_by(model.id)]
+
+
+def seed(sizes=None, seed_value=42):
+    sizes = dict(SIZES, **(sizes or {}))
+    rnd = random.Random(seed_value)
+    # Cùng kiểu băm với dao.auth_user để đo được POST /login
+    password = hashlib.md5(PASSWORD.encode('utf-8')).hexdigest()
+
+    db.drop_all()
+    db.create_all()
+
+    # users: nhà tuyển dụng trước, ứng viên sau
+    users = [{'username': 'employer%d' % i, 'password': password, 'role': UserRole.EMPLOYER}
+             for i in range(sizes['employers'])]
+    users += [{'username': 'candidate%d' % i, 'password': password, 'role': UserRole.CANDIDATE}
+              for i in range(sizes['candidates'])]
+    _insert(User, users)
+    user_ids = _ids(User)
+    employer_user_ids = user_ids[:sizes['employers']]
+    candidate_user_ids = user_ids[sizes['employers']:]
+
+    _insert(Employer, [{'user_id': user_id, 'company_name': "%s %d" % (rnd.choice(COMPANIES), i),
+                        'company_address': rnd.choice(LOCATIONS), 'contact_person': "HR %d" % i}
+                       for i, user_id in enumerate(employer_user_ids)])
+    _insert(Candidate, [{'user_id': user_id, 'full_name': "Ứng viên %d" % i,
+                         'email': "candidate%d@example.com" % i, 'phone': "09%08d" % i,
+                         'address': rnd.choice(LOCATIONS)}
+                        for i, user_id in enumerate(candidate_user_ids)])
+    employer_ids = _ids(Employer)
+    candidate_ids = _ids(Candidate)
+
+    employer_weights = _zipf_weights(len(employer_ids))
+    jobs = []
+    for i in range(sizes['jobs']):
+        posted = BASE_DATE - timedelta(minutes=i * 7)
+        jobs.append({
+            'employer_id': rnd.choices(employer_ids, cum_weights=employer_weights)[0],
+            'title': "%s %s" % (rnd.choice(TITLES), rnd.choice(LEVELS)),
+            'description': _text(rnd, 60),
+            'requirements': ", ".join(rnd.sample(SKILLS, 4)) + ". " + _text(rnd, 15),
+            'location': rnd.choice(LOCATIONS),
+            'salary': rnd.randrange(500, 5000) * 10000,
+            'work_type': rnd.choice(WORK_TYPES),
+            'experience_level': rnd.choice(EXPERIENCE_LEVELS),
+            'benefits': _text(rnd, 10),
+            'posted_date': posted,
+            'updated_at': posted,
+            'status': rnd.choices([JobStatus.active, JobStatus.inactive, JobStatus.pending], [8, 1, 1])[0],
+        })
+    for job in jobs:
+        job['summary'] = make_summary(job['description'])
+    _insert(Job, jobs)
+    job_ids = _ids(Job)
+
+    cvs = []
+    for candidate_id in candidate_ids:
+        for n in range(sizes['cvs_per_candidate']):
+            created = BASE_DATE - timedelta(days=rnd.randrange(365))
+            cvs.append({'candidate_id': candidate_id, 'title': "CV %s %d" % (rnd.choice(TITLES), n),
+                        'position': rnd.choice(TITLES), 'skills': ", ".join(rnd.sample(SKILLS, 5)),
+                        'objective': _text(rnd, 20), 'created_at': created, 'updated_at': created})
+    _insert(CV, cvs)
+    cv_ids = _ids(CV)
+
+    experiences, educations = [], []
+    for cv_id in cv_ids:
+        start = rnd.randrange(2010, 2022)
+        for order in range(rnd.randrange(1, 4)):
+            period = "%d-%d" % (start, start + 2)
+            period_start, period_end = parse_period(period)
+            experiences.append({'cv_id': cv_id, 'company': rnd.choice(COMPANIES), 'position': rnd.choice(TITLES),
+                                'period': period, 'period_start': period_start, 'period_end': period_end,
+                                'description': _text(rnd, 12), 'sort_order': order})
+            start += 2
+        period = "%d-%d" % (start - 10, start - 6)
+        period_start, period_end = parse_period(period)
+        educations.append({'cv_id': cv_id, 'school': rnd.choice(SCHOOLS), 'degree': rnd.choice(DEGREES),
+                           'period': period, 'period_start': period_start, 'period_end': period_end,
+                           'sort_order': 0})
+    _insert(CVExperience, experiences)
+    _insert(CVEducation, educations)
+
+    # Ứng tuyển tập trung vào các job nổi bật, mỗi cặp (job, ứng viên) chỉ một lần
+    cvs_per_candidate = sizes['cvs_per_candidate']
+    job_weights = _zipf_weights(len(job_ids))
+    pairs = set()
+    limit = min(sizes['applications'], len(job_ids) * len(candidate_ids))
+    while len(pairs) < limit:
+        pairs.add((rnd.choices(job_ids, cum_weights=job_weights)[0], rnd.randrange(len(candidate_ids))))
+    applications = []
+    for job_id, candidate_index in sorted(pairs):
+        applications.append({
+            'job_id': job_id,
+            'candidate_id': candidate_ids[candidate_index],
+            'cv_id': cv_ids[candidate_index * cvs_per_candidate + rnd.randrange(cvs_per_candidate)],
+            'applied_date': BASE_DATE + timedelta(minutes=rnd.randrange(60 * 24 * 90)),
+            'status': rnd.choices(['pending', 'reviewed', 'accepted', 'rejected'], [6, 2, 1, 1])[0],
+        })
+    _insert(Application, applications)
+    db.session.commit()
+
+    search.rebuild_index()
+    return sizes
@@ -0,0 +1,4 @@
+-- Mã tin từ nguồn đối tác cho API/CLI nhập job hàng loạt (upsert theo employer_id + external_ref)
+ALTER TABLE jobs
+    ADD COLUMN external_ref VARCHAR(100) NULL,
+    ADD CONSTRAINT unique_job_external_ref UNIQUE (employer_id, external_ref);
@@ -0,0 +1,31 @@
+-- Kinh nghiệm / học vấn của CV tách thành bảng con thay cho chuỗi company|position|period|description|||...
+-- Sau khi tạo bảng, chạy `flask cv-migrate` để chuyển dữ liệu cũ theo từng lô.
+CREATE TABLE cv_experiences (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    cv_id INT NOT NULL,
+    company VARCHAR(255) NOT NULL,
+    position VARCHAR(255) NULL,
+    period VARCHAR(50) NULL,
+    period_start INT NULL,
+    period_end INT NULL,
+    description TEXT NULL,
+    sort_order INT NOT NULL DEFAULT 0,
+    INDEX ix_cv_experiences_cv_id (cv_id),
+    INDEX ix_cv_experiences_company (company),
+    CONSTRAINT fk_cv_experiences_cv FOREIGN KEY (cv_id) REFERENCES cvs (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE cv_educations (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    cv_id INT NOT NULL,
+    school VARCHAR(255) NOT NULL,
+    degree VARCHAR(255) NULL,
+    period VARCHAR(50) NULL,
+    period_start INT NULL,
+    period_end INT NULL,
+    description TEXT NULL,
+    sort_order INT NOT NULL DEFAULT 0,
+    INDEX ix_cv_educations_cv_id (cv_id),
+    INDEX ix_cv_educations_degree (degree),
+    CONSTRAINT fk_cv_educations_cv FOREIGN KEY (cv_id) REFERENCES cvs (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,34 @@
+-- Index cho các truy vấn nóng (xem app/tests/test_query_plans.py).
+-- ALGORITHM=INPLACE, LOCK=NONE: InnoDB tạo index online, bảng vẫn đọc/ghi được trong lúc chạy.
+-- InnoDB tự thêm khóa chính vào cuối mỗi secondary index nên (status, posted_date) đã đủ cho
+-- ORDER BY posted_date DESC, id DESC. Index tự tạo cho khóa ngoại (employer_id, job_id, candidate_id...)
+-- sẽ được MySQL tự bỏ khi đã có index mới bắt đầu bằng cùng cột.
+
+ALTER TABLE candidates
+    ADD INDEX ix_candidates_user_id (user_id),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE employers
+    ADD INDEX ix_employers_user_id (user_id),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE cvs
+    ADD INDEX ix_cvs_candidate_id (candidate_id),
+    ADD INDEX ix_cvs_updated_at (updated_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE jobs
+    ADD INDEX ix_jobs_status_posted_date (status, posted_date),
+    ADD INDEX ix_jobs_employer_posted_date (employer_id, posted_date),
+    ADD INDEX ix_jobs_employer_status (employer_id, status),
+    ADD INDEX ix_jobs_updated_at (updated_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE applications
+    ADD INDEX ix_applications_job_status_applied (job_id, status, applied_date),
+    ADD INDEX ix_applications_job_applied (job_id, applied_date),
+    ADD INDEX ix_applications_candidate_applied (candidate_id, applied_date),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+-- Cập nhật thống kê để optimizer chọn index mới ngay
+ANALYZE TABLE candidates, employers, cvs, jobs, applications;
@@ -0,0 +1,28 @@
+-- Bảng outbox (event ghi cùng transaction với thay đổi nghiệp vụ) và thông báo cho người dùng.
+-- Worker: `flask outbox-worker` (lấy event bằng SELECT ... FOR UPDATE SKIP LOCKED, cần MySQL 8).
+
+CREATE TABLE outbox_events (
+    id INT NOT NULL AUTO_INCREMENT,
+    event_type VARCHAR(64) NOT NULL,
+    payload TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    available_at DATETIME NOT NULL,
+    created_at DATETIME NOT NULL,
+    processed_at DATETIME NULL,
+    last_error TEXT NULL,
+    PRIMARY KEY (id),
+    INDEX ix_outbox_events_status_available (status, available_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE notifications (
+    id INT NOT NULL AUTO_INCREMENT,
+    user_id INT NOT NULL,
+    message VARCHAR(500) NOT NULL,
+    link VARCHAR(255) NULL,
+    is_read TINYINT(1) NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    INDEX ix_notifications_user_created (user_id, created_at),
+    CONSTRAINT fk_notifications_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
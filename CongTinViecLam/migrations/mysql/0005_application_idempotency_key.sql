@@ -0,0 +1,7 @@
+-- Idempotency-Key cho POST /api/apply: client gửi lại cùng key nhận lại hồ sơ đã tạo thay vì lỗi trùng.
+-- Nhiều dòng NULL không vi phạm UNIQUE nên các hồ sơ cũ (không có key) không bị ảnh hưởng.
+
+ALTER TABLE applications
+    ADD COLUMN idempotency_key VARCHAR(64) NULL,
+    ADD UNIQUE INDEX unique_application_idempotency_key (candidate_id, idempotency_key),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,11 @@
+-- Cột summary: bản rút gọn của description cho thẻ job ở trang danh sách, để các truy vấn danh sách
+-- không phải đọc cột TEXT. Ứng dụng tính lại summary mỗi khi ghi description (models.make_summary:
+-- gộp khoảng trắng, cắt ở ranh giới từ).
+
+ALTER TABLE jobs
+    ADD COLUMN summary VARCHAR(255) NULL AFTER description,
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+-- Điền summary cho các job hiện có theo lô khóa chính, mỗi lô một transaction ngắn (không khóa cả bảng
+-- jobs như một câu UPDATE duy nhất); chạy lại được, chỉ xử lý các dòng summary còn NULL:
+--   flask job-summary-backfill --batch-size 500
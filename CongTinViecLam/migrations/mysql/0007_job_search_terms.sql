@@ -0,0 +1,17 @@
+-- Chỉ mục đảo cho tìm kiếm job (app/search.py): mỗi dòng là một từ đã bỏ dấu xuất hiện trong một job
+-- đang active. Khóa chính (term, job_id) để đọc danh sách job của một từ, và cả khoảng tiền tố của từ
+-- cuối (term >= 'dev' AND term < 'dew'), không cần tra bảng.
+
+CREATE TABLE job_search_terms (
+    term VARCHAR(64) NOT NULL,
+    job_id INT NOT NULL,
+    weight INT NOT NULL DEFAULT 1,
+    in_location TINYINT(1) NOT NULL DEFAULT 0,
+    posted_date DATETIME NOT NULL,
+    PRIMARY KEY (term, job_id),
+    INDEX ix_job_search_terms_job_id (job_id),
+    CONSTRAINT fk_job_search_terms_job FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Điền chỉ mục cho các job hiện có (bỏ dấu tiếng Việt phải làm bằng Python, đọc jobs theo lô khóa chính):
+--   flask search-reindex --batch-size 1000
@@ -0,0 +1,8 @@
+-- Worker outbox giao event ít nhất một lần: thông báo ghi kèm id event tạo ra nó, handler bỏ qua event đã
+-- xử lý và UNIQUE (event_id, user_id) chặn bản trùng khi hai worker cùng xử lý một event.
+-- Các thông báo cũ có event_id NULL nên không vi phạm UNIQUE.
+
+ALTER TABLE notifications
+    ADD COLUMN event_id INT NULL AFTER user_id,
+    ADD UNIQUE INDEX unique_notification_event_user (event_id, user_id),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,7 @@
+-- Autocomplete đồng bộ tên công ty giữa các worker theo updated_at như jobs/cvs, thay vì đọc lại toàn bộ
+-- bảng employers mỗi lần đồng bộ. Các dòng cũ để NULL: lần nạp đầu của mỗi worker vẫn đọc hết bảng.
+
+ALTER TABLE employers
+    ADD COLUMN updated_at DATETIME NULL,
+    ADD INDEX ix_employers_updated_at (updated_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,7 @@
+from app import create_app
+
+# Build file tĩnh (tên có hash + bản nén) trước khi khởi động: flask --app wsgi assets-build
+# Chạy nhiều worker: gunicorn -w 4 -b 0.0.0.0:8000 wsgi:app
+# Dùng được cả --preload: engine tạo ở tiến trình cha được bỏ pool sau fork (xem app/__init__.py),
+# mỗi worker tự mở kết nối riêng. Kích thước pool đặt qua DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE...
+app = create_app()